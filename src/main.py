@@ -1,37 +1,66 @@
 """
 Sistema de Gestión de Inventario - Interfaz Principal
 Aplicación interactiva para gestionar productos
+
+Uso sin interacción:
+    python main.py --comandos archivo.jsonl [--lote N] [--demo] [--salida resultados.jsonl]
+    python main.py --comandos - < archivo.jsonl
 """
 
+import argparse
+import os
+import sys
+
 from mi_proyecto.models.producto import Libreria, Producto
 from mi_proyecto.repositories.inventario import RepositorioMemoria, Inventario
+from mi_proyecto.repositories.movimientos import RegistroMovimientos
 from mi_proyecto.services.reportes import GeneradorReportes
 from mi_proyecto.utils.validadores import Validadores
-from mi_proyecto.utils.formatters import Formateadores
+from mi_proyecto.utils.formatters import CacheFilas, Formateadores
+
+# Tamaño del buffer de la salida del modo por lotes
+BUFFER_SALIDA = 1 << 16
 
 class AplicacionInventario:
     """Aplicación principal con interfaz de usuario."""
     
+    MENU = "\n".join([
+        "\n" + "=" * 50,
+        "     SISTEMA DE GESTION DE INVENTARIO",
+        "=" * 50,
+        "1. Agregar producto",
+        "2. Ver todos los productos",
+        "3. Aumentar stock",
+        "4. Disminuir stock (Venta)",
+        "5. Productos con bajo stock",
+        "6. Ver reporte completo",
+        "7. Salir",
+        "=" * 50,
+    ])
+    
     def __init__(self):
         """Inicializa la aplicación."""
         self.repositorio = RepositorioMemoria()
-        self.inventario = Inventario(self.repositorio)
+        # INVENTARIO_MOVIMIENTOS=0 deja de registrar las ventas y reposiciones
+        # (y desactiva los reportes de ventas) para ahorrar su costo por movimiento
+        movimientos = None if os.environ.get("INVENTARIO_MOVIMIENTOS") == "0" else RegistroMovimientos()
+        self.inventario = Inventario(self.repositorio, movimientos=movimientos)
         self.reportes = GeneradorReportes(self.inventario)
+        # Filas ya formateadas del listado; vive lo mismo que el repositorio
+        self.cache_filas = CacheFilas()
+        # INVENTARIO_METRICAS=archivo.prom activa las métricas y las guarda al salir
+        self.ruta_metricas = os.environ.get("INVENTARIO_METRICAS")
+        self.metricas = None
+        if self.ruta_metricas:
+            from mi_proyecto.utils.metricas import Metricas
+            self.metricas = Metricas(llamadas_lentas=int(os.environ.get("INVENTARIO_LLAMADAS_LENTAS", "0")))
+            self.metricas.instrumentar(self.repositorio, "repositorio")
+            self.metricas.instrumentar(self.inventario, "inventario")
+            self.metricas.instrumentar(self.reportes, "reportes")
     
     def mostrar_menu_principal(self) -> str:
         """Muestra el menú principal."""
-        print("\n" + "=" * 50)
-        print("     SISTEMA DE GESTION DE INVENTARIO")
-        print("=" * 50)
-        print("1. Agregar producto")
-        print("2. Ver todos los productos")
-        print("3. Aumentar stock")
-        print("4. Disminuir stock (Venta)")
-        print("5. Productos con bajo stock")
-        print("6. Ver reporte completo")
-        print("7. Salir")
-        print("=" * 50)
-        
+        print(self.MENU)
         return input("Seleccione una opción: ")
     
     def agregar_producto_interactivo(self):
@@ -77,15 +106,36 @@ class AplicacionInventario:
         except (ValueError, KeyError, IndexError) as e:
             print(f"ERROR: {e}")
     
-    def ver_todos_productos(self):
-        """Muestra todos los productos."""
-        productos = self.repositorio.obtener_todos()
-        if productos:
-            print(Formateadores.formatear_lista_productos(productos))
-        else:
+    def ver_todos_productos(self, tamano_pagina: int = 50):
+        """Muestra todos los productos, paginados si no caben en una página."""
+        total = self.repositorio.contar()
+        if not total:
             print("\n" + "=" * 60)
             print(" " * 15 + "No hay productos en el inventario")
             print("=" * 60)
+            return
+        
+        if total <= tamano_pagina:
+            Formateadores.escribir_lista_productos(self.repositorio.iterar(), sys.stdout,
+                                                   cache=self.cache_filas)
+            print()
+            return
+        
+        # Un solo recorrido para todas las páginas y el resumen calculado una vez
+        productos = self.repositorio.iterar()
+        resumen = (total, self.repositorio.total_items(), self.repositorio.valor_total())
+        paginas = (total + tamano_pagina - 1) // tamano_pagina
+        pagina = 1
+        while True:
+            Formateadores.escribir_lista_productos(productos, sys.stdout,
+                                                   pagina=pagina, tamano_pagina=tamano_pagina,
+                                                   cache=self.cache_filas, resumen=resumen)
+            if pagina >= paginas:
+                break
+            respuesta = input(f"Página {pagina}/{paginas} - Enter para continuar, 'q' para salir: ")
+            if respuesta.strip().lower() == "q":
+                break
+            pagina += 1
     
     def aumentar_stock_interactivo(self):
         """Aumenta el stock de un producto."""
@@ -115,12 +165,19 @@ class AplicacionInventario:
         """Muestra productos con bajo stock."""
         limite = int(input("Límite de stock bajo (default 10): ") or "10")
         productos = self.inventario.obtener_productos_bajo_stock(limite)
-        print(Formateadores.formatear_lista_productos(productos))
+        Formateadores.escribir_lista_productos(productos, sys.stdout)
+        print()
         
     def ver_reporte(self):
         """Muestra el reporte completo."""
         reporte = self.reportes.reporte_completo()
         print(Formateadores.formatear_reporte(reporte))
+        if self.inventario.movimientos is not None:
+            vendidos = self.reportes.productos_mas_vendidos(5)
+            if vendidos:
+                print(f"Más vendidos (últimos {self.inventario.movimientos.ventana_dias} días):")
+                for producto, unidades in vendidos:
+                    print(f"  - {producto.nombre}: {unidades} unidad(es)")
     
     def ejecutar(self):
         """Ejecuta la aplicación principal."""
@@ -142,12 +199,44 @@ class AplicacionInventario:
             elif opcion == "6":
                 self.ver_reporte()
             elif opcion == "7":
+                self._guardar_metricas()
                 print("\n¡Hasta luego!")
                 break
             else:
                 print("\n¡ERROR - Opción inválida!")
     
-    def _cargar_datos_prueba(self):
+    def _guardar_metricas(self):
+        """Guarda las métricas si están activadas."""
+        if self.metricas is None:
+            return
+        self.metricas.guardar_prometheus(self.ruta_metricas)
+        if self.metricas.lentas is not None:
+            with open(self.ruta_metricas + ".lentas.txt", "w", encoding="utf-8") as archivo:
+                self.metricas.lentas.volcar(archivo)
+    
+    def ejecutar_comandos(self, entrada, salida, tamano_lote: int = 1, datos_prueba: bool = False) -> dict:
+        """
+        Ejecuta comandos JSON Lines sin mostrar el menú
+        
+        Args:
+            entrada: Líneas de comandos
+            salida: Destino de los resultados
+            tamano_lote: Máximo de escrituras consecutivas aplicadas juntas
+            datos_prueba: Si es True, carga antes los datos de prueba
+            
+        Returns:
+            dict: Resumen con comandos, errores y velocidad
+        """
+        from mi_proyecto.services.comandos import ProcesadorComandos
+        if datos_prueba:
+            self._cargar_datos_prueba(mostrar=False)
+        procesador = ProcesadorComandos(self.inventario, salida, tamano_lote, self.reportes)
+        try:
+            return procesador.ejecutar(entrada)
+        finally:
+            self._guardar_metricas()
+    
+    def _cargar_datos_prueba(self, mostrar: bool = True):
         """Carga datos de prueba en el inventario."""
         productos_prueba = [
             ("Lapiz", "Lapiz Artesco", 1.99, 50, Libreria.ESCRITURA),
@@ -162,8 +251,45 @@ class AplicacionInventario:
         for nombre, desc, precio, cantidad, libreria in productos_prueba:
             self.inventario.agregar_producto(nombre, desc, precio, cantidad, libreria)
         
-        print("\nOK - Datos de prueba cargados")
+        if mostrar:
+            print("\nOK - Datos de prueba cargados")
 
-if __name__ == "__main__":
+def main(argv=None):
+    """Punto de entrada: menú interactivo o, con --comandos, ejecución por lotes."""
+    parser = argparse.ArgumentParser(description="Sistema de gestión de inventario")
+    parser.add_argument("--comandos", metavar="ARCHIVO",
+                        help="ejecuta los comandos JSON Lines del archivo ('-' para la entrada estándar) sin menú")
+    parser.add_argument("--salida", metavar="ARCHIVO", help="archivo de resultados (por defecto, la salida estándar)")
+    parser.add_argument("--lote", type=int, default=1,
+                        help="agrupa hasta N agregados, ventas o reposiciones consecutivos (por defecto 1)")
+    parser.add_argument("--demo", action="store_true", help="carga los datos de prueba antes de los comandos")
+    args = parser.parse_args(argv)
+    
+    if args.lote <= 0:
+        parser.error("--lote debe ser positivo")
+    
     app = AplicacionInventario()
-    app.ejecutar()
\ No newline at end of file
+    if args.comandos is None:
+        app.ejecutar()
+        return 0
+    
+    if args.comandos == "-":
+        entrada = sys.stdin
+    else:
+        entrada = open(args.comandos, encoding="utf-8")
+    if args.salida:
+        salida = open(args.salida, "w", encoding="utf-8", buffering=BUFFER_SALIDA)
+    else:
+        salida = open(sys.stdout.fileno(), "w", encoding="utf-8", buffering=BUFFER_SALIDA, closefd=False)
+    try:
+        resumen = app.ejecutar_comandos(entrada, salida, args.lote, args.demo)
+    finally:
+        salida.close()
+        if entrada is not sys.stdin:
+            entrada.close()
+    print(f"{resumen['comandos']} comandos, {resumen['errores']} errores en {resumen['segundos']:.3f} s "
+          f"({resumen['comandos_por_segundo']:,.0f} comandos/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
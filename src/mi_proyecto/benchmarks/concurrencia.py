@@ -0,0 +1,109 @@
+"""
+Benchmark - Concurrencia
+Ejecuta ventas y reposiciones desde varios hilos y verifica que
+no haya sobreventa ni actualizaciones perdidas
+
+Uso (desde src/):
+    python -m mi_proyecto.benchmarks.concurrencia [--hilos 8] [--operaciones 20000] [--productos 100]
+"""
+
+import argparse
+import random
+import threading
+import time
+from typing import Dict, List
+from ..models.producto import Libreria
+from ..repositories.inventario import Inventario, RepositorioMemoria
+
+
+def ejecutar(hilos: int, operaciones: int, productos: int, stock_inicial: int, semilla: int = 0) -> Dict[str, float]:
+    """
+    Ejecuta el benchmark y retorna sus métricas.
+
+    Cada hilo hace `operaciones` movimientos al azar (70 % ventas, 30 %
+    reposiciones) y lleva la cuenta de los que tuvieron éxito. Al final
+    el stock de cada producto debe ser el inicial más lo repuesto menos
+    lo vendido.
+    """
+    inventario = Inventario(RepositorioMemoria())
+    categorias = list(Libreria)
+    ids = [p.id_producto for p in inventario.agregar_productos(
+        (f"Producto {i}", "", 1.0, stock_inicial, categorias[i % len(categorias)])
+        for i in range(productos))]
+
+    netos: List[Dict[int, int]] = [dict.fromkeys(ids, 0) for _ in range(hilos)]
+    rechazadas = [0] * hilos
+    barrera = threading.Barrier(hilos + 1)
+
+    def trabajar(numero: int):
+        azar = random.Random(semilla + numero)
+        neto = netos[numero]
+        barrera.wait()
+        for _ in range(operaciones):
+            id_producto = azar.choice(ids)
+            cantidad = azar.randint(1, 5)
+            if azar.random() < 0.7:
+                try:
+                    inventario.disminuir_stock(id_producto, cantidad)
+                    neto[id_producto] -= cantidad
+                except ValueError:
+                    rechazadas[numero] += 1
+            else:
+                inventario.aumentar_stock(id_producto, cantidad)
+                neto[id_producto] += cantidad
+
+    trabajadores = [threading.Thread(target=trabajar, args=(n,)) for n in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for trabajador in trabajadores:
+        trabajador.join()
+    duracion = time.perf_counter() - inicio
+
+    repositorio = inventario.repositorio
+    descuadres = 0
+    for id_producto in ids:
+        esperado = stock_inicial + sum(neto[id_producto] for neto in netos)
+        if repositorio.obtener(id_producto).cantidad != esperado:
+            descuadres += 1
+    negativos = sum(1 for _ in repositorio.filtrar(lambda p: p.cantidad < 0))
+    total_real = sum(p.cantidad for p in repositorio.iterar())
+
+    return {
+        "hilos": hilos,
+        "operaciones": hilos * operaciones,
+        "segundos": duracion,
+        "operaciones_por_segundo": hilos * operaciones / duracion,
+        "ventas_rechazadas": sum(rechazadas),
+        "productos_descuadrados": descuadres,
+        "productos_negativos": negativos,
+        "total_items_coincide": repositorio.total_items() == total_real,
+    }
+
+
+def main():
+    """Ejecuta el benchmark desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Benchmark de movimientos de stock concurrentes")
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--operaciones", type=int, default=20_000, help="Operaciones por hilo")
+    parser.add_argument("--productos", type=int, default=100)
+    parser.add_argument("--stock-inicial", type=int, default=50)
+    args = parser.parse_args()
+
+    resultado = ejecutar(args.hilos, args.operaciones, args.productos, args.stock_inicial)
+    print(f"Hilos: {resultado['hilos']}  Operaciones: {resultado['operaciones']:,}")
+    print(f"Rendimiento: {resultado['operaciones_por_segundo']:,.0f} operaciones/s")
+    print(f"Ventas rechazadas por falta de stock: {resultado['ventas_rechazadas']:,}")
+    correcto = (resultado["productos_descuadrados"] == 0 and resultado["productos_negativos"] == 0
+                and resultado["total_items_coincide"])
+    print(f"Productos descuadrados: {resultado['productos_descuadrados']}  "
+          f"Stock negativo: {resultado['productos_negativos']}  "
+          f"Total de ítems coincide: {resultado['total_items_coincide']}")
+    print("Resultado: " + ("OK" if correcto else "ERROR"))
+    if not correcto:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Benchmark - Suite de operaciones del inventario
+Mide rendimiento, percentiles de latencia y memoria pico de las
+operaciones principales sobre catálogos sintéticos de distinto tamaño
+
+Uso (desde src/):
+    python -m mi_proyecto.benchmarks.suite [--tamanos 1000 100000 1000000] [--salida resultados.json]
+    python -m mi_proyecto.benchmarks.suite --comparar base.json [--umbral 0.10]
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..models.producto import Libreria
+from ..repositories.inventario import Inventario, RepositorioMemoria
+from ..services.reportes import GeneradorReportes
+from ..utils.formatters import Formateadores
+
+TAMANOS = (1_000, 100_000, 1_000_000)
+PERCENTILES = (50, 90, 99)
+CATEGORIAS = list(Libreria)
+
+
+def construir_catalogo(tamano: int, semilla: int = 0) -> Inventario:
+    """Crea un inventario con `tamano` productos repartidos entre todas las categorías."""
+    azar = random.Random(semilla)
+    inventario = Inventario(RepositorioMemoria())
+    lote = 50_000
+    for inicio in range(0, tamano, lote):
+        inventario.agregar_productos(
+            (f"Producto {i}", f"Descripción del producto {i}", round(azar.uniform(0.5, 500.0), 2),
+             azar.randint(0, 100), CATEGORIAS[i % len(CATEGORIAS)])
+            for i in range(inicio, min(inicio + lote, tamano)))
+    return inventario
+
+
+def percentil(ordenados: List[float], p: float) -> float:
+    """Retorna el percentil `p` (0-100) de una lista ordenada, con interpolación lineal."""
+    if len(ordenados) == 1:
+        return ordenados[0]
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+def medir(operacion: Callable[[int], Any], repeticiones: int) -> Dict[str, float]:
+    """
+    Mide una operación llamándola `repeticiones` veces con el número de llamada.
+
+    La memoria pico se mide en una pasada aparte, con tracemalloc
+    activo, para no distorsionar los tiempos.
+    """
+    latencias = []
+    gc.collect()
+    reloj = time.perf_counter_ns
+    inicio_total = reloj()
+    for numero in range(repeticiones):
+        inicio = reloj()
+        operacion(numero)
+        latencias.append(reloj() - inicio)
+    total = reloj() - inicio_total
+
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    operacion(repeticiones)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencias.sort()
+    resultado = {
+        "repeticiones": repeticiones,
+        "ops_por_segundo": repeticiones / (total / 1e9),
+        "media_us": sum(latencias) / repeticiones / 1e3,
+    }
+    for p in PERCENTILES:
+        resultado[f"p{p}_us"] = percentil(latencias, p) / 1e3
+    resultado["max_us"] = latencias[-1] / 1e3
+    resultado["memoria_pico_bytes"] = max(0, pico - base)
+    return resultado
+
+
+def _destinos_venta(inventario: Inventario, cantidad: int, azar: random.Random) -> List[int]:
+    """Elige IDs para ventas de una unidad sin pedir más stock del que hay."""
+    productos = inventario.repositorio.obtener_todos()
+    azar.shuffle(productos)
+    destinos: List[int] = []
+    for producto in productos:
+        destinos.extend([producto.id_producto] * min(producto.cantidad, cantidad - len(destinos)))
+        if len(destinos) >= cantidad:
+            break
+    azar.shuffle(destinos)
+    return destinos
+
+
+def operaciones(inventario: Inventario, operaciones_baratas: int,
+                semilla: int = 0) -> List[Tuple[str, Callable[[int], Any], int]]:
+    """
+    Retorna las operaciones a medir como (nombre, función, repeticiones).
+
+    Las consultas que recorren el catálogo se repiten menos veces a
+    medida que crece, para que la suite termine en un tiempo razonable.
+    """
+    azar = random.Random(semilla)
+    repositorio = inventario.repositorio
+    reportes = GeneradorReportes(inventario)
+    tamano = repositorio.contar()
+    ids = [p.id_producto for p in repositorio.obtener_todos()]
+    todos = repositorio.obtener_todos()
+    reporte = reportes.reporte_completo()
+    costosas = max(3, min(operaciones_baratas, 20_000_000 // (tamano * 20)))
+
+    aleatorios = [azar.choice(ids) for _ in range(operaciones_baratas + 1)]
+    ventas = _destinos_venta(inventario, operaciones_baratas + 1, azar)
+    repeticiones_venta = min(operaciones_baratas, len(ventas) - 1)
+
+    return [
+        ("agregar_producto",
+         lambda n: inventario.agregar_producto(f"Nuevo {n}", "Producto nuevo", 9.99, 10,
+                                               CATEGORIAS[n % len(CATEGORIAS)]),
+         operaciones_baratas),
+        ("aumentar_stock", lambda n: inventario.aumentar_stock(aleatorios[n], 1), operaciones_baratas),
+        ("disminuir_stock", lambda n: inventario.disminuir_stock(ventas[n], 1), repeticiones_venta),
+        ("iterar", lambda n: next(repositorio.iterar(), None), operaciones_baratas),
+        ("obtener_productos_bajo_stock", lambda n: inventario.obtener_productos_bajo_stock(10), costosas),
+        ("obtener_por_libreria",
+         lambda n: repositorio.obtener_por_libreria(CATEGORIAS[n % len(CATEGORIAS)]), costosas),
+        ("valor_total_inventario", lambda n: reportes.valor_total_inventario(), operaciones_baratas),
+        ("cantidad_total_productos", lambda n: reportes.cantidad_total_productos(), operaciones_baratas),
+        ("total_items_stock", lambda n: reportes.total_items_stock(), operaciones_baratas),
+        ("producto_mas_caro", lambda n: reportes.producto_mas_caro(), operaciones_baratas),
+        ("producto_mas_barato", lambda n: reportes.producto_mas_barato(), operaciones_baratas),
+        ("resumen_por_libreria", lambda n: reportes.resumen_por_libreria(), operaciones_baratas),
+        ("reporte_completo", lambda n: reportes.reporte_completo(), operaciones_baratas),
+        ("formatear_lista_productos", lambda n: Formateadores.formatear_lista_productos(todos), costosas),
+        ("formatear_reporte", lambda n: Formateadores.formatear_reporte(reporte), operaciones_baratas),
+    ]
+
+
+def ejecutar(tamanos: List[int], operaciones_baratas: int = 2000, semilla: int = 0,
+             progreso: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Ejecuta la suite para cada tamaño de catálogo y retorna los resultados."""
+    resultados: Dict[str, Dict[str, Any]] = {}
+    for tamano in tamanos:
+        inicio = time.perf_counter()
+        inventario = construir_catalogo(tamano, semilla)
+        if progreso:
+            progreso(f"Catálogo de {tamano:,} productos creado en {time.perf_counter() - inicio:.1f} s")
+        resultados[str(tamano)] = por_operacion = {}
+        for nombre, operacion, repeticiones in operaciones(inventario, operaciones_baratas, semilla):
+            por_operacion[nombre] = medir(operacion, repeticiones)
+            if progreso:
+                progreso(f"  {nombre:<30} {por_operacion[nombre]['p50_us']:>12,.1f} µs (p50)")
+        del inventario
+        gc.collect()
+
+    return {
+        "meta": {
+            "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "implementacion": platform.python_implementation(),
+            "plataforma": platform.platform(),
+            "operaciones_baratas": operaciones_baratas,
+            "semilla": semilla,
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar(actual: Dict[str, Any], base: Dict[str, Any], umbral: float) -> List[Dict[str, Any]]:
+    """
+    Compara dos ejecuciones y retorna una fila por operación medida en ambas.
+
+    Una operación es una regresión si su latencia p50 creció más que
+    `umbral` (0.10 = 10 %) respecto de la base.
+    """
+    filas = []
+    for tamano, por_operacion in actual["resultados"].items():
+        anteriores = base["resultados"].get(tamano, {})
+        for nombre, medicion in por_operacion.items():
+            anterior = anteriores.get(nombre)
+            if anterior is None:
+                continue
+            cambio = medicion["p50_us"] / anterior["p50_us"] - 1 if anterior["p50_us"] else 0.0
+            filas.append({
+                "tamano": int(tamano),
+                "operacion": nombre,
+                "base_p50_us": anterior["p50_us"],
+                "actual_p50_us": medicion["p50_us"],
+                "cambio": cambio,
+                "regresion": cambio > umbral,
+            })
+    return filas
+
+
+def main():
+    """Ejecuta la suite desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Suite de benchmarks del inventario")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS))
+    parser.add_argument("--operaciones", type=int, default=2000,
+                        help="Repeticiones de las operaciones que no recorren el catálogo")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", metavar="BASE", help="Resultados JSON guardados con los que comparar")
+    parser.add_argument("--umbral", type=float, default=0.10,
+                        help="Aumento de la latencia p50 considerado regresión (0.10 = 10 %%)")
+    args = parser.parse_args()
+
+    resultado = ejecutar(args.tamanos, args.operaciones, args.semilla,
+                         progreso=lambda texto: print(texto, file=sys.stderr))
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+    else:
+        json.dump(resultado, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        filas = comparar(resultado, base, args.umbral)
+        regresiones = [fila for fila in filas if fila["regresion"]]
+        print(f"\n{'Tamaño':>10} {'Operación':<30} {'Base µs':>12} {'Actual µs':>12} {'Cambio':>8}", file=sys.stderr)
+        for fila in filas:
+            marca = "  REGRESIÓN" if fila["regresion"] else ""
+            print(f"{fila['tamano']:>10,} {fila['operacion']:<30} {fila['base_p50_us']:>12,.1f} "
+                  f"{fila['actual_p50_us']:>12,.1f} {fila['cambio']:>+8.1%}{marca}", file=sys.stderr)
+        print(f"Regresiones por encima de {args.umbral:.0%}: {len(regresiones)}", file=sys.stderr)
+        if regresiones:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
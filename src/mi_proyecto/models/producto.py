@@ -2,6 +2,9 @@
     Define las entidades principales del sistema """
     
 
+import sys
+import threading
+import time
 from datetime import datetime
 from enum import Enum
 
@@ -15,6 +18,9 @@ class Libreria(Enum):
     ORGANIZADORES = "Organizadores"
     ACCESORIOS = "Accesorios"
 
+# Mayor precio admitido; también rechaza NaN e infinito, que no cumplen la comparación
+PRECIO_MAXIMO = sys.float_info.max
+
 class Producto:
     """
     Clase que representa un producto en el inventario
@@ -29,9 +35,19 @@ class Producto:
             descripcion (str): Descripción del producto
             precio (float): Precio del producto
             cantidad (int): Cantidad disponible en inventario
+            libreria (Libreria): Categoría del producto
+            fecha_creacion (str): Fecha de creación, formateada al leerla
         """
+    
+    # Sin __dict__ por instancia: reduce la memoria en cargas masivas
+    __slots__ = ("id_producto", "nombre", "descripcion", "precio", "cantidad",
+                 "libreria", "_creado", "_observador", "_version")
         
     _contador = 1000
+    _lock_contador = threading.Lock()
+    # Locks por franja de IDs que serializan los cambios de cada producto,
+    # para que su versión no pierda incrementos entre escritores concurrentes
+    _candados_cambios = [threading.RLock() for _ in range(256)]
     
     def __init__(self, nombre:str, descripcion:str, precio:float, cantidad: int, libreria:Libreria):
         
@@ -46,31 +62,104 @@ class Producto:
             raise ValueError("El nombre no puede estar vacio")
         if precio < 0:
             raise ValueError("El precio no puede ser negativo")
+        if not precio <= PRECIO_MAXIMO:
+            raise ValueError("El precio debe ser un número finito")
         if cantidad < 0:
             raise ValueError("La cantidad no puede ser negativa")
         
-        Producto._contador +=1
+        with Producto._lock_contador:
+            Producto._contador += 1
+            self.id_producto = Producto._contador
         
-        self.id_producto = Producto._contador
         self.nombre = nombre.strip()
         self.descripcion = descripcion.strip()
         self.precio = precio
         self.cantidad = cantidad
         self.libreria = libreria
-        self.fecha_creacion = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._creado = time.time()
+        # Repositorio al que se notifican los cambios de cantidad y precio
+        self._observador = None
+        # Cuenta los cambios de cantidad y precio: es impar mientras uno está en curso
+        self._version = 0
+    
+    @property
+    def fecha_creacion(self) -> str:
+        """Fecha de creación del producto."""
+        return datetime.fromtimestamp(self._creado).strftime("%Y-%m-%d %H:%M:%S")
+    
+    @property
+    def creado(self) -> float:
+        """Instante de creación como timestamp epoch."""
+        return self._creado
+    
+    @classmethod
+    def sincronizar_contador(cls, minimo: int):
+        """Asegura que los próximos IDs sean mayores que `minimo`."""
+        with Producto._lock_contador:
+            if minimo > Producto._contador:
+                Producto._contador = minimo
+    
+    @classmethod
+    def restaurar(cls, id_producto: int, nombre: str, descripcion: str, precio: float,
+                  cantidad: int, libreria: Libreria, creado: float) -> "Producto":
+        """
+        Reconstruye un producto existente sin asignarle un nuevo ID.
+        
+        Usado por los repositorios que almacenan los datos en otro formato.
+        """
+        producto = cls.__new__(cls)
+        producto.id_producto = id_producto
+        producto.nombre = nombre
+        producto.descripcion = descripcion
+        producto.precio = precio
+        producto.cantidad = cantidad
+        producto.libreria = libreria
+        producto._creado = creado
+        producto._observador = None
+        producto._version = 0
+        return producto
+    
+    def candado_cambios(self) -> threading.RLock:
+        """
+        Lock que se mantiene durante cada cambio de cantidad o precio.
+        
+        Quien lo toma espera a que termine el cambio en curso; los avisos
+        al observador ocurren con este lock tomado, así que no debe tomarse
+        teniendo el lock de un repositorio.
+        """
+        return Producto._candados_cambios[self.id_producto % len(Producto._candados_cambios)]
     
     def actualizar_cantidad(self, cantidad: int) -> bool:
         """Actualiza la cantidad de producto."""
         if cantidad < 0:
             raise ValueError("La cantidad no puede ser negativa")
-        self.cantidad = cantidad
+        with self.candado_cambios():
+            # Impar mientras dura el cambio, incluido el aviso al observador
+            self._version += 1
+            try:
+                anterior = self.cantidad
+                self.cantidad = cantidad
+                if self._observador is not None:
+                    self._observador.notificar_cambio(self, anterior, self.precio)
+            finally:
+                self._version += 1
         return True
     
     def actualizar_precio(self, precio: float) -> bool:
         """Actualiza el precio del producto."""
         if precio < 0:
             raise ValueError("El precio no puede ser negativo")
-        self.precio = precio
+        if not precio <= PRECIO_MAXIMO:
+            raise ValueError("El precio debe ser un número finito")
+        with self.candado_cambios():
+            self._version += 1
+            try:
+                anterior = self.precio
+                self.precio = precio
+                if self._observador is not None:
+                    self._observador.notificar_cambio(self, self.cantidad, anterior)
+            finally:
+                self._version += 1
         return True
     
     def calcular_valor_total(self) -> float:
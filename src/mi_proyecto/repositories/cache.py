@@ -0,0 +1,267 @@
+"""
+Módulo de Repositorios - Caché
+Evita consultar al repositorio de fondo en cada lectura, guardando
+los productos más usados y los resultados de las consultas
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+from ..models.producto import Producto, Libreria
+from .inventario import IRepositorio
+
+
+class RepositorioCache(IRepositorio):
+    """
+    Repositorio que envuelve a otro y cachea sus lecturas.
+
+    `obtener` usa una caché LRU de tamaño acotado. Los listados y los
+    agregados (productos por categoría, por rango de stock, totales,
+    extremos de precio) se guardan junto con la generación en la que se
+    calcularon; toda escritura incrementa la generación, con lo que
+    dejan de ser válidos sin tener que recorrerlos.
+
+    El repositorio se registra como observador de los productos que
+    entrega y reenvía cada aviso de cambio al repositorio de fondo, así
+    que las ventas y reposiciones hechas por Inventario también
+    invalidan la caché.
+    """
+
+    def __init__(self, fondo: IRepositorio, capacidad: int = 10_000):
+        """
+        Inicializa la caché
+
+        Args:
+            fondo: Repositorio cuyas lecturas se cachean
+            capacidad: Máximo de productos guardados para `obtener`
+        """
+        if capacidad <= 0:
+            raise ValueError("La capacidad de la caché debe ser positiva")
+        self.fondo = fondo
+        self.capacidad = capacidad
+        self._lock = threading.Lock()
+        self._productos: "OrderedDict[int, Producto]" = OrderedDict()
+        self._consultas: Dict[Hashable, tuple] = {}
+        self._generacion = 0
+        self._aciertos = 0
+        self._fallos = 0
+        self._aciertos_consultas = 0
+        self._fallos_consultas = 0
+
+    # --- Mantenimiento de la caché ---
+
+    def _adoptar(self, producto: Optional[Producto]) -> Optional[Producto]:
+        """Se registra como observador del producto antes de entregarlo."""
+        if producto is not None:
+            producto._observador = self
+        return producto
+
+    def _guardar(self, producto: Producto, generacion: int):
+        """Guarda un producto leído del fondo si no hubo escrituras mientras tanto."""
+        with self._lock:
+            if generacion != self._generacion:
+                return
+            self._productos[producto.id_producto] = producto
+            self._productos.move_to_end(producto.id_producto)
+            while len(self._productos) > self.capacidad:
+                self._productos.popitem(last=False)
+
+    def _invalidar(self, ids: Iterable[int] = ()):
+        """Descarta los productos indicados y todas las consultas guardadas."""
+        with self._lock:
+            for id_producto in ids:
+                self._productos.pop(id_producto, None)
+            self._generacion += 1
+            self._consultas.clear()
+
+    def _consultar(self, clave: Hashable, consulta: Callable[[], Any]) -> Any:
+        """Retorna el resultado guardado de una consulta o la ejecuta en el fondo."""
+        with self._lock:
+            entrada = self._consultas.get(clave)
+            if entrada is not None and entrada[0] == self._generacion:
+                self._aciertos_consultas += 1
+                return entrada[1]
+            self._fallos_consultas += 1
+            generacion = self._generacion
+        resultado = consulta()
+        with self._lock:
+            if generacion == self._generacion:
+                self._consultas[clave] = (generacion, resultado)
+        return resultado
+
+    def _listado(self, clave: Hashable, consulta: Callable[[], List[Producto]]) -> List[Producto]:
+        """Como _consultar, para consultas que retornan productos."""
+        def adoptar_todos() -> List[Producto]:
+            productos = consulta()
+            for producto in productos:
+                producto._observador = self
+            return productos
+        return list(self._consultar(clave, adoptar_todos))
+
+    def estadisticas(self) -> Dict[str, int]:
+        """Retorna aciertos y fallos de la caché."""
+        with self._lock:
+            return {
+                "aciertos": self._aciertos,
+                "fallos": self._fallos,
+                "aciertos_consultas": self._aciertos_consultas,
+                "fallos_consultas": self._fallos_consultas,
+                "productos_en_cache": len(self._productos),
+                "capacidad": self.capacidad,
+            }
+
+    def limpiar(self):
+        """Vacía la caché sin tocar el repositorio de fondo."""
+        with self._lock:
+            self._productos.clear()
+            self._consultas.clear()
+            self._generacion += 1
+
+    # --- Escrituras ---
+
+    def agregar(self, producto: Producto) -> bool:
+        """Agrega un producto en el fondo."""
+        self.fondo.agregar(producto)
+        self._adoptar(producto)
+        self._invalidar()
+        return True
+
+    def agregar_varios(self, productos: List[Producto]) -> bool:
+        """Agrega varios productos en el fondo."""
+        self.fondo.agregar_varios(productos)
+        for producto in productos:
+            producto._observador = self
+        self._invalidar()
+        return True
+
+    def eliminar(self, id_producto: int) -> bool:
+        """Elimina un producto del fondo y de la caché."""
+        with self._lock:
+            producto = self._productos.get(id_producto)
+        eliminado = self.fondo.eliminar(id_producto)
+        if producto is not None and producto._observador is self:
+            producto._observador = None
+        self._invalidar((id_producto,))
+        return eliminado
+
+    def actualizar_cantidades(self, cantidades: Dict[int, int]) -> bool:
+        """Actualiza varias cantidades en el fondo y descarta esos productos de la caché."""
+        try:
+            return self.fondo.actualizar_cantidades(cantidades)
+        finally:
+            self._invalidar(cantidades)
+
+    def notificar_cambio(self, producto: Producto, cantidad_anterior: int, precio_anterior: float):
+        """Invalida las consultas y reenvía el aviso al repositorio de fondo."""
+        try:
+            self.fondo.notificar_cambio(producto, cantidad_anterior, precio_anterior)
+        finally:
+            with self._lock:
+                # Otro objeto con el mismo ID quedó desactualizado
+                if self._productos.get(producto.id_producto, producto) is not producto:
+                    self._productos[producto.id_producto] = producto
+                self._generacion += 1
+                self._consultas.clear()
+
+    # --- Lecturas ---
+
+    def obtener(self, id_producto: int) -> Optional[Producto]:
+        """Obtiene un producto, desde la caché si está."""
+        with self._lock:
+            producto = self._productos.get(id_producto)
+            if producto is not None:
+                self._productos.move_to_end(id_producto)
+                self._aciertos += 1
+                return producto
+            self._fallos += 1
+            generacion = self._generacion
+        producto = self._adoptar(self.fondo.obtener(id_producto))
+        if producto is not None:
+            self._guardar(producto, generacion)
+        return producto
+
+    def obtener_varios(self, ids: Iterable[int]) -> Dict[int, Producto]:
+        """Obtiene varios productos; solo consulta al fondo los que no están en caché."""
+        encontrados: Dict[int, Producto] = {}
+        faltantes: List[int] = []
+        with self._lock:
+            for id_producto in ids:
+                producto = self._productos.get(id_producto)
+                if producto is not None:
+                    self._productos.move_to_end(id_producto)
+                    encontrados[id_producto] = producto
+                else:
+                    faltantes.append(id_producto)
+            self._aciertos += len(encontrados)
+            self._fallos += len(faltantes)
+            generacion = self._generacion
+        if faltantes:
+            for id_producto, producto in self.fondo.obtener_varios(faltantes).items():
+                encontrados[id_producto] = self._adoptar(producto)
+                self._guardar(producto, generacion)
+        return encontrados
+
+    def obtener_cantidades(self, ids: Iterable[int]) -> Dict[int, int]:
+        """Obtiene el stock actual de los IDs indicados."""
+        return self.fondo.obtener_cantidades(ids)
+
+    def obtener_todos(self) -> List[Producto]:
+        """Obtiene todos los productos."""
+        return self._listado("todos", self.fondo.obtener_todos)
+
+    def iterar(self) -> Iterator[Producto]:
+        """Recorre los productos; usa el listado completo si está en caché."""
+        with self._lock:
+            entrada = self._consultas.get("todos")
+            if entrada is not None and entrada[0] == self._generacion:
+                self._aciertos_consultas += 1
+                return iter(entrada[1])
+        return (self._adoptar(p) for p in self.fondo.iterar())
+
+    def obtener_por_libreria(self, libreria: Libreria) -> List[Producto]:
+        """Obtiene productos por categoría."""
+        return self._listado(("libreria", libreria), lambda: self.fondo.obtener_por_libreria(libreria))
+
+    def obtener_por_rango_stock(self, minimo: Optional[int] = None, maximo: Optional[int] = None) -> List[Producto]:
+        """Obtiene los productos con stock entre minimo y maximo, ordenados por stock."""
+        return self._listado(("rango_stock", minimo, maximo),
+                             lambda: self.fondo.obtener_por_rango_stock(minimo, maximo))
+
+    def contar(self) -> int:
+        """Retorna la cantidad de productos."""
+        return self._consultar("contar", self.fondo.contar)
+
+    def total_items(self) -> int:
+        """Retorna el total de ítems en stock."""
+        return self._consultar("total_items", self.fondo.total_items)
+
+    def valor_total(self) -> float:
+        """Retorna el valor total del stock."""
+        return self._consultar("valor_total", self.fondo.valor_total)
+
+    def producto_mas_caro(self) -> Optional[Producto]:
+        """Obtiene el producto más caro."""
+        return self._consultar("mas_caro", lambda: self._adoptar(self.fondo.producto_mas_caro()))
+
+    def producto_mas_barato(self) -> Optional[Producto]:
+        """Obtiene el producto más barato."""
+        return self._consultar("mas_barato", lambda: self._adoptar(self.fondo.producto_mas_barato()))
+
+    def resumen_por_libreria(self) -> Dict[Libreria, Dict[str, Any]]:
+        """Retorna cantidad de productos, ítems y valor por categoría."""
+        resumen = self._consultar("resumen_libreria", self.fondo.resumen_por_libreria)
+        return {libreria: dict(datos) for libreria, datos in resumen.items()}
+
+    def buscar(self, texto: str, libreria: Optional[Libreria] = None, limite: int = 20) -> List[Producto]:
+        """Busca productos por texto."""
+        return self._listado(("buscar", texto, libreria, limite),
+                             lambda: self.fondo.buscar(texto, libreria, limite))
+
+    def ranking(self, criterio: str, cantidad: int = 10, libreria: Optional[Libreria] = None) -> List[Producto]:
+        """Obtiene un ranking de productos."""
+        return self._listado(("ranking", criterio, cantidad, libreria),
+                             lambda: self.fondo.ranking(criterio, cantidad, libreria))
+
+    def instantanea(self) -> "Instantanea":
+        """Retorna una instantánea del repositorio de fondo."""
+        return self.fondo.instantanea()
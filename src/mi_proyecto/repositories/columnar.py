@@ -0,0 +1,343 @@
+"""
+Módulo de Repositorios - Repositorio columnar
+Almacena los productos en columnas de NumPy y calcula los
+reportes con operaciones vectorizadas
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from ..models.producto import Producto, Libreria
+from .indices import criterio_ranking
+from .inventario import IRepositorio
+
+_LIBRERIAS = tuple(Libreria)
+_CODIGOS = {libreria: codigo for codigo, libreria in enumerate(_LIBRERIAS)}
+
+
+class RepositorioColumnar(IRepositorio):
+    """
+    Repositorio que guarda cada atributo numérico en un arreglo de NumPy.
+    Nombres y descripciones se guardan en listas paralelas.
+
+    Las filas se mantienen ordenadas por ID, por lo que una búsqueda cuesta
+    O(log n). Las eliminaciones marcan la fila como inactiva y las filas
+    inactivas se compactan cuando superan a las activas. Los objetos
+    Producto solo se crean cuando se solicitan y sus cambios de cantidad
+    o precio se escriben de vuelta en las columnas.
+    """
+
+    def __init__(self, capacidad_inicial: int = 1024):
+        """Inicializa las columnas vacías."""
+        capacidad = max(capacidad_inicial, 1)
+        self._ids = np.empty(capacidad, dtype=np.int64)
+        self._precios = np.empty(capacidad, dtype=np.float64)
+        self._cantidades = np.empty(capacidad, dtype=np.int64)
+        self._codigos = np.empty(capacidad, dtype=np.int8)
+        self._creados = np.empty(capacidad, dtype=np.float64)
+        self._activos = np.empty(capacidad, dtype=np.bool_)
+        self._nombres: List[str] = []
+        self._descripciones: List[str] = []
+        self._filas = 0
+        self._inactivas = 0
+
+    def _asegurar_capacidad(self, extra: int):
+        """Duplica la capacidad de las columnas si no alcanza para `extra` filas."""
+        requerida = self._filas + extra
+        capacidad = len(self._ids)
+        if requerida <= capacidad:
+            return
+        while capacidad < requerida:
+            capacidad *= 2
+        for atributo in ("_ids", "_precios", "_cantidades", "_codigos", "_creados", "_activos"):
+            anterior = getattr(self, atributo)
+            nueva = np.empty(capacidad, dtype=anterior.dtype)
+            nueva[:self._filas] = anterior[:self._filas]
+            setattr(self, atributo, nueva)
+
+    def _buscar_fila(self, id_producto: int) -> int:
+        """Retorna la posición donde está o debería estar el ID."""
+        return int(np.searchsorted(self._ids[:self._filas], id_producto))
+
+    def _fila_activa(self, id_producto: int) -> Optional[int]:
+        """Retorna la fila activa del ID o None si no existe."""
+        fila = self._buscar_fila(id_producto)
+        if fila < self._filas and self._ids[fila] == id_producto and self._activos[fila]:
+            return fila
+        return None
+
+    def _producto(self, fila: int) -> Producto:
+        """Crea el objeto Producto de una fila."""
+        producto = Producto.restaurar(
+            int(self._ids[fila]),
+            self._nombres[fila],
+            self._descripciones[fila],
+            float(self._precios[fila]),
+            int(self._cantidades[fila]),
+            _LIBRERIAS[self._codigos[fila]],
+            float(self._creados[fila]),
+        )
+        producto._observador = self
+        return producto
+
+    def _productos(self, filas: np.ndarray) -> List[Producto]:
+        """Crea los objetos Producto de varias filas."""
+        return [self._producto(int(fila)) for fila in filas]
+
+    def _escribir_fila(self, fila: int, producto: Producto):
+        """Copia los datos del producto en la fila indicada."""
+        self._ids[fila] = producto.id_producto
+        self._precios[fila] = producto.precio
+        self._cantidades[fila] = producto.cantidad
+        self._codigos[fila] = _CODIGOS[producto.libreria]
+        self._creados[fila] = producto.creado
+        self._activos[fila] = True
+
+    def agregar(self, producto: Producto) -> bool:
+        """Agrega un producto al repositorio."""
+        fila = self._buscar_fila(producto.id_producto)
+        if fila < self._filas and self._ids[fila] == producto.id_producto:
+            if self._activos[fila]:
+                raise ValueError(f"El producto con ID {producto.id_producto} ya existe")
+            # Reutiliza la fila inactiva del mismo ID
+            self._inactivas -= 1
+            self._nombres[fila] = producto.nombre
+            self._descripciones[fila] = producto.descripcion
+        else:
+            self._asegurar_capacidad(1)
+            if fila < self._filas:
+                # Desplaza las filas para conservar el orden por ID
+                for columna in (self._ids, self._precios, self._cantidades, self._codigos,
+                                self._creados, self._activos):
+                    columna[fila + 1:self._filas + 1] = columna[fila:self._filas]
+            self._nombres.insert(fila, producto.nombre)
+            self._descripciones.insert(fila, producto.descripcion)
+            self._filas += 1
+        self._escribir_fila(fila, producto)
+        producto._observador = self
+        return True
+
+    def agregar_varios(self, productos: List[Producto]) -> bool:
+        """
+        Agrega varios productos.
+
+        Si los IDs vienen en orden creciente y son mayores que el último
+        almacenado, las columnas se llenan en bloque; si no, se agregan uno a uno.
+        """
+        cantidad = len(productos)
+        if cantidad == 0:
+            return True
+        ids = np.fromiter((p.id_producto for p in productos), dtype=np.int64, count=cantidad)
+        ordenados = bool(np.all(ids[1:] > ids[:-1]))
+        if not ordenados or (self._filas and ids[0] <= self._ids[self._filas - 1]):
+            return super().agregar_varios(productos)
+
+        self._asegurar_capacidad(cantidad)
+        inicio, fin = self._filas, self._filas + cantidad
+        self._ids[inicio:fin] = ids
+        self._precios[inicio:fin] = np.fromiter((p.precio for p in productos), dtype=np.float64, count=cantidad)
+        self._cantidades[inicio:fin] = np.fromiter((p.cantidad for p in productos), dtype=np.int64, count=cantidad)
+        self._codigos[inicio:fin] = np.fromiter((_CODIGOS[p.libreria] for p in productos), dtype=np.int8, count=cantidad)
+        self._creados[inicio:fin] = np.fromiter((p.creado for p in productos), dtype=np.float64, count=cantidad)
+        self._activos[inicio:fin] = True
+        self._nombres.extend(p.nombre for p in productos)
+        self._descripciones.extend(p.descripcion for p in productos)
+        self._filas = fin
+        for producto in productos:
+            producto._observador = self
+        return True
+
+    def obtener(self, id_producto: int) -> Optional[Producto]:
+        """Obtiene un producto por su ID."""
+        fila = self._fila_activa(id_producto)
+        return None if fila is None else self._producto(fila)
+
+    def _filas_de(self, ids: np.ndarray) -> np.ndarray:
+        """Retorna la fila de cada ID, o -1 si no existe o está inactivo."""
+        filas = np.searchsorted(self._ids[:self._filas], ids)
+        validas = filas < self._filas
+        filas[~validas] = 0
+        validas &= self._ids[:self._filas][filas] == ids
+        validas &= self._activos[:self._filas][filas]
+        filas[~validas] = -1
+        return filas
+
+    def obtener_varios(self, ids: Iterable[int]) -> Dict[int, Producto]:
+        """Obtiene los productos existentes entre los IDs indicados."""
+        ids = np.fromiter(ids, dtype=np.int64)
+        if self._filas == 0 or len(ids) == 0:
+            return {}
+        filas = self._filas_de(ids)
+        return {int(i): self._producto(int(f)) for i, f in zip(ids, filas) if f >= 0}
+
+    def obtener_cantidades(self, ids: Iterable[int]) -> Dict[int, int]:
+        """Obtiene el stock actual de los IDs indicados sin crear objetos Producto."""
+        ids = np.fromiter(ids, dtype=np.int64)
+        if self._filas == 0 or len(ids) == 0:
+            return {}
+        filas = self._filas_de(ids)
+        encontrados = filas >= 0
+        return dict(zip(ids[encontrados].tolist(), self._cantidades[filas[encontrados]].tolist()))
+
+    def actualizar_cantidades(self, cantidades: Dict[int, int]) -> bool:
+        """Asigna la nueva cantidad de varios productos en una sola operación."""
+        if not cantidades:
+            return True
+        ids = np.fromiter(cantidades.keys(), dtype=np.int64, count=len(cantidades))
+        filas = self._filas_de(ids) if self._filas else np.full(len(ids), -1)
+        if np.any(filas < 0):
+            faltante = int(ids[np.argmax(filas < 0)])
+            raise ValueError(f"Producto con ID {faltante} no existe")
+        self._cantidades[filas] = np.fromiter(cantidades.values(), dtype=np.int64, count=len(cantidades))
+        return True
+
+    def obtener_todos(self) -> List[Producto]:
+        """Obtiene todos los productos."""
+        return self._productos(np.flatnonzero(self._activos[:self._filas]))
+
+    def iterar(self) -> Iterator[Producto]:
+        """Recorre los productos en orden de ID, creando cada objeto al llegar a su fila."""
+        fila = 0
+        while fila < self._filas:
+            if self._activos[fila]:
+                yield self._producto(fila)
+            fila += 1
+
+    def eliminar(self, id_producto: int) -> bool:
+        """Elimina un producto del repositorio."""
+        fila = self._fila_activa(id_producto)
+        if fila is None:
+            return False
+        self._activos[fila] = False
+        self._inactivas += 1
+        if self._inactivas * 2 > self._filas:
+            self._compactar()
+        return True
+
+    def _compactar(self):
+        """Descarta las filas inactivas."""
+        activos = self._activos[:self._filas].copy()
+        total = int(activos.sum())
+        for columna in (self._ids, self._precios, self._cantidades, self._codigos, self._creados):
+            columna[:total] = columna[:self._filas][activos]
+        self._activos[:total] = True
+        self._nombres = [v for v, activo in zip(self._nombres, activos) if activo]
+        self._descripciones = [v for v, activo in zip(self._descripciones, activos) if activo]
+        self._filas = total
+        self._inactivas = 0
+
+    def notificar_cambio(self, producto: Producto, cantidad_anterior: int, precio_anterior: float):
+        """
+        Escribe en las columnas la nueva cantidad o precio del producto.
+
+        Solo se escribe la columna que cambió: el objeto puede ser una
+        copia creada antes, cuyo otro campo ya no coincide con la fila.
+        """
+        fila = self._fila_activa(producto.id_producto)
+        if fila is not None:
+            if producto.cantidad != cantidad_anterior:
+                self._cantidades[fila] = producto.cantidad
+            if producto.precio != precio_anterior:
+                self._precios[fila] = producto.precio
+
+    def _columna(self, columna: np.ndarray) -> np.ndarray:
+        """Retorna la columna restringida a las filas activas, sin copiar si no hay inactivas."""
+        if self._inactivas == 0:
+            return columna[:self._filas]
+        return columna[:self._filas][self._activos[:self._filas]]
+
+    def _filas_activas(self, mascara: np.ndarray) -> np.ndarray:
+        """Convierte una máscara sobre todas las filas en índices de filas activas."""
+        if self._inactivas:
+            mascara &= self._activos[:self._filas]
+        return np.flatnonzero(mascara)
+
+    def contar(self) -> int:
+        """Retorna la cantidad de productos."""
+        return self._filas - self._inactivas
+
+    def total_items(self) -> int:
+        """Calcula el total de ítems en stock."""
+        return int(self._columna(self._cantidades).sum())
+
+    def valor_total(self) -> float:
+        """Calcula el valor total del stock."""
+        return float(np.dot(self._columna(self._precios), self._columna(self._cantidades)))
+
+    def _extremo_precio(self, mas_caro: bool) -> Optional[Producto]:
+        """Obtiene el producto de mayor o menor precio; en empate, el de menor ID."""
+        if self.contar() == 0:
+            return None
+        precios = self._precios[:self._filas]
+        if self._inactivas:
+            relleno = -np.inf if mas_caro else np.inf
+            precios = np.where(self._activos[:self._filas], precios, relleno)
+        fila = int(np.argmax(precios) if mas_caro else np.argmin(precios))
+        return self._producto(fila)
+
+    def producto_mas_caro(self) -> Optional[Producto]:
+        """Obtiene el producto más caro."""
+        return self._extremo_precio(mas_caro=True)
+
+    def producto_mas_barato(self) -> Optional[Producto]:
+        """Obtiene el producto más barato."""
+        return self._extremo_precio(mas_caro=False)
+
+    def obtener_por_rango_stock(self, minimo: Optional[int] = None, maximo: Optional[int] = None) -> List[Producto]:
+        """Obtiene los productos con stock entre minimo y maximo, ordenados por stock."""
+        cantidades = self._cantidades[:self._filas]
+        mascara = np.ones(self._filas, dtype=np.bool_)
+        if minimo is not None:
+            mascara &= cantidades >= minimo
+        if maximo is not None:
+            mascara &= cantidades <= maximo
+        filas = self._filas_activas(mascara)
+        # Las filas ya están ordenadas por ID; el orden estable conserva el desempate
+        filas = filas[np.argsort(cantidades[filas], kind="stable")]
+        return self._productos(filas)
+
+    def obtener_por_libreria(self, libreria: Libreria) -> List[Producto]:
+        """Obtiene productos por categoría."""
+        mascara = self._codigos[:self._filas] == _CODIGOS[libreria]
+        return self._productos(self._filas_activas(mascara))
+
+    def resumen_por_libreria(self) -> Dict[Libreria, Dict[str, Any]]:
+        """Retorna cantidad de productos, ítems y valor por categoría."""
+        codigos = self._columna(self._codigos)
+        cantidades = self._columna(self._cantidades)
+        valores = self._columna(self._precios) * cantidades
+        minimo = len(_LIBRERIAS)
+        productos = np.bincount(codigos, minlength=minimo)
+        items = np.bincount(codigos, weights=cantidades, minlength=minimo)
+        valor = np.bincount(codigos, weights=valores, minlength=minimo)
+        return {
+            libreria: {
+                "total_productos": int(productos[codigo]),
+                "total_items": int(items[codigo]),
+                "valor_total": float(valor[codigo]),
+            }
+            for codigo, libreria in enumerate(_LIBRERIAS)
+        }
+
+    def ranking(self, criterio: str, cantidad: int = 10, libreria: Optional[Libreria] = None) -> List[Producto]:
+        """Obtiene los productos de mayor valor según el criterio; en empate, el de menor ID."""
+        criterio_ranking(criterio)
+        mascara = np.ones(self._filas, dtype=np.bool_)
+        if libreria is not None:
+            mascara &= self._codigos[:self._filas] == _CODIGOS[libreria]
+        filas = self._filas_activas(mascara)
+        if cantidad <= 0 or len(filas) == 0:
+            return []
+        if criterio == "precio":
+            valores = self._precios[filas]
+        elif criterio == "cantidad":
+            valores = self._cantidades[filas]
+        else:
+            valores = self._precios[filas] * self._cantidades[filas]
+        if cantidad < len(filas):
+            # Todos los empatados con el k-ésimo valor entran como candidatos
+            umbral = np.partition(valores, len(filas) - cantidad)[len(filas) - cantidad]
+            candidatos = np.flatnonzero(valores >= umbral)
+            filas, valores = filas[candidatos], valores[candidatos]
+        # Las filas ya están ordenadas por ID; el orden estable conserva el desempate
+        orden = np.argsort(-valores, kind="stable")[:cantidad]
+        return self._productos(filas[orden])
@@ -0,0 +1,761 @@
+"""
+Módulo de Repositorios - Índices
+Estructuras auxiliares que los repositorios mantienen al día
+a medida que se agregan, eliminan y modifican productos
+"""
+
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from ..models.producto import Producto, Libreria
+
+# Valores pendientes que SumaExacta acumula antes de compactarlos
+_PARTES_MAXIMAS = 4096
+
+_PALABRA = re.compile(r"\w+")
+
+# Por debajo de este tamaño conviene recorrer la palabra exacta menos
+# frecuente de la consulta en lugar de las palabras que empiezan con el prefijo
+_RECORRIDO_MAXIMO = 2048
+
+# Criterios de los rankings: valor por el que se ordena cada producto
+CRITERIOS_RANKING: Dict[str, Callable[[Producto], float]] = {
+    "precio": lambda p: p.precio,
+    "valor": lambda p: p.calcular_valor_total(),
+    "cantidad": lambda p: p.cantidad,
+}
+
+
+def normalizar_texto(texto: str) -> str:
+    """Pasa el texto a minúsculas y le quita acentos y diacríticos."""
+    if texto.isascii():
+        return texto.lower()
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Divide el texto normalizado en palabras."""
+    return _PALABRA.findall(normalizar_texto(texto))
+
+
+def palabras_producto(producto: Producto) -> Set[str]:
+    """Palabras distintas del nombre y la descripción de un producto."""
+    return set(tokenizar(f"{producto.nombre} {producto.descripcion}"))
+
+
+def preparar_consulta(texto: str) -> Optional[Tuple[Set[str], str]]:
+    """
+    Convierte el texto buscado en (palabras exactas, prefijo).
+
+    Todas las palabras deben aparecer completas salvo la última, que
+    basta con que sea el comienzo de una palabra, como al escribir.
+    Retorna None si el texto no tiene palabras.
+    """
+    palabras = tokenizar(texto)
+    if not palabras:
+        return None
+    return set(palabras[:-1]), palabras[-1]
+
+
+def criterio_ranking(criterio: str) -> Callable[[Producto], float]:
+    """Retorna la función de un criterio de ranking o lanza ValueError."""
+    try:
+        return CRITERIOS_RANKING[criterio]
+    except KeyError:
+        raise ValueError(f"Criterio de ranking inválido: {criterio!r}. "
+                         f"Opciones: {', '.join(CRITERIOS_RANKING)}") from None
+
+
+def palabra_coincidente(producto: Producto, exactas: Set[str], prefijo: str) -> Optional[str]:
+    """
+    Retorna la menor palabra del producto que empieza con el prefijo,
+    o None si el producto no coincide con la consulta.
+
+    Los resultados de una búsqueda se ordenan por esta palabra y luego por ID.
+    """
+    palabras = palabras_producto(producto)
+    if not exactas <= palabras:
+        return None
+    return min((p for p in palabras if p.startswith(prefijo)), default=None)
+
+
+class SumaExacta:
+    """
+    Acumulador de floats sin error de redondeo.
+
+    Permite sumar y restar valores indefinidamente sin que el total
+    se desvíe; el resultado equivale a math.fsum de los valores vivos.
+
+    Sumar o restar solo agrega el valor a una lista: el costo exacto se
+    paga al leer el total, o cuando la lista crece demasiado, y consiste
+    en reducirla a unos pocos floats cuya suma exacta es el total.
+
+    Los infinitos (p. ej. un valor en stock que desborda) se cuentan
+    aparte, así que restarlos devuelve el total finito; un NaN deja el
+    total en NaN de forma permanente, igual que sum().
+    """
+
+    __slots__ = ("_partes", "_infinitos", "_nan")
+
+    def __init__(self):
+        """Inicializa el acumulador en cero."""
+        # Floats finitos cuya suma exacta es el total acumulado
+        self._partes: List[float] = []
+        # Infinitos positivos menos negativos acumulados
+        self._infinitos = 0
+        self._nan = False
+
+    def _compactar(self):
+        """
+        Reemplaza las partes por una expansión equivalente y corta.
+
+        math.fsum retorna la suma exacta redondeada; se agrega su opuesto
+        y se vuelve a sumar hasta que el resto exacto es cero. Cada resto
+        es mucho menor que el anterior, así que bastan pocas pasadas.
+        """
+        try:
+            resto = math.fsum(self._partes)
+        except ValueError:
+            # inf - inf
+            resto = math.nan
+        except OverflowError:
+            resto = math.inf
+        if not math.isfinite(resto):
+            self._separar_no_finitos()
+            try:
+                resto = math.fsum(self._partes)
+            except OverflowError:
+                resto = math.inf
+            if not math.isfinite(resto):
+                # La suma de las partes finitas desborda: no hay expansión
+                # en floats, así que se conservan tal cual
+                return
+        partes = self._partes
+        expansion = []
+        while resto != 0.0:
+            expansion.append(resto)
+            partes.append(-resto)
+            resto = math.fsum(partes)
+        self._partes = expansion
+
+    def _separar_no_finitos(self):
+        """Pasa los infinitos y NaN de las partes a sus contadores."""
+        finitas = []
+        for parte in self._partes:
+            if math.isfinite(parte):
+                finitas.append(parte)
+            elif parte != parte:
+                self._nan = True
+            else:
+                self._infinitos += 1 if parte > 0 else -1
+        self._partes = finitas
+
+    def sumar(self, valor: float):
+        """Suma un valor al acumulador."""
+        self._partes.append(valor)
+        if len(self._partes) > _PARTES_MAXIMAS:
+            self._compactar()
+
+    def sumar_varios(self, valores: Iterable[float]):
+        """Suma varios valores al acumulador."""
+        self._partes.extend(valores)
+        if len(self._partes) > _PARTES_MAXIMAS:
+            self._compactar()
+
+    def restar(self, valor: float):
+        """Resta un valor del acumulador."""
+        self._partes.append(-valor)
+        if len(self._partes) > _PARTES_MAXIMAS:
+            self._compactar()
+
+    def reemplazar(self, anterior: float, nuevo: float):
+        """Resta `anterior` y suma `nuevo` en un solo paso."""
+        partes = self._partes
+        partes.append(-anterior)
+        partes.append(nuevo)
+        if len(partes) > _PARTES_MAXIMAS:
+            self._compactar()
+
+    def combinar(self, otra: "SumaExacta"):
+        """Suma al acumulador el total de otro, sin perder exactitud."""
+        self._infinitos += otra._infinitos
+        self._nan = self._nan or otra._nan
+        self.sumar_varios(list(otra._partes))
+
+    def copiar(self) -> "SumaExacta":
+        """Retorna un acumulador independiente con el mismo total."""
+        copia = SumaExacta()
+        copia._partes = list(self._partes)
+        copia._infinitos = self._infinitos
+        copia._nan = self._nan
+        return copia
+
+    def valor(self) -> float:
+        """Retorna el total redondeado al float más cercano."""
+        self._compactar()
+        if self._nan:
+            return math.nan
+        if self._infinitos:
+            return math.inf if self._infinitos > 0 else -math.inf
+        try:
+            return math.fsum(self._partes)
+        except OverflowError:
+            # Partes sin compactar por desborde: la mitad de cada una es
+            # exacta, y el doble del total desborda solo si el total lo hace
+            return math.fsum([parte * 0.5 for parte in self._partes]) * 2
+
+
+class MonticuloPerezoso:
+    """
+    Montículo con eliminación perezosa.
+
+    Las entradas obsoletas no se borran al cambiar el producto: se
+    descartan cuando llegan a la cima. El montículo se reconstruye
+    cuando las entradas obsoletas superan a las vivas.
+    """
+
+    def __init__(self, productos: Dict[int, Producto], clave: Callable[[Producto], float]):
+        """
+        Inicializa el montículo.
+
+        Args:
+            productos: Diccionario vivo de productos por ID
+            clave: Función de orden; la cima es el producto de menor clave
+        """
+        self._productos = productos
+        self._clave = clave
+        self._entradas: List[Tuple[float, int]] = []
+
+    def insertar(self, producto: Producto):
+        """Registra el valor actual de un producto."""
+        heapq.heappush(self._entradas, (self._clave(producto), producto.id_producto))
+        if len(self._entradas) > 2 * len(self._productos) + 64:
+            self.reconstruir()
+
+    def insertar_varios(self, productos: List[Producto]):
+        """Registra el valor actual de varios productos."""
+        clave = self._clave
+        entradas = [(clave(p), p.id_producto) for p in productos]
+        if len(entradas) * 8 < len(self._entradas):
+            for entrada in entradas:
+                heapq.heappush(self._entradas, entrada)
+        else:
+            self._entradas.extend(entradas)
+            heapq.heapify(self._entradas)
+        if len(self._entradas) > 2 * len(self._productos) + 64:
+            self.reconstruir()
+
+    def _es_vigente(self, entrada: Tuple[float, int]) -> bool:
+        """Indica si la entrada refleja el estado actual del producto."""
+        producto = self._productos.get(entrada[1])
+        return producto is not None and self._clave(producto) == entrada[0]
+
+    def cima(self) -> Optional[Producto]:
+        """Obtiene el producto de menor clave, descartando entradas obsoletas."""
+        entradas = self._entradas
+        while entradas:
+            if self._es_vigente(entradas[0]):
+                return self._productos[entradas[0][1]]
+            heapq.heappop(entradas)
+        return None
+
+    def primeros(self, cantidad: int) -> List[Producto]:
+        """
+        Obtiene los `cantidad` productos de menor clave, en orden.
+
+        Extrae entradas hasta reunir `cantidad` vigentes y luego devuelve
+        solo esas al montículo: las obsoletas que salen en el camino se
+        descartan para siempre, así que el costo es O(k log n) más el de
+        las entradas obsoletas, ya pagado al insertarlas.
+        """
+        entradas = self._entradas
+        vigentes: List[Tuple[float, int]] = []
+        vistos: Set[int] = set()
+        while entradas and len(vigentes) < cantidad:
+            entrada = heapq.heappop(entradas)
+            # Un producto que volvió a un valor anterior tiene dos entradas vigentes iguales
+            if entrada[1] not in vistos and self._es_vigente(entrada):
+                vistos.add(entrada[1])
+                vigentes.append(entrada)
+        for entrada in vigentes:
+            heapq.heappush(entradas, entrada)
+        return [self._productos[id_producto] for _, id_producto in vigentes]
+
+    def reconstruir(self):
+        """Reconstruye el montículo a partir de los productos vivos."""
+        clave = self._clave
+        self._entradas = [(clave(p), id_producto) for id_producto, p in self._productos.items()]
+        heapq.heapify(self._entradas)
+
+
+class AgregadosInventario:
+    """
+    Totales del inventario actualizados de forma incremental.
+
+    Mantiene el total de ítems, el valor total, la cantidad de productos
+    y los extremos de precio sin recorrer el catálogo.
+    """
+
+    def __init__(self, productos: Dict[int, Producto]):
+        """Inicializa los agregados sobre el diccionario vivo de productos."""
+        self._productos = productos
+        self.total_items = 0
+        self._valor = SumaExacta()
+        self._mas_caros = MonticuloPerezoso(productos, lambda p: -p.precio)
+        self._mas_baratos = MonticuloPerezoso(productos, lambda p: p.precio)
+
+    def agregar(self, producto: Producto):
+        """Incorpora un producto recién agregado."""
+        self.total_items += producto.cantidad
+        self._valor.sumar(producto.calcular_valor_total())
+        self._mas_caros.insertar(producto)
+        self._mas_baratos.insertar(producto)
+
+    def agregar_varios(self, productos: List[Producto]):
+        """Incorpora varios productos recién agregados."""
+        self.total_items += sum(p.cantidad for p in productos)
+        self._valor.sumar_varios(p.calcular_valor_total() for p in productos)
+        self._mas_caros.insertar_varios(productos)
+        self._mas_baratos.insertar_varios(productos)
+
+    def eliminar(self, producto: Producto):
+        """Descuenta un producto eliminado."""
+        self.total_items -= producto.cantidad
+        self._valor.restar(producto.calcular_valor_total())
+
+    def actualizar(self, producto: Producto, cantidad_anterior: int, precio_anterior: float,
+                   cantidad: int, precio: float):
+        """Refleja un cambio de cantidad o precio."""
+        self.total_items += cantidad - cantidad_anterior
+        self._valor.reemplazar(precio_anterior * cantidad_anterior, precio * cantidad)
+        if precio != precio_anterior:
+            self._mas_caros.insertar(producto)
+            self._mas_baratos.insertar(producto)
+
+    @property
+    def valor_total(self) -> float:
+        """Valor total del inventario."""
+        return self._valor.valor()
+
+    def suma_valor(self) -> SumaExacta:
+        """Copia de la suma exacta del valor total."""
+        return self._valor.copiar()
+
+    def producto_mas_caro(self) -> Optional[Producto]:
+        """Obtiene el producto más caro."""
+        return self._mas_caros.cima()
+
+    def producto_mas_barato(self) -> Optional[Producto]:
+        """Obtiene el producto más barato."""
+        return self._mas_baratos.cima()
+
+
+class ListaOrdenada:
+    """
+    Lista ordenada particionada en sublistas de tamaño acotado.
+
+    Insertar o quitar un elemento cuesta O(log n) búsquedas más el
+    desplazamiento de una sola sublista, en lugar de toda la lista.
+    """
+
+    _CARGA = 512
+
+    def __init__(self):
+        """Inicializa la lista vacía."""
+        self._sublistas: List[list] = []
+        self._maximos: list = []
+        self._largo = 0
+
+    def __len__(self) -> int:
+        """Cantidad de elementos."""
+        return self._largo
+
+    def agregar(self, valor):
+        """Inserta un valor manteniendo el orden."""
+        self._largo += 1
+        if not self._sublistas:
+            self._sublistas.append([valor])
+            self._maximos.append(valor)
+            return
+        i = bisect.bisect_left(self._maximos, valor)
+        if i == len(self._maximos):
+            i -= 1
+        sublista = self._sublistas[i]
+        bisect.insort(sublista, valor)
+        self._maximos[i] = sublista[-1]
+        if len(sublista) > 2 * self._CARGA:
+            self._sublistas[i:i + 1] = [sublista[:self._CARGA], sublista[self._CARGA:]]
+            self._maximos[i:i + 1] = [sublista[self._CARGA - 1], sublista[-1]]
+
+    def extender(self, valores: list):
+        """Inserta muchos valores reordenando toda la lista una sola vez."""
+        todos = [v for sublista in self._sublistas for v in sublista]
+        todos.extend(valores)
+        todos.sort()
+        carga = self._CARGA
+        self._sublistas = [todos[i:i + carga] for i in range(0, len(todos), carga)]
+        self._maximos = [sublista[-1] for sublista in self._sublistas]
+        self._largo = len(todos)
+
+    def quitar(self, valor) -> bool:
+        """Quita un valor si está presente."""
+        i = bisect.bisect_left(self._maximos, valor)
+        if i == len(self._maximos):
+            return False
+        sublista = self._sublistas[i]
+        j = bisect.bisect_left(sublista, valor)
+        if j == len(sublista) or sublista[j] != valor:
+            return False
+        del sublista[j]
+        self._largo -= 1
+        if sublista:
+            self._maximos[i] = sublista[-1]
+        else:
+            del self._sublistas[i]
+            del self._maximos[i]
+        return True
+
+    def desde(self, inicio=None):
+        """Itera en orden los valores mayores o iguales a inicio."""
+        if inicio is None:
+            i = j = 0
+        else:
+            i = bisect.bisect_left(self._maximos, inicio)
+            j = bisect.bisect_left(self._sublistas[i], inicio) if i < len(self._sublistas) else 0
+        for sublista in self._sublistas[i:i + 1]:
+            yield from sublista[j:]
+        for sublista in self._sublistas[i + 1:]:
+            yield from sublista
+
+
+class IndiceStock:
+    """
+    Índice de productos ordenado por cantidad en stock.
+
+    Guarda pares (cantidad, id) en una ListaOrdenada, de modo que una
+    consulta por rango cuesta O(log n + k).
+    """
+
+    def __init__(self, productos: Dict[int, Producto]):
+        """Inicializa el índice sobre el diccionario vivo de productos."""
+        self._productos = productos
+        self._orden = ListaOrdenada()
+
+    def agregar(self, producto: Producto):
+        """Inserta un producto en el índice."""
+        self._orden.agregar((producto.cantidad, producto.id_producto))
+
+    def agregar_varios(self, productos: List[Producto]):
+        """Inserta varios productos; los lotes grandes se ordenan de una vez."""
+        entradas = [(p.cantidad, p.id_producto) for p in productos]
+        if len(entradas) * 32 < len(self._orden):
+            for entrada in entradas:
+                self._orden.agregar(entrada)
+        else:
+            self._orden.extender(entradas)
+
+    def reconstruir(self):
+        """Reconstruye el índice a partir de los productos vivos."""
+        self._orden = ListaOrdenada()
+        self._orden.extender([(p.cantidad, i) for i, p in self._productos.items()])
+
+    def eliminar(self, producto: Producto):
+        """Quita un producto del índice."""
+        self._orden.quitar((producto.cantidad, producto.id_producto))
+
+    def actualizar(self, producto: Producto, cantidad_anterior: int, cantidad: int):
+        """Reubica un producto cuya cantidad cambió."""
+        if cantidad != cantidad_anterior:
+            self._orden.quitar((cantidad_anterior, producto.id_producto))
+            self._orden.agregar((cantidad, producto.id_producto))
+
+    def rango(self, minimo: Optional[int] = None, maximo: Optional[int] = None) -> List[Producto]:
+        """
+        Obtiene los productos con stock entre minimo y maximo (inclusive).
+
+        Returns:
+            List[Producto]: Productos ordenados por cantidad y luego por ID
+        """
+        productos = self._productos
+        resultado = []
+        for cantidad, id_producto in self._orden.desde(None if minimo is None else (minimo,)):
+            if maximo is not None and cantidad > maximo:
+                break
+            resultado.append(productos[id_producto])
+        return resultado
+
+
+class _GrupoLibreria:
+    """Productos y totales de una categoría."""
+
+    __slots__ = ("productos", "items", "valor")
+
+    def __init__(self):
+        """Inicializa el grupo vacío."""
+        self.productos: Dict[int, Producto] = {}
+        self.items = 0
+        self.valor = SumaExacta()
+
+
+class IndiceLibreria:
+    """
+    Índice secundario de productos por categoría.
+
+    Cada categoría tiene su propio diccionario id -> Producto, junto con
+    el total de ítems y el valor en stock de la categoría.
+    """
+
+    def __init__(self):
+        """Inicializa un grupo vacío por cada categoría."""
+        self._grupos: Dict[Libreria, _GrupoLibreria] = {lib: _GrupoLibreria() for lib in Libreria}
+
+    def agregar(self, producto: Producto):
+        """Incorpora un producto a su categoría."""
+        grupo = self._grupos[producto.libreria]
+        grupo.productos[producto.id_producto] = producto
+        grupo.items += producto.cantidad
+        grupo.valor.sumar(producto.calcular_valor_total())
+
+    def agregar_varios(self, productos: List[Producto]):
+        """Incorpora varios productos, acumulando los totales por categoría."""
+        por_libreria: Dict[Libreria, List[Producto]] = {}
+        for producto in productos:
+            por_libreria.setdefault(producto.libreria, []).append(producto)
+        for libreria, lote in por_libreria.items():
+            grupo = self._grupos[libreria]
+            grupo.productos.update((p.id_producto, p) for p in lote)
+            grupo.items += sum(p.cantidad for p in lote)
+            grupo.valor.sumar_varios(p.calcular_valor_total() for p in lote)
+
+    def eliminar(self, producto: Producto):
+        """Quita un producto de su categoría."""
+        grupo = self._grupos[producto.libreria]
+        del grupo.productos[producto.id_producto]
+        grupo.items -= producto.cantidad
+        grupo.valor.restar(producto.calcular_valor_total())
+
+    def actualizar(self, producto: Producto, cantidad_anterior: int, precio_anterior: float,
+                   cantidad: int, precio: float):
+        """Refleja un cambio de cantidad o precio en los totales de la categoría."""
+        grupo = self._grupos[producto.libreria]
+        grupo.items += cantidad - cantidad_anterior
+        grupo.valor.reemplazar(precio_anterior * cantidad_anterior, precio * cantidad)
+
+    def productos(self, libreria: Libreria) -> List[Producto]:
+        """Obtiene los productos de una categoría."""
+        return list(self._grupos[libreria].productos.values())
+
+    def diccionario(self, libreria: Libreria) -> Dict[int, Producto]:
+        """Retorna el diccionario vivo id -> Producto de una categoría."""
+        return self._grupos[libreria].productos
+
+    def resumen(self) -> Dict[Libreria, Dict[str, Any]]:
+        """Retorna cantidad de productos, ítems y valor por categoría."""
+        return {
+            libreria: {
+                "total_productos": len(grupo.productos),
+                "total_items": grupo.items,
+                "valor_total": grupo.valor.valor(),
+            }
+            for libreria, grupo in self._grupos.items()
+        }
+
+
+class IndiceRanking:
+    """
+    Rankings de productos por precio, valor en stock y cantidad.
+
+    Cada combinación de criterio y categoría (o el catálogo completo)
+    usa un MonticuloPerezoso que se crea con la primera consulta y desde
+    entonces se mantiene al día: cada cambio inserta una entrada nueva y
+    la anterior queda obsoleta. Las consultas cuestan O(k log n).
+    """
+
+    def __init__(self, productos: Dict[int, Producto], indice_libreria: IndiceLibreria):
+        """Inicializa el índice sobre el diccionario vivo de productos y el índice de categorías."""
+        self._productos = productos
+        self._indice_libreria = indice_libreria
+        self._monticulos: Dict[Tuple[str, Optional[Libreria]], MonticuloPerezoso] = {}
+
+    def _monticulo(self, criterio: str, libreria: Optional[Libreria]) -> MonticuloPerezoso:
+        """Obtiene el montículo de un criterio y categoría, creándolo si hace falta."""
+        monticulo = self._monticulos.get((criterio, libreria))
+        if monticulo is None:
+            valor = criterio_ranking(criterio)
+            productos = self._productos if libreria is None else self._indice_libreria.diccionario(libreria)
+            monticulo = MonticuloPerezoso(productos, lambda p: -valor(p))
+            monticulo.reconstruir()
+            self._monticulos[(criterio, libreria)] = monticulo
+        return monticulo
+
+    def agregar(self, producto: Producto):
+        """Incorpora un producto recién agregado a los rankings creados."""
+        for (_, libreria), monticulo in self._monticulos.items():
+            if libreria is None or libreria == producto.libreria:
+                monticulo.insertar(producto)
+
+    def agregar_varios(self, productos: List[Producto]):
+        """Incorpora varios productos recién agregados a los rankings creados."""
+        por_libreria: Dict[Libreria, List[Producto]] = {}
+        for producto in productos:
+            por_libreria.setdefault(producto.libreria, []).append(producto)
+        for (_, libreria), monticulo in self._monticulos.items():
+            if libreria is None:
+                monticulo.insertar_varios(productos)
+            elif libreria in por_libreria:
+                monticulo.insertar_varios(por_libreria[libreria])
+
+    def actualizar(self, producto: Producto, cantidad_anterior: int, precio_anterior: float,
+                   cantidad: int, precio: float):
+        """Registra el nuevo valor de un producto en los rankings afectados por el cambio."""
+        cambio_precio = precio != precio_anterior
+        cambio_cantidad = cantidad != cantidad_anterior
+        for (criterio, libreria), monticulo in self._monticulos.items():
+            if libreria is not None and libreria != producto.libreria:
+                continue
+            if (cambio_precio and criterio != "cantidad") or (cambio_cantidad and criterio != "precio"):
+                monticulo.insertar(producto)
+
+    def primeros(self, criterio: str, cantidad: int, libreria: Optional[Libreria] = None) -> List[Producto]:
+        """Obtiene los `cantidad` productos de mayor valor según el criterio; en empate, el de menor ID."""
+        return self._monticulo(criterio, libreria).primeros(cantidad)
+
+
+class IndiceTexto:
+    """
+    Índice invertido de las palabras del nombre y la descripción.
+
+    Cada palabra normalizada apunta a los IDs de los productos que la
+    contienen, en orden de ID; las palabras distintas se guardan en una
+    ListaOrdenada para recorrer las que empiezan con un prefijo.
+    """
+
+    def __init__(self, productos: Dict[int, Producto]):
+        """Inicializa el índice sobre el diccionario vivo de productos."""
+        self._productos = productos
+        self._ids: Dict[str, Dict[int, None]] = {}
+        self._palabras = ListaOrdenada()
+        # Palabras cuyos IDs se agregaron fuera de orden y hay que reordenar
+        self._desordenadas: Set[str] = set()
+
+    def _agregar_palabras(self, producto: Producto, nuevas: List[str]):
+        """Agrega el producto a la lista de IDs de cada una de sus palabras."""
+        id_producto = producto.id_producto
+        for palabra in palabras_producto(producto):
+            ids = self._ids.get(palabra)
+            if ids is None:
+                self._ids[palabra] = ids = {}
+                nuevas.append(palabra)
+            elif next(reversed(ids)) > id_producto:
+                self._desordenadas.add(palabra)
+            ids[id_producto] = None
+
+    def agregar(self, producto: Producto):
+        """Incorpora las palabras de un producto."""
+        nuevas: List[str] = []
+        self._agregar_palabras(producto, nuevas)
+        for palabra in nuevas:
+            self._palabras.agregar(palabra)
+
+    def agregar_varios(self, productos: Iterable[Producto]):
+        """Incorpora varios productos; las palabras nuevas se ordenan de una vez."""
+        nuevas: List[str] = []
+        for producto in productos:
+            self._agregar_palabras(producto, nuevas)
+        if len(nuevas) * 32 < len(self._palabras):
+            for palabra in nuevas:
+                self._palabras.agregar(palabra)
+        else:
+            self._palabras.extender(nuevas)
+
+    def eliminar(self, producto: Producto):
+        """Quita las palabras de un producto."""
+        for palabra in palabras_producto(producto):
+            ids = self._ids.get(palabra)
+            if ids is None:
+                continue
+            ids.pop(producto.id_producto, None)
+            if not ids:
+                del self._ids[palabra]
+                self._palabras.quitar(palabra)
+                self._desordenadas.discard(palabra)
+
+    def _ids_de(self, palabra: str) -> Dict[int, None]:
+        """IDs de los productos con la palabra, en orden de ID."""
+        ids = self._ids[palabra]
+        if palabra in self._desordenadas:
+            self._desordenadas.discard(palabra)
+            self._ids[palabra] = ids = dict.fromkeys(sorted(ids))
+        return ids
+
+    def buscar(self, exactas: Set[str], prefijo: str, libreria: Optional[Libreria] = None,
+               limite: int = 20) -> List[Producto]:
+        """
+        Busca los productos que contienen todas las palabras exactas y
+        alguna palabra que empiece con el prefijo.
+
+        Returns:
+            List[Producto]: Hasta `limite` productos, ordenados por la
+            palabra que coincide con el prefijo y luego por ID
+        """
+        productos = self._productos
+        filtros = []
+        for palabra in exactas:
+            if palabra not in self._ids:
+                return []
+            filtros.append(self._ids[palabra])
+        filtros.sort(key=len)
+
+        def acepta(id_producto: int) -> bool:
+            return (all(id_producto in ids for ids in filtros)
+                    and (libreria is None or productos[id_producto].libreria == libreria))
+
+        if filtros and len(filtros[0]) <= _RECORRIDO_MAXIMO:
+            return self._buscar_entre([i for i in filtros[0] if acepta(i)], exactas, prefijo, limite)
+
+        resultado: List[Producto] = []
+        vistos: Set[int] = set()
+        for palabra in self._palabras.desde(prefijo):
+            if not palabra.startswith(prefijo):
+                break
+            for id_producto in self._ids_de(palabra):
+                if id_producto not in vistos and acepta(id_producto):
+                    vistos.add(id_producto)
+                    resultado.append(productos[id_producto])
+                    if len(resultado) >= limite:
+                        return resultado
+        return resultado
+
+    def _buscar_entre(self, candidatos: List[int], exactas: Set[str], prefijo: str,
+                      limite: int) -> List[Producto]:
+        """
+        Ordena unos pocos candidatos por la palabra que coincide con el prefijo.
+
+        Recorre las primeras palabras con el prefijo buscando los
+        candidatos en cada una; si el prefijo abarca demasiadas palabras,
+        los candidatos que quedan se resuelven leyendo su propio texto.
+        """
+        productos = self._productos
+        pendientes = set(candidatos)
+        encontrados: List[int] = []
+        for recorridas, palabra in enumerate(self._palabras.desde(prefijo)):
+            if not pendientes or len(encontrados) >= limite or not palabra.startswith(prefijo):
+                break
+            if recorridas == 64:
+                restantes = []
+                for id_producto in pendientes:
+                    coincidente = palabra_coincidente(productos[id_producto], exactas, prefijo)
+                    if coincidente is not None:
+                        restantes.append((coincidente, id_producto))
+                restantes.sort()
+                encontrados.extend(i for _, i in restantes)
+                break
+            ids = self._ids[palabra]
+            coincidentes = sorted(i for i in pendientes if i in ids)
+            encontrados.extend(coincidentes)
+            pendientes.difference_update(coincidentes)
+        return [productos[i] for i in encontrados[:limite]]
\ No newline at end of file
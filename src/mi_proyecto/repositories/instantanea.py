@@ -0,0 +1,241 @@
+"""
+Módulo de Repositorios - Instantáneas
+Vista de solo lectura del inventario tal como estaba en un instante,
+para generar reportes consistentes mientras continúan las ventas
+"""
+
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from ..models.producto import Producto, Libreria
+from .inventario import IRepositorio
+
+# Estado de un producto en la instantánea: (producto, cantidad, precio)
+Estado = Tuple[Producto, int, float]
+
+# Lecturas sin lock de un producto que está cambiando antes de esperar su lock
+_REINTENTOS = 100
+
+
+def _copia(producto: Producto, cantidad: int, precio: float) -> Producto:
+    """Crea un producto independiente con la cantidad y el precio indicados."""
+    return Producto.restaurar(producto.id_producto, producto.nombre, producto.descripcion,
+                              precio, cantidad, producto.libreria, producto.creado)
+
+
+class Instantanea(IRepositorio):
+    """
+    Vista inmutable del inventario en el instante en que se creó.
+
+    No copia el catálogo: lee los productos vivos del repositorio de
+    origen, y el origen, la primera vez que un producto cambia o se
+    elimina desde la creación de la vista, le entrega su cantidad y
+    precio anteriores (copia en escritura). Los productos agregados
+    después de la creación se ignoran. Los totales, los extremos de
+    precio y el resumen por categoría se toman al crearla.
+
+    Leer la vista no toma el lock del origen, así que puede recorrerse
+    en otro hilo sin demorar las ventas: un producto cuyo cambio está en
+    curso se detecta por su versión impar (ver Producto) y se vuelve a
+    leer cuando el cambio y su aviso terminaron; si no terminan pronto,
+    se espera tomando el lock de cambios del producto. Los productos que
+    entrega son copias: modificarlos no afecta al inventario. Mientras está abierta
+    cada escritura le cuesta al origen una consulta por vista; conviene
+    cerrarla (o usarla con `with`) al terminar.
+    """
+
+    def __init__(self, productos: Dict[int, Producto], origen: Optional[IRepositorio] = None):
+        """
+        Inicializa la vista
+
+        Args:
+            productos: Diccionario de productos por ID; si hay origen,
+                es el diccionario vivo del repositorio de origen
+            origen: Repositorio que avisa a la vista de sus escrituras
+        """
+        self._vivos = productos
+        self._origen = origen
+        # Estado previo de los productos modificados o eliminados después de crearla
+        self._previos: Dict[int, Estado] = {}
+        self._nuevos: Set[int] = set()
+        self._eliminados: Set[int] = set()
+        # Resultados tomados al crear la vista: nombre de consulta -> valor
+        self._capturados: Dict[str, Any] = {}
+
+    @classmethod
+    def copiar(cls, productos: Iterable[Producto]) -> "Instantanea":
+        """Crea una vista a partir de copias de los productos; para repositorios sin copia en escritura."""
+        return cls({p.id_producto: _copia(p, p.cantidad, p.precio) for p in productos})
+
+    # --- Avisos del origen, siempre bajo su lock ---
+
+    def _registrar(self, producto: Producto, cantidad: int, precio: float):
+        """Guarda el estado previo de un producto que va a cambiar."""
+        id_producto = producto.id_producto
+        if id_producto not in self._previos and id_producto not in self._nuevos:
+            self._previos[id_producto] = (producto, cantidad, precio)
+
+    def _registrar_alta(self, id_producto: int):
+        """Anota un producto agregado después de crear la vista."""
+        if id_producto not in self._previos:
+            self._nuevos.add(id_producto)
+
+    def _registrar_baja(self, producto: Producto):
+        """Guarda el estado de un producto que va a eliminarse."""
+        self._registrar(producto, producto.cantidad, producto.precio)
+        if producto.id_producto in self._previos:
+            self._eliminados.add(producto.id_producto)
+
+    # --- Lectura ---
+
+    def _estado(self, producto: Producto) -> Optional[Estado]:
+        """Estado en la vista de un producto leído del diccionario vivo."""
+        for _ in range(_REINTENTOS):
+            version = producto._version
+            if version % 2 == 0:
+                cantidad, precio = producto.cantidad, producto.precio
+                # Un cambio terminado ya avisó al origen, así que si la
+                # lectura lo incluye, el estado previo ya está registrado
+                previo = self._previos.get(producto.id_producto)
+                if producto._version == version:
+                    break
+            time.sleep(0)
+        else:
+            # El producto sigue cambiando: se espera al cambio en curso tomando su lock
+            with producto.candado_cambios():
+                cantidad, precio = producto.cantidad, producto.precio
+                previo = self._previos.get(producto.id_producto)
+        if previo is not None:
+            return previo
+        if producto.id_producto in self._nuevos:
+            return None
+        return producto, cantidad, precio
+
+    def _estado_por_id(self, id_producto: int) -> Optional[Estado]:
+        """Estado en la vista del producto con el ID indicado."""
+        producto = self._vivos.get(id_producto)
+        if producto is None:
+            return self._previos.get(id_producto)
+        return self._estado(producto)
+
+    def _estados(self) -> Iterator[Estado]:
+        """Recorre el estado de todos los productos de la vista."""
+        vivos = list(self._vivos.values())
+        for producto in vivos:
+            estado = self._estado(producto)
+            if estado is not None:
+                yield estado
+        if self._eliminados:
+            presentes = {p.id_producto for p in vivos}
+            for id_producto in list(self._eliminados):
+                if id_producto not in presentes:
+                    yield self._previos[id_producto]
+
+    def _capturado(self, nombre: str, calcular: Callable[[], Any]) -> Any:
+        """Retorna el valor tomado al crear la vista o lo calcula."""
+        if nombre in self._capturados:
+            return self._capturados[nombre]
+        return calcular()
+
+    def cerrar(self):
+        """Deja de recibir avisos del origen; la vista ya no debe usarse."""
+        if self._origen is not None:
+            self._origen._soltar_instantanea(self)
+            self._origen = None
+
+    def __enter__(self) -> "Instantanea":
+        """Permite usar la vista con `with`."""
+        return self
+
+    def __exit__(self, *exc):
+        """Cierra la vista al salir del bloque."""
+        self.cerrar()
+
+    # --- Escrituras: no se admiten ---
+
+    def agregar(self, producto: Producto) -> bool:
+        """La vista es de solo lectura."""
+        raise ValueError("La instantánea es de solo lectura")
+
+    def agregar_varios(self, productos: List[Producto]) -> bool:
+        """La vista es de solo lectura."""
+        raise ValueError("La instantánea es de solo lectura")
+
+    def eliminar(self, id_producto: int) -> bool:
+        """La vista es de solo lectura."""
+        raise ValueError("La instantánea es de solo lectura")
+
+    def actualizar_cantidades(self, cantidades: Dict[int, int]) -> bool:
+        """La vista es de solo lectura."""
+        raise ValueError("La instantánea es de solo lectura")
+
+    # --- Consultas ---
+
+    def obtener(self, id_producto: int) -> Optional[Producto]:
+        """Obtiene una copia del producto tal como estaba."""
+        estado = self._estado_por_id(id_producto)
+        return _copia(*estado) if estado is not None else None
+
+    def obtener_todos(self) -> List[Producto]:
+        """Obtiene copias de todos los productos."""
+        return list(self.iterar())
+
+    def iterar(self) -> Iterator[Producto]:
+        """Recorre copias de los productos."""
+        return (_copia(*estado) for estado in self._estados())
+
+    def obtener_cantidades(self, ids: Iterable[int]) -> Dict[int, int]:
+        """Obtiene el stock que tenían los IDs indicados."""
+        cantidades = {}
+        for id_producto in ids:
+            estado = self._estado_por_id(id_producto)
+            if estado is not None:
+                cantidades[id_producto] = estado[1]
+        return cantidades
+
+    def contar(self) -> int:
+        """Retorna la cantidad de productos."""
+        return self._capturado("contar", lambda: sum(1 for _ in self._estados()))
+
+    def total_items(self) -> int:
+        """Retorna el total de ítems en stock."""
+        return self._capturado("total_items", lambda: sum(c for _, c, _ in self._estados()))
+
+    def valor_total(self) -> float:
+        """Retorna el valor total del stock."""
+        return self._capturado("valor_total", lambda: math.fsum(c * p for _, c, p in self._estados()))
+
+    def producto_mas_caro(self) -> Optional[Producto]:
+        """Obtiene el producto más caro."""
+        if "mas_caro" in self._capturados:
+            producto = self._capturados["mas_caro"]
+            estado = self._estado_por_id(producto.id_producto) if producto is not None else None
+        else:
+            estado = max(self._estados(), key=lambda e: (e[2], -e[0].id_producto), default=None)
+        return _copia(*estado) if estado is not None else None
+
+    def producto_mas_barato(self) -> Optional[Producto]:
+        """Obtiene el producto más barato."""
+        if "mas_barato" in self._capturados:
+            producto = self._capturados["mas_barato"]
+            estado = self._estado_por_id(producto.id_producto) if producto is not None else None
+        else:
+            estado = min(self._estados(), key=lambda e: (e[2], e[0].id_producto), default=None)
+        return _copia(*estado) if estado is not None else None
+
+    def obtener_por_rango_stock(self, minimo: Optional[int] = None, maximo: Optional[int] = None) -> List[Producto]:
+        """Obtiene los productos con stock entre minimo y maximo, ordenados por stock."""
+        estados = [e for e in self._estados()
+                   if (minimo is None or e[1] >= minimo) and (maximo is None or e[1] <= maximo)]
+        estados.sort(key=lambda e: (e[1], e[0].id_producto))
+        return [_copia(*estado) for estado in estados]
+
+    def obtener_por_libreria(self, libreria: Libreria) -> List[Producto]:
+        """Obtiene productos por categoría."""
+        return [_copia(*e) for e in self._estados() if e[0].libreria == libreria]
+
+    def resumen_por_libreria(self) -> Dict[Libreria, Dict[str, Any]]:
+        """Retorna cantidad de productos, ítems y valor por categoría."""
+        if "resumen_libreria" in self._capturados:
+            return {libreria: dict(datos) for libreria, datos in self._capturados["resumen_libreria"].items()}
+        return super().resumen_por_libreria()
@@ -1,6 +1,15 @@
+import heapq
+import math
+import threading
+import weakref
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from ..models.producto import Producto, Libreria
+from ..utils.validadores import Validadores
+from .indices import (AgregadosInventario, IndiceLibreria, IndiceRanking, IndiceStock, IndiceTexto,
+                      SumaExacta, criterio_ranking, palabra_coincidente, preparar_consulta)
+from .movimientos import RegistroMovimientos
 
 
 class IRepositorio(ABC):
@@ -27,23 +36,223 @@ class IRepositorio(ABC):
     def eliminar(self, id_producto: int) -> bool:
         """Elimina un producto por su ID"""
         pass
+    
+    def iterar(self) -> Iterator[Producto]:
+        """Recorre los productos sin armar una lista con todos"""
+        return iter(self.obtener_todos())
+    
+    def filtrar(self, condicion: Callable[[Producto], bool]) -> Iterator[Producto]:
+        """Recorre los productos que cumplen la condición"""
+        return (p for p in self.iterar() if condicion(p))
+    
+    def agregar_varios(self, productos: List[Producto]) -> bool:
+        """Agrega varios productos; si alguno ya existe no agrega ninguno"""
+        ids = set()
+        for producto in productos:
+            if producto.id_producto in ids or self.obtener(producto.id_producto) is not None:
+                raise ValueError(f"El producto con ID {producto.id_producto} ya existe")
+            ids.add(producto.id_producto)
+        for producto in productos:
+            self.agregar(producto)
+        return True
+    
+    def obtener_varios(self, ids: Iterable[int]) -> Dict[int, Producto]:
+        """Obtiene los productos existentes entre los IDs indicados"""
+        productos = {}
+        for id_producto in ids:
+            producto = self.obtener(id_producto)
+            if producto is not None:
+                productos[id_producto] = producto
+        return productos
+    
+    def obtener_cantidades(self, ids: Iterable[int]) -> Dict[int, int]:
+        """Obtiene el stock actual de los productos existentes entre los IDs indicados"""
+        return {i: p.cantidad for i, p in self.obtener_varios(ids).items()}
+    
+    def actualizar_cantidades(self, cantidades: Dict[int, int]) -> bool:
+        """Asigna la nueva cantidad de varios productos ya validados"""
+        productos = self.obtener_varios(cantidades)
+        for id_producto, cantidad in cantidades.items():
+            productos[id_producto].actualizar_cantidad(cantidad)
+        return True
+    
+    def notificar_cambio(self, producto: Producto, cantidad_anterior: int, precio_anterior: float):
+        """Recibe el aviso de que un producto cambió su cantidad o precio"""
+        pass
+    
+    def instantanea(self) -> "Instantanea":
+        """
+        Retorna una vista de solo lectura del estado actual; por defecto
+        copia los productos, los repositorios en memoria usan copia en escritura
+        """
+        from .instantanea import Instantanea
+        return Instantanea.copiar(self.iterar())
+    
+    def contar(self) -> int:
+        """Retorna la cantidad de productos"""
+        return sum(1 for _ in self.iterar())
+    
+    def total_items(self) -> int:
+        """Calcula el total de ítems en stock"""
+        return sum(p.cantidad for p in self.iterar())
+    
+    def valor_total(self) -> float:
+        """Calcula el valor total del stock"""
+        return math.fsum(p.calcular_valor_total() for p in self.iterar())
+    
+    def suma_valor(self) -> SumaExacta:
+        """
+        Retorna el valor total del stock como suma exacta, para combinarlo
+        sin redondeos con el de otros repositorios
+        """
+        suma = SumaExacta()
+        suma.sumar_varios(p.calcular_valor_total() for p in self.iterar())
+        return suma
+    
+    def producto_mas_caro(self) -> Optional[Producto]:
+        """Obtiene el producto más caro"""
+        return max(self.iterar(), key=lambda p: p.precio, default=None)
+    
+    def producto_mas_barato(self) -> Optional[Producto]:
+        """Obtiene el producto más barato"""
+        return min(self.iterar(), key=lambda p: p.precio, default=None)
+    
+    def obtener_por_rango_stock(self, minimo: Optional[int] = None, maximo: Optional[int] = None) -> List[Producto]:
+        """Obtiene los productos con stock entre minimo y maximo, ordenados por stock"""
+        productos = list(self.filtrar(
+            lambda p: (minimo is None or p.cantidad >= minimo) and (maximo is None or p.cantidad <= maximo)))
+        productos.sort(key=lambda p: (p.cantidad, p.id_producto))
+        return productos
+    
+    def obtener_por_libreria(self, libreria: Libreria) -> List[Producto]:
+        """Obtiene productos por categoría"""
+        return list(self.filtrar(lambda p: p.libreria == libreria))
+    
+    def resumen_por_libreria(self) -> Dict[Libreria, Dict[str, Any]]:
+        """Retorna cantidad de productos, ítems y valor por categoría"""
+        resumen = {}
+        for libreria in Libreria:
+            productos = self.obtener_por_libreria(libreria)
+            resumen[libreria] = {
+                "total_productos": len(productos),
+                "total_items": sum(p.cantidad for p in productos),
+                "valor_total": math.fsum(p.calcular_valor_total() for p in productos),
+            }
+        return resumen
+    
+    def buscar(self, texto: str, libreria: Optional[Libreria] = None, limite: int = 20) -> List[Producto]:
+        """
+        Busca productos por las palabras de su nombre y descripción,
+        sin distinguir mayúsculas ni acentos; la última palabra puede
+        estar incompleta. Los resultados se ordenan por la palabra que
+        completa esa última palabra y luego por ID.
+        """
+        consulta = preparar_consulta(texto)
+        if consulta is None:
+            return []
+        exactas, prefijo = consulta
+        productos = self.obtener_por_libreria(libreria) if libreria is not None else self.iterar()
+        encontrados = []
+        for producto in productos:
+            palabra = palabra_coincidente(producto, exactas, prefijo)
+            if palabra is not None:
+                encontrados.append((palabra, producto.id_producto, producto))
+        encontrados.sort(key=lambda e: (e[0], e[1]))
+        return [producto for _, _, producto in encontrados[:limite]]
+    
+    def ranking(self, criterio: str, cantidad: int = 10, libreria: Optional[Libreria] = None) -> List[Producto]:
+        """
+        Obtiene los `cantidad` productos con mayor precio, valor en stock
+        o cantidad ("precio", "valor", "cantidad"), de mayor a menor y,
+        en empate, por ID; opcionalmente solo los de una categoría
+        """
+        valor = criterio_ranking(criterio)
+        productos = self.obtener_por_libreria(libreria) if libreria is not None else self.iterar()
+        return heapq.nsmallest(cantidad, productos, key=lambda p: (-valor(p), p.id_producto))
 
 class RepositorioMemoria(IRepositorio):
     """
     Implementación del repositorio que almacena productos en memoria 
+    
+    Los índices se modifican bajo un lock interno de corta duración,
+    por lo que el repositorio puede usarse desde varios hilos. Los
+    cambios de cantidad o precio no toman ese lock: se anotan en una
+    franja de cambios pendientes, con su propio lock, y se vuelcan en
+    los agregados e índices con la siguiente consulta que los usa.
     """
     
+    # Franjas entre las que se reparten los cambios pendientes
+    FRANJAS_PENDIENTES = 64
+    
     def __init__(self):
         """inicializa el diccionario de productos"""
+        self._lock = threading.RLock()
         self._productos: Dict[int, Producto] = {}
+        # Productos en orden de alta que recorre iterar; se rehace con el
+        # primer recorrido después de agregar o eliminar
+        self._catalogo: Optional[Tuple[Producto, ...]] = None
+        self._agregados = AgregadosInventario(self._productos)
+        self._indice_stock = IndiceStock(self._productos)
+        self._indice_libreria = IndiceLibreria()
+        # Lotes grandes en curso: el índice de stock se reconstruye al terminar el último
+        self._stock_diferido = 0
+        # Cambios pendientes por franja de IDs: id -> [producto, cantidad y
+        # precio anteriores, cantidad y precio nuevos]; varios cambios del
+        # mismo producto se resumen en uno
+        self._candados_pendientes = [threading.Lock() for _ in range(self.FRANJAS_PENDIENTES)]
+        self._cambios_pendientes: List[Dict[int, list]] = [{} for _ in range(self.FRANJAS_PENDIENTES)]
+        self._hay_pendientes = False
+        # El índice de texto se construye con la primera búsqueda
+        self._indice_texto: Optional[IndiceTexto] = None
+        # Cada ranking se construye con su primera consulta
+        self._indice_ranking = IndiceRanking(self._productos, self._indice_libreria)
+        # Instantáneas abiertas; referencias débiles para que una vista
+        # olvidada sin cerrar no siga recibiendo avisos
+        self._instantaneas: Tuple[weakref.ref, ...] = ()
     
     def agregar(self, producto: Producto) -> bool:
         """
         Agrega un producto al repositorio
         """
-        if producto.id_producto in self._productos:
-            raise ValueError(f"El producto con ID {producto.id_producto} ya existe")
-        self._productos[producto.id_producto] = producto
+        with self._lock:
+            if producto.id_producto in self._productos:
+                raise ValueError(f"El producto con ID {producto.id_producto} ya existe")
+            for vista in self._vistas_abiertas():
+                vista._registrar_alta(producto.id_producto)
+            self._productos[producto.id_producto] = producto
+            self._catalogo = None
+            self._agregados.agregar(producto)
+            self._indice_stock.agregar(producto)
+            self._indice_libreria.agregar(producto)
+            self._indice_ranking.agregar(producto)
+            if self._indice_texto is not None:
+                self._indice_texto.agregar(producto)
+            producto._observador = self
+        return True
+    
+    def agregar_varios(self, productos: List[Producto]) -> bool:
+        """
+        Agrega varios productos actualizando los índices en bloque
+        """
+        with self._lock:
+            nuevos: Dict[int, Producto] = {}
+            for producto in productos:
+                if producto.id_producto in self._productos or producto.id_producto in nuevos:
+                    raise ValueError(f"El producto con ID {producto.id_producto} ya existe")
+                nuevos[producto.id_producto] = producto
+            for vista in self._vistas_abiertas():
+                for id_producto in nuevos:
+                    vista._registrar_alta(id_producto)
+            self._productos.update(nuevos)
+            self._catalogo = None
+            self._agregados.agregar_varios(productos)
+            self._indice_stock.agregar_varios(productos)
+            self._indice_libreria.agregar_varios(productos)
+            self._indice_ranking.agregar_varios(productos)
+            if self._indice_texto is not None:
+                self._indice_texto.agregar_varios(productos)
+            for producto in productos:
+                producto._observador = self
         return True
     
     def obtener(self, id_producto: int) -> Optional[Producto]:
@@ -52,24 +261,252 @@ class RepositorioMemoria(IRepositorio):
         """
         return self._productos.get(id_producto)
     
+    def obtener_varios(self, ids: Iterable[int]) -> Dict[int, Producto]:
+        """
+        Obtiene los productos existentes entre los IDs indicados.
+        """
+        productos = self._productos
+        return {i: productos[i] for i in ids if i in productos}
+    
     def obtener_todos(self) -> List[Producto]:
         """
         Obtiene todos los productos.
         """
         return list(self._productos.values())
     
+    def iterar(self) -> Iterator[Producto]:
+        """
+        Recorre los productos que había al empezar el recorrido.
+        
+        Recorre una tupla con los productos que se arma una vez y se
+        reutiliza hasta el próximo alta o baja, así que recorrer no copia
+        el catálogo en cada llamada y agregar o eliminar productos desde
+        otro hilo no interrumpe un recorrido; los cambios de stock o
+        precio sí se ven.
+        """
+        catalogo = self._catalogo
+        if catalogo is None:
+            with self._lock:
+                catalogo = self._catalogo
+                if catalogo is None:
+                    catalogo = self._catalogo = tuple(self._productos.values())
+        return iter(catalogo)
+    
     def eliminar(self, id_producto: int) -> bool:
         """
         Elimina un producto del repositorio
         """
-        if id_producto in self._productos:
+        with self._lock:
+            producto = self._productos.get(id_producto)
+            if producto is None:
+                return False
+            self._consolidar()
+            for vista in self._vistas_abiertas():
+                vista._registrar_baja(producto)
             del self._productos[id_producto]
-            return True
-        return False
+            self._catalogo = None
+            self._agregados.eliminar(producto)
+            self._indice_stock.eliminar(producto)
+            self._indice_libreria.eliminar(producto)
+            if self._indice_texto is not None:
+                self._indice_texto.eliminar(producto)
+            if producto._observador is self:
+                producto._observador = None
+        return True
+    
+    def actualizar_cantidades(self, cantidades: Dict[int, int]) -> bool:
+        """
+        Asigna la nueva cantidad de varios productos ya validados.
+        Si el lote abarca buena parte del catálogo, el índice de stock
+        se reconstruye una sola vez en lugar de reubicar cada producto.
+        """
+        productos = self._productos
+        with self._lock:
+            for id_producto in cantidades:
+                if id_producto not in productos:
+                    raise ValueError(f"Producto con ID {id_producto} no existe")
+            cambios = [(productos[i], cantidad) for i, cantidad in cantidades.items()]
+            diferido = len(cantidades) * 4 > len(productos)
+            if diferido:
+                self._stock_diferido += 1
+        # Cada cambio toma el lock del producto y luego el del repositorio
+        # (ver Producto.candado_cambios), así que aquí no se tiene este último
+        try:
+            for producto, cantidad in cambios:
+                producto.actualizar_cantidad(cantidad)
+        finally:
+            if diferido:
+                with self._lock:
+                    self._consolidar()
+                    self._stock_diferido -= 1
+                    if not self._stock_diferido:
+                        self._indice_stock.reconstruir()
+        return True
+    
+    def notificar_cambio(self, producto: Producto, cantidad_anterior: int, precio_anterior: float):
+        """
+        Anota el cambio de un producto para volcarlo en los agregados e índices
+        
+        Se llama con el lock del producto tomado, así que su cantidad y
+        precio actuales son los que dejó este cambio.
+        """
+        if self._productos.get(producto.id_producto) is not producto:
+            return
+        id_producto = producto.id_producto
+        franja = hash(id_producto) % self.FRANJAS_PENDIENTES
+        with self._candados_pendientes[franja]:
+            # Se consulta con el lock de la franja tomado: instantanea()
+            # registra la vista antes de vaciar las franjas
+            sincronico = bool(self._instantaneas)
+            if not sincronico:
+                pendientes = self._cambios_pendientes[franja]
+                cambio = pendientes.get(id_producto)
+                if cambio is None:
+                    pendientes[id_producto] = [producto, cantidad_anterior, precio_anterior,
+                                               producto.cantidad, producto.precio]
+                else:
+                    cambio[3] = producto.cantidad
+                    cambio[4] = producto.precio
+                self._hay_pendientes = True
+        if sincronico:
+            # Con instantáneas abiertas el cambio se aplica en el acto para
+            # que la vista reciba el estado previo en el mismo paso
+            with self._lock:
+                self._consolidar()
+                if self._productos.get(id_producto) is producto:
+                    for vista in self._vistas_abiertas():
+                        vista._registrar(producto, cantidad_anterior, precio_anterior)
+                    self._aplicar_cambio(producto, cantidad_anterior, precio_anterior,
+                                         producto.cantidad, producto.precio)
+    
+    def _aplicar_cambio(self, producto: Producto, cantidad_anterior: int, precio_anterior: float,
+                        cantidad: int, precio: float):
+        """Refleja un cambio de cantidad o precio en los agregados e índices."""
+        self._agregados.actualizar(producto, cantidad_anterior, precio_anterior, cantidad, precio)
+        if not self._stock_diferido:
+            self._indice_stock.actualizar(producto, cantidad_anterior, cantidad)
+        self._indice_libreria.actualizar(producto, cantidad_anterior, precio_anterior, cantidad, precio)
+        self._indice_ranking.actualizar(producto, cantidad_anterior, precio_anterior, cantidad, precio)
+    
+    def _consolidar(self):
+        """Vuelca los cambios pendientes de todas las franjas en los agregados e índices."""
+        if not self._hay_pendientes:
+            return
+        with self._lock:
+            self._hay_pendientes = False
+            cambios: List[list] = []
+            for candado, pendientes in zip(self._candados_pendientes, self._cambios_pendientes):
+                if pendientes:
+                    with candado:
+                        cambios.extend(pendientes.values())
+                        pendientes.clear()
+            productos = self._productos
+            for producto, cantidad_anterior, precio_anterior, cantidad, precio in cambios:
+                # Los productos eliminados ya se descontaron con sus valores actuales
+                if productos.get(producto.id_producto) is producto:
+                    self._aplicar_cambio(producto, cantidad_anterior, precio_anterior, cantidad, precio)
+    
+    def contar(self) -> int:
+        """Retorna la cantidad de productos."""
+        return len(self._productos)
+    
+    def total_items(self) -> int:
+        """Retorna el total de ítems en stock."""
+        self._consolidar()
+        return self._agregados.total_items
+    
+    def valor_total(self) -> float:
+        """Retorna el valor total del stock."""
+        with self._lock:
+            self._consolidar()
+            return self._agregados.valor_total
+    
+    def suma_valor(self) -> SumaExacta:
+        """Retorna una copia de la suma exacta que mantienen los agregados."""
+        with self._lock:
+            self._consolidar()
+            return self._agregados.suma_valor()
+    
+    def producto_mas_caro(self) -> Optional[Producto]:
+        """Obtiene el producto más caro."""
+        with self._lock:
+            self._consolidar()
+            return self._agregados.producto_mas_caro()
+    
+    def producto_mas_barato(self) -> Optional[Producto]:
+        """Obtiene el producto más barato."""
+        with self._lock:
+            self._consolidar()
+            return self._agregados.producto_mas_barato()
+    
+    def obtener_por_rango_stock(self, minimo: Optional[int] = None, maximo: Optional[int] = None) -> List[Producto]:
+        """Obtiene los productos con stock entre minimo y maximo usando el índice de stock."""
+        with self._lock:
+            self._consolidar()
+            return self._indice_stock.rango(minimo, maximo)
     
     def obtener_por_libreria(self, libreria: Libreria) -> List[Producto]:
         """Obtiene productos por categoría."""
-        return [p for p in self._productos.values() if p.libreria == libreria]
+        with self._lock:
+            return self._indice_libreria.productos(libreria)
+    
+    def resumen_por_libreria(self) -> Dict[Libreria, Dict[str, Any]]:
+        """Retorna cantidad de productos, ítems y valor por categoría."""
+        with self._lock:
+            self._consolidar()
+            return self._indice_libreria.resumen()
+    
+    def buscar(self, texto: str, libreria: Optional[Libreria] = None, limite: int = 20) -> List[Producto]:
+        """Busca productos por texto usando el índice invertido."""
+        consulta = preparar_consulta(texto)
+        if consulta is None:
+            return []
+        with self._lock:
+            if self._indice_texto is None:
+                self._indice_texto = IndiceTexto(self._productos)
+                self._indice_texto.agregar_varios(self._productos.values())
+            return self._indice_texto.buscar(*consulta, libreria=libreria, limite=limite)
+    
+    def ranking(self, criterio: str, cantidad: int = 10, libreria: Optional[Libreria] = None) -> List[Producto]:
+        """Obtiene los productos de mayor valor según el criterio usando los montículos del ranking."""
+        with self._lock:
+            self._consolidar()
+            return self._indice_ranking.primeros(criterio, cantidad, libreria)
+    
+    def instantanea(self) -> "Instantanea":
+        """
+        Retorna una vista consistente del estado actual sin copiar el catálogo.
+        
+        Los totales, los extremos de precio y el resumen por categoría se
+        toman en el acto; desde entonces, cada aviso de cambio le entrega
+        a la vista el estado previo del producto.
+        """
+        from .instantanea import Instantanea
+        with self._lock:
+            vista = Instantanea(self._productos, self)
+            # Primero se registra la vista: desde entonces los cambios se
+            # aplican en el acto y los que ya se anotaron se vuelcan aquí
+            self._instantaneas = tuple(r for r in self._instantaneas if r() is not None) + (weakref.ref(vista),)
+            self._consolidar()
+            vista._capturados.update({
+                "contar": len(self._productos),
+                "total_items": self._agregados.total_items,
+                "valor_total": self._agregados.valor_total,
+                "mas_caro": self._agregados.producto_mas_caro(),
+                "mas_barato": self._agregados.producto_mas_barato(),
+                "resumen_libreria": self._indice_libreria.resumen(),
+            })
+        return vista
+    
+    def _vistas_abiertas(self) -> List["Instantanea"]:
+        """Instantáneas abiertas que deben recibir los avisos de escritura."""
+        return [vista for vista in (r() for r in self._instantaneas) if vista is not None]
+    
+    def _soltar_instantanea(self, vista: "Instantanea"):
+        """Deja de avisarle las escrituras a una instantánea."""
+        with self._lock:
+            abiertas = self._vistas_abiertas()
+            self._instantaneas = tuple(weakref.ref(v) for v in abiertas if v is not vista)
 
 
 class Inventario:
@@ -77,11 +514,26 @@ class Inventario:
     Clase que gestiona el inventario de productos utilizando un repositorio
     """
     
-    def __init__(self, repositorio: IRepositorio):
+    def __init__(self, repositorio: IRepositorio, franjas: int = 64,
+                 movimientos: Optional[RegistroMovimientos] = None):
         """
         Constructor del inventario
+        
+        Args:
+            repositorio: Repositorio de productos
+            franjas: Cantidad de locks entre los que se reparten los productos
+            movimientos: Registro donde anotar los movimientos de stock;
+                si no se indica, los movimientos no se registran
         """
         self.repositorio = repositorio
+        self.movimientos = movimientos
+        # Lock por franja de IDs: los movimientos de productos distintos
+        # rara vez comparten lock, así que las ventas no se serializan
+        self._candados = [threading.Lock() for _ in range(max(franjas, 1))]
+    
+    def _candado(self, id_producto: int) -> threading.Lock:
+        """Retorna el lock de la franja a la que pertenece el producto."""
+        return self._candados[hash(id_producto) % len(self._candados)]
     
     def agregar_producto(self, nombre: str, descripcion: str, precio: float, cantidad: int, libreria: Libreria) -> Producto:
         """
@@ -91,27 +543,126 @@ class Inventario:
         self.repositorio.agregar(producto)
         return producto
 
+    def agregar_productos(self, filas: Iterable[Sequence[Any]]) -> List[Producto]:
+        """
+        Agrega varios productos en un solo paso
+        
+        Args:
+            filas: Tuplas (nombre, descripcion, precio, cantidad, libreria)
+            
+        Returns:
+            List[Producto]: Productos creados, en el orden de las filas
+            
+        Si alguna fila es inválida no se agrega ningún producto.
+        """
+        filas = [tuple(fila) for fila in filas]
+        for numero, fila in enumerate(filas, 1):
+            if len(fila) != 5:
+                raise ValueError(f"Fila {numero}: se esperaban 5 campos y hay {len(fila)}")
+            nombre, descripcion, precio, cantidad, libreria = fila
+            try:
+                Validadores.validar_nombre_no_vacio(nombre)
+                if not isinstance(descripcion, str):
+                    raise ValueError("La descripción debe ser texto")
+                Validadores.validar_precio_positivo(precio)
+                Validadores.validar_cantidad_no_negativa(cantidad)
+                if not isinstance(libreria, Libreria):
+                    raise ValueError(f"Categoría inválida: {libreria}")
+            except ValueError as e:
+                raise ValueError(f"Fila {numero}: {e}") from None
+        
+        productos = [Producto(*fila) for fila in filas]
+        self.repositorio.agregar_varios(productos)
+        return productos
+
     def aumentar_stock(self, id_producto: int, cantidad: int) -> bool:
         """Aumenta el stock de un producto."""
-        producto = self.repositorio.obtener(id_producto)
-        if not producto:
-            raise ValueError(f"Producto con ID {id_producto} no existe")
-        
-        producto.actualizar_cantidad(producto.cantidad + cantidad)
+        with self._candado(id_producto):
+            producto = self.repositorio.obtener(id_producto)
+            if not producto:
+                raise ValueError(f"Producto con ID {id_producto} no existe")
+            
+            producto.actualizar_cantidad(producto.cantidad + cantidad)
+            if self.movimientos is not None:
+                self.movimientos.registrar(id_producto, cantidad)
         return True
     
     def disminuir_stock(self, id_producto: int, cantidad: int) -> bool:
         """Disminuye el stock de un producto (venta)."""
-        producto = self.repositorio.obtener(id_producto)
-        if not producto:
-            raise ValueError(f"Producto con ID {id_producto} no existe")
-        
-        if producto.cantidad < cantidad:
-            raise ValueError(f"Stock insuficiente. Disponible: {producto.cantidad}")
-        
-        producto.actualizar_cantidad(producto.cantidad - cantidad)
+        with self._candado(id_producto):
+            producto = self.repositorio.obtener(id_producto)
+            if not producto:
+                raise ValueError(f"Producto con ID {id_producto} no existe")
+            
+            if producto.cantidad < cantidad:
+                raise ValueError(f"Stock insuficiente. Disponible: {producto.cantidad}")
+            
+            producto.actualizar_cantidad(producto.cantidad - cantidad)
+            if self.movimientos is not None:
+                self.movimientos.registrar(id_producto, -cantidad)
         return True
     
+    def aplicar_movimientos(self, movimientos: Iterable[Tuple[int, int]]) -> int:
+        """
+        Aplica varios movimientos de stock en un solo paso
+        
+        Args:
+            movimientos: Pares (id_producto, delta); delta negativo es una venta
+            
+        Returns:
+            int: Cantidad de movimientos aplicados
+            
+        Los movimientos se validan en orden; si alguno deja un stock
+        negativo o refiere a un producto inexistente no se aplica ninguno.
+        """
+        movimientos = list(movimientos)
+        ids = {id_producto for id_producto, _ in movimientos}
+        with ExitStack() as candados:
+            # Siempre en el mismo orden para evitar bloqueos mutuos entre lotes
+            for franja in sorted({hash(i) % len(self._candados) for i in ids}):
+                candados.enter_context(self._candados[franja])
+            
+            existentes = self.repositorio.obtener_cantidades(ids)
+            cantidades: Dict[int, int] = {}
+            for numero, (id_producto, delta) in enumerate(movimientos, 1):
+                try:
+                    Validadores.validar_entero(delta)
+                except ValueError as e:
+                    raise ValueError(f"Movimiento {numero}: {e}") from None
+                actual = cantidades.get(id_producto)
+                if actual is None:
+                    actual = existentes.get(id_producto)
+                    if actual is None:
+                        raise ValueError(f"Movimiento {numero}: Producto con ID {id_producto} no existe")
+                if actual + delta < 0:
+                    raise ValueError(f"Movimiento {numero}: Stock insuficiente para el producto "
+                                     f"{id_producto}. Disponible: {actual}")
+                cantidades[id_producto] = actual + delta
+            
+            self.repositorio.actualizar_cantidades(cantidades)
+            if self.movimientos is not None:
+                self.movimientos.registrar_varios(movimientos)
+        return len(movimientos)
+    
     def obtener_productos_bajo_stock(self, limite: int = 10) -> List[Producto]:
-        """Obtiene productos con stock bajo."""
-        return [p for p in self.repositorio.obtener_todos() if p.cantidad <= limite]
\ No newline at end of file
+        """Obtiene productos con stock bajo, ordenados de menor a mayor stock."""
+        return self.repositorio.obtener_por_rango_stock(maximo=limite)
+    
+    def buscar(self, texto: str, libreria: Optional[Libreria] = None, limite: int = 20) -> List[Producto]:
+        """
+        Busca productos por nombre y descripción
+        
+        Args:
+            texto: Palabras a buscar; la última puede estar incompleta
+            libreria: Si se indica, solo busca en esa categoría
+            limite: Máximo de productos a retornar
+        """
+        if limite <= 0:
+            raise ValueError("El límite debe ser positivo")
+        return self.repositorio.buscar(texto, libreria, limite)
+    
+    def obtener_productos_por_rango_stock(self, minimo: int, maximo: int) -> List[Producto]:
+        """Obtiene productos con stock entre minimo y maximo (inclusive)."""
+        if minimo > maximo:
+            raise ValueError("El mínimo no puede ser mayor que el máximo")
+        return self.repositorio.obtener_por_rango_stock(minimo, maximo)
\ No newline at end of file
@@ -0,0 +1,174 @@
+"""
+Módulo de Repositorios - Repositorio particionado
+Reparte los productos entre varios repositorios según su ID
+"""
+
+import heapq
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from ..models.producto import Producto, Libreria
+from .indices import SumaExacta, criterio_ranking, palabra_coincidente, preparar_consulta
+from .inventario import IRepositorio, RepositorioMemoria
+
+
+def _por_id(producto: Producto) -> int:
+    """Clave de orden por ID."""
+    return producto.id_producto
+
+
+class RepositorioParticionado(IRepositorio):
+    """
+    Repositorio que reparte los productos entre N particiones.
+
+    Cada producto vive en la partición `hash(id_producto) % N`; las
+    particiones son repositorios independientes que mantienen sus
+    propios índices y observan a sus propios productos. Las consultas
+    combinan los resultados de todas las particiones.
+    """
+
+    def __init__(self, particiones: int = 8, fabrica: Callable[[], IRepositorio] = RepositorioMemoria):
+        """
+        Inicializa el repositorio
+
+        Args:
+            particiones: Cantidad de particiones
+            fabrica: Crea el repositorio de cada partición
+        """
+        if particiones <= 0:
+            raise ValueError("La cantidad de particiones debe ser positiva")
+        self.particiones: List[IRepositorio] = [fabrica() for _ in range(particiones)]
+
+    def _particion(self, id_producto: int) -> IRepositorio:
+        """Retorna la partición a la que pertenece un ID."""
+        return self.particiones[hash(id_producto) % len(self.particiones)]
+
+    def _agrupar(self, ids: Iterable[int]) -> Dict[int, List[int]]:
+        """Agrupa IDs por número de partición."""
+        grupos: Dict[int, List[int]] = {}
+        cantidad = len(self.particiones)
+        for id_producto in ids:
+            grupos.setdefault(hash(id_producto) % cantidad, []).append(id_producto)
+        return grupos
+
+    def agregar(self, producto: Producto) -> bool:
+        """Agrega un producto en su partición."""
+        return self._particion(producto.id_producto).agregar(producto)
+
+    def agregar_varios(self, productos: List[Producto]) -> bool:
+        """Agrega varios productos; si alguno ya existe no agrega ninguno."""
+        ids = set()
+        for producto in productos:
+            if producto.id_producto in ids:
+                raise ValueError(f"El producto con ID {producto.id_producto} ya existe")
+            ids.add(producto.id_producto)
+        existentes = self.obtener_varios(ids)
+        if existentes:
+            raise ValueError(f"El producto con ID {min(existentes)} ya existe")
+
+        cantidad = len(self.particiones)
+        grupos: Dict[int, List[Producto]] = {}
+        for producto in productos:
+            grupos.setdefault(hash(producto.id_producto) % cantidad, []).append(producto)
+        for numero, grupo in grupos.items():
+            self.particiones[numero].agregar_varios(grupo)
+        return True
+
+    def obtener(self, id_producto: int) -> Optional[Producto]:
+        """Obtiene un producto por su ID."""
+        return self._particion(id_producto).obtener(id_producto)
+
+    def obtener_varios(self, ids: Iterable[int]) -> Dict[int, Producto]:
+        """Obtiene los productos existentes entre los IDs indicados."""
+        productos: Dict[int, Producto] = {}
+        for numero, grupo in self._agrupar(ids).items():
+            productos.update(self.particiones[numero].obtener_varios(grupo))
+        return productos
+
+    def obtener_cantidades(self, ids: Iterable[int]) -> Dict[int, int]:
+        """Obtiene el stock actual de los productos existentes entre los IDs indicados."""
+        cantidades: Dict[int, int] = {}
+        for numero, grupo in self._agrupar(ids).items():
+            cantidades.update(self.particiones[numero].obtener_cantidades(grupo))
+        return cantidades
+
+    def actualizar_cantidades(self, cantidades: Dict[int, int]) -> bool:
+        """Asigna la nueva cantidad de varios productos ya validados."""
+        faltantes = set(cantidades).difference(self.obtener_cantidades(cantidades))
+        if faltantes:
+            raise ValueError(f"Producto con ID {min(faltantes)} no existe")
+        for numero, grupo in self._agrupar(cantidades).items():
+            self.particiones[numero].actualizar_cantidades({i: cantidades[i] for i in grupo})
+        return True
+
+    def obtener_todos(self) -> List[Producto]:
+        """Obtiene todos los productos ordenados por ID."""
+        return sorted(chain.from_iterable(p.obtener_todos() for p in self.particiones), key=_por_id)
+
+    def iterar(self) -> Iterator[Producto]:
+        """Recorre los productos partición por partición, sin ordenarlos por ID."""
+        return chain.from_iterable(p.iterar() for p in self.particiones)
+
+    def eliminar(self, id_producto: int) -> bool:
+        """Elimina un producto de su partición."""
+        return self._particion(id_producto).eliminar(id_producto)
+
+    def notificar_cambio(self, producto: Producto, cantidad_anterior: int, precio_anterior: float):
+        """Reenvía el aviso de cambio a la partición del producto."""
+        self._particion(producto.id_producto).notificar_cambio(producto, cantidad_anterior, precio_anterior)
+
+    def contar(self) -> int:
+        """Retorna la cantidad de productos."""
+        return sum(p.contar() for p in self.particiones)
+
+    def total_items(self) -> int:
+        """Calcula el total de ítems en stock."""
+        return sum(p.total_items() for p in self.particiones)
+
+    def valor_total(self) -> float:
+        """Calcula el valor total del stock combinando las sumas exactas de las particiones."""
+        return self.suma_valor().valor()
+
+    def suma_valor(self) -> SumaExacta:
+        """Combina sin redondeos la suma exacta del valor de cada partición."""
+        suma = SumaExacta()
+        for particion in self.particiones:
+            suma.combinar(particion.suma_valor())
+        return suma
+
+    def producto_mas_caro(self) -> Optional[Producto]:
+        """Obtiene el producto más caro; en empate, el de menor ID."""
+        candidatos = [p for p in (r.producto_mas_caro() for r in self.particiones) if p is not None]
+        return max(candidatos, key=lambda p: (p.precio, -p.id_producto)) if candidatos else None
+
+    def producto_mas_barato(self) -> Optional[Producto]:
+        """Obtiene el producto más barato; en empate, el de menor ID."""
+        candidatos = [p for p in (r.producto_mas_barato() for r in self.particiones) if p is not None]
+        return min(candidatos, key=lambda p: (p.precio, p.id_producto)) if candidatos else None
+
+    def obtener_por_rango_stock(self, minimo: Optional[int] = None, maximo: Optional[int] = None) -> List[Producto]:
+        """Obtiene los productos con stock entre minimo y maximo, ordenados por stock."""
+        return list(heapq.merge(*(p.obtener_por_rango_stock(minimo, maximo) for p in self.particiones),
+                                key=lambda p: (p.cantidad, p.id_producto)))
+
+    def obtener_por_libreria(self, libreria: Libreria) -> List[Producto]:
+        """Obtiene productos por categoría, ordenados por ID."""
+        return sorted(chain.from_iterable(p.obtener_por_libreria(libreria) for p in self.particiones),
+                      key=_por_id)
+
+    def buscar(self, texto: str, libreria: Optional[Libreria] = None, limite: int = 20) -> List[Producto]:
+        """Busca en cada partición y combina los mejores resultados de todas."""
+        consulta = preparar_consulta(texto)
+        if consulta is None:
+            return []
+        encontrados = []
+        for particion in self.particiones:
+            for producto in particion.buscar(texto, libreria, limite):
+                encontrados.append((palabra_coincidente(producto, *consulta), producto.id_producto, producto))
+        encontrados.sort(key=lambda e: (e[0], e[1]))
+        return [producto for _, _, producto in encontrados[:limite]]
+
+    def ranking(self, criterio: str, cantidad: int = 10, libreria: Optional[Libreria] = None) -> List[Producto]:
+        """Combina los mejores `cantidad` de cada partición."""
+        valor = criterio_ranking(criterio)
+        candidatos = chain.from_iterable(p.ranking(criterio, cantidad, libreria) for p in self.particiones)
+        return heapq.nsmallest(cantidad, candidatos, key=lambda p: (-valor(p), p.id_producto))
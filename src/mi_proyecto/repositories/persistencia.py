@@ -0,0 +1,344 @@
+"""
+Módulo de Repositorios - Persistencia
+Agrega durabilidad al repositorio en memoria mediante un diario
+de solo agregado y snapshots binarios periódicos
+"""
+
+import gc
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import BinaryIO, Iterator, List, Optional, Sequence
+from ..models.producto import Producto, Libreria
+from .inventario import RepositorioMemoria
+
+# El código de cada categoría es su posición en Libreria: las nuevas
+# categorías deben agregarse al final para no alterar los archivos existentes.
+_LIBRERIAS = tuple(Libreria)
+_CODIGOS = {libreria: codigo for codigo, libreria in enumerate(_LIBRERIAS)}
+
+_VERSION = 1
+_CABECERA_DIARIO = struct.Struct("<4sIQ")        # magia, versión, generación
+_CABECERA_SNAPSHOT = struct.Struct("<4sIQqQ")    # magia, versión, generación, contador, productos
+_LARGO_TEXTO = struct.Struct("<Q")
+_MARCO = struct.Struct("<II")                    # largo del registro, crc32
+_ALTA = struct.Struct("<qdqdBqII")               # id, precio, cantidad, creado, libreria, contador, largos
+_BAJA = struct.Struct("<q")                      # id
+_CAMBIO = struct.Struct("<qqd")                  # id, cantidad, precio
+
+_TIPO_ALTA = b"A"
+_TIPO_BAJA = b"B"
+_TIPO_CAMBIO = b"C"
+
+
+def _codificar_alta(producto: Producto) -> bytes:
+    """Codifica un producto como registro de alta."""
+    nombre = producto.nombre.encode("utf-8")
+    descripcion = producto.descripcion.encode("utf-8")
+    return (_ALTA.pack(producto.id_producto, producto.precio, producto.cantidad, producto.creado,
+                       _CODIGOS[producto.libreria], Producto._contador, len(nombre), len(descripcion))
+            + nombre + descripcion)
+
+
+def _decodificar_alta(datos, inicio: int) -> "tuple[Producto, int, int]":
+    """Decodifica un registro de alta; retorna el producto, el contador y el fin del registro."""
+    (id_producto, precio, cantidad, creado, codigo, contador,
+     largo_nombre, largo_descripcion) = _ALTA.unpack_from(datos, inicio)
+    posicion = inicio + _ALTA.size
+    nombre = str(datos[posicion:posicion + largo_nombre], "utf-8")
+    posicion += largo_nombre
+    descripcion = str(datos[posicion:posicion + largo_descripcion], "utf-8")
+    posicion += largo_descripcion
+    producto = Producto.restaurar(id_producto, nombre, descripcion, precio,
+                                  cantidad, _LIBRERIAS[codigo], creado)
+    return producto, contador, posicion
+
+
+def _a_bytes(columna: array) -> bytes:
+    """Serializa una columna en little-endian."""
+    if sys.byteorder == "big":
+        columna = array(columna.typecode, columna)
+        columna.byteswap()
+    return columna.tobytes()
+
+
+def _partir(texto: str, largos: Sequence[int]) -> Iterator[str]:
+    """Divide un texto concatenado según los largos de cada parte."""
+    fin = 0
+    for largo in largos:
+        inicio, fin = fin, fin + largo
+        yield texto[inicio:fin]
+
+
+class RepositorioPersistente(RepositorioMemoria):
+    """
+    Repositorio en memoria con diario y snapshots en disco.
+
+    Cada alta, baja y cambio de stock o precio se agrega al diario. Un
+    snapshot guarda el catálogo completo y reinicia el diario; al abrir
+    el repositorio se carga el último snapshot (leído con mmap) y se
+    reproduce solo el diario posterior. Ambos archivos guardan el
+    contador de IDs de Producto para que nunca se reutilicen.
+    """
+
+    ARCHIVO_SNAPSHOT = "inventario.snap"
+    ARCHIVO_DIARIO = "inventario.diario"
+
+    def __init__(self, directorio: str, sincronizar_cada: int = 1, snapshot_cada: Optional[int] = None):
+        """
+        Abre el repositorio y recupera su estado.
+
+        Args:
+            directorio: Carpeta donde se guardan el snapshot y el diario
+            sincronizar_cada: Registros entre cada fsync del diario (1 = cada registro)
+            snapshot_cada: Registros del diario tras los cuales se guarda un snapshot automático
+        """
+        super().__init__()
+        if sincronizar_cada < 1:
+            raise ValueError("sincronizar_cada debe ser al menos 1")
+        os.makedirs(directorio, exist_ok=True)
+        self._ruta_snapshot = os.path.join(directorio, self.ARCHIVO_SNAPSHOT)
+        self._ruta_diario = os.path.join(directorio, self.ARCHIVO_DIARIO)
+        self._sincronizar_cada = sincronizar_cada
+        self._snapshot_cada = snapshot_cada
+        self._diario: Optional[BinaryIO] = None
+        self._pendientes = 0
+        self._registros = 0
+        # Mientras se reproduce el diario los cambios no se registran ni disparan snapshots
+        self._reproduciendo = False
+
+        # La recolección cíclica no aporta durante la carga y la hace mucho más lenta
+        recoleccion_activa = gc.isenabled()
+        gc.disable()
+        try:
+            self._generacion = self._cargar_snapshot()
+            self._reproducir_diario()
+        finally:
+            if recoleccion_activa:
+                gc.enable()
+        self._diario = open(self._ruta_diario, "ab")
+        # Recién con el diario truncado y abierto puede reemplazarse por un snapshot
+        with self._lock:
+            self._revisar_snapshot()
+
+    def _cargar_snapshot(self) -> int:
+        """
+        Carga el snapshot si existe y retorna su generación.
+
+        El snapshot guarda el catálogo por columnas: cada atributo numérico
+        es un arreglo contiguo y los textos van concatenados, de modo que la
+        lectura se resuelve con copias en bloque en lugar de registro a registro.
+        """
+        if not os.path.exists(self._ruta_snapshot):
+            return 0
+        with open(self._ruta_snapshot, "rb") as archivo:
+            with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+                magia, version, generacion, contador, cantidad = _CABECERA_SNAPSHOT.unpack_from(datos, 0)
+                if magia != b"INVS" or version != _VERSION:
+                    raise ValueError(f"Snapshot inválido: {self._ruta_snapshot}")
+                fin_datos = len(datos) - 4
+                (crc,) = struct.unpack_from("<I", datos, fin_datos)
+                if zlib.crc32(datos[_CABECERA_SNAPSHOT.size:fin_datos]) != crc:
+                    raise ValueError(f"Snapshot dañado: {self._ruta_snapshot}")
+
+                posicion = _CABECERA_SNAPSHOT.size
+                columnas = []
+                for tipo in "qdqdBII":
+                    columna = array(tipo)
+                    fin = posicion + columna.itemsize * cantidad
+                    columna.frombytes(datos[posicion:fin])
+                    if sys.byteorder == "big":
+                        columna.byteswap()
+                    columnas.append(columna)
+                    posicion = fin
+                textos = []
+                for _ in range(2):
+                    (largo,) = _LARGO_TEXTO.unpack_from(datos, posicion)
+                    posicion += _LARGO_TEXTO.size
+                    textos.append(str(datos[posicion:posicion + largo], "utf-8"))
+                    posicion += largo
+
+        ids, precios, cantidades, creados, codigos, largos_nombre, largos_descripcion = columnas
+        restaurar = Producto.restaurar
+        productos = [
+            restaurar(id_producto, nombre, descripcion, precio, cantidad_producto, _LIBRERIAS[codigo], creado)
+            for id_producto, nombre, descripcion, precio, cantidad_producto, codigo, creado in zip(
+                ids, _partir(textos[0], largos_nombre), _partir(textos[1], largos_descripcion),
+                precios, cantidades, codigos, creados)
+        ]
+        RepositorioMemoria.agregar_varios(self, productos)
+        Producto.sincronizar_contador(contador)
+        return generacion
+
+    def _reproducir_diario(self):
+        """Aplica los registros del diario posteriores al snapshot."""
+        if not os.path.exists(self._ruta_diario) or os.path.getsize(self._ruta_diario) == 0:
+            self._crear_diario(self._generacion)
+            return
+        with open(self._ruta_diario, "rb") as archivo:
+            datos = archivo.read()
+        magia, version, generacion = _CABECERA_DIARIO.unpack_from(datos, 0)
+        if magia != b"INVJ" or version != _VERSION:
+            raise ValueError(f"Diario inválido: {self._ruta_diario}")
+        if generacion != self._generacion:
+            # Diario anterior al snapshot: su contenido ya está incluido
+            self._crear_diario(self._generacion)
+            return
+
+        posicion = _CABECERA_DIARIO.size
+        vista = memoryview(datos)
+        self._reproduciendo = True
+        try:
+            while posicion + _MARCO.size <= len(datos):
+                largo, crc = _MARCO.unpack_from(datos, posicion)
+                inicio = posicion + _MARCO.size
+                registro = vista[inicio:inicio + largo]
+                if len(registro) < largo or zlib.crc32(registro) != crc:
+                    break
+                self._aplicar(registro)
+                posicion = inicio + largo
+                self._registros += 1
+        finally:
+            self._reproduciendo = False
+        if posicion < len(datos):
+            # Cola incompleta de una escritura interrumpida
+            with open(self._ruta_diario, "r+b") as archivo:
+                archivo.truncate(posicion)
+
+    def _aplicar(self, registro: memoryview):
+        """Aplica un registro del diario al estado en memoria."""
+        tipo = bytes(registro[:1])
+        if tipo == _TIPO_ALTA:
+            producto, contador, _ = _decodificar_alta(registro, 1)
+            RepositorioMemoria.agregar(self, producto)
+            Producto.sincronizar_contador(contador)
+        elif tipo == _TIPO_BAJA:
+            (id_producto,) = _BAJA.unpack_from(registro, 1)
+            RepositorioMemoria.eliminar(self, id_producto)
+        elif tipo == _TIPO_CAMBIO:
+            id_producto, cantidad, precio = _CAMBIO.unpack_from(registro, 1)
+            producto = self._productos[id_producto]
+            producto.actualizar_precio(precio)
+            producto.actualizar_cantidad(cantidad)
+        else:
+            raise ValueError(f"Registro de diario desconocido: {tipo!r}")
+
+    def _crear_diario(self, generacion: int):
+        """Reemplaza el diario por uno vacío de la generación indicada."""
+        temporal = self._ruta_diario + ".tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(_CABECERA_DIARIO.pack(b"INVJ", _VERSION, generacion))
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, self._ruta_diario)
+        self._registros = 0
+
+    def _registrar(self, registro: bytes):
+        """Agrega un registro al diario, sincronizando según la configuración."""
+        if self._diario is None:
+            return
+        self._diario.write(_MARCO.pack(len(registro), zlib.crc32(registro)) + registro)
+        self._pendientes += 1
+        self._registros += 1
+        if self._pendientes >= self._sincronizar_cada:
+            self.sincronizar()
+
+    def _revisar_snapshot(self):
+        """Guarda un snapshot si el diario alcanzó el tamaño configurado."""
+        if self._snapshot_cada is not None and self._registros >= self._snapshot_cada:
+            self.guardar_snapshot()
+
+    def sincronizar(self):
+        """Fuerza a disco los registros pendientes del diario."""
+        with self._lock:
+            if self._diario is not None and self._pendientes:
+                self._diario.flush()
+                os.fsync(self._diario.fileno())
+                self._pendientes = 0
+
+    def guardar_snapshot(self):
+        """Guarda el catálogo completo y reinicia el diario."""
+        with self._lock:
+            generacion = self._generacion + 1
+            temporal = self._ruta_snapshot + ".tmp"
+            productos = list(self._productos.values())
+            nombres = [p.nombre for p in productos]
+            descripciones = [p.descripcion for p in productos]
+            bloques = [
+                _a_bytes(array("q", [p.id_producto for p in productos])),
+                _a_bytes(array("d", [p.precio for p in productos])),
+                _a_bytes(array("q", [p.cantidad for p in productos])),
+                _a_bytes(array("d", [p.creado for p in productos])),
+                _a_bytes(array("B", [_CODIGOS[p.libreria] for p in productos])),
+                _a_bytes(array("I", map(len, nombres))),
+                _a_bytes(array("I", map(len, descripciones))),
+            ]
+            for textos in (nombres, descripciones):
+                texto = "".join(textos).encode("utf-8")
+                bloques.append(_LARGO_TEXTO.pack(len(texto)))
+                bloques.append(texto)
+
+            crc = 0
+            with open(temporal, "wb") as archivo:
+                archivo.write(_CABECERA_SNAPSHOT.pack(b"INVS", _VERSION, generacion,
+                                                      Producto._contador, len(productos)))
+                for bloque in bloques:
+                    crc = zlib.crc32(bloque, crc)
+                    archivo.write(bloque)
+                archivo.write(struct.pack("<I", crc))
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(temporal, self._ruta_snapshot)
+
+            # Si se interrumpe aquí, el diario viejo se descarta al abrir por su generación
+            if self._diario is not None:
+                self._diario.close()
+            self._generacion = generacion
+            self._crear_diario(generacion)
+            self._diario = open(self._ruta_diario, "ab")
+            self._pendientes = 0
+
+    def cerrar(self):
+        """Sincroniza y cierra el diario."""
+        with self._lock:
+            if self._diario is not None:
+                self.sincronizar()
+                self._diario.close()
+                self._diario = None
+
+    def agregar(self, producto: Producto) -> bool:
+        """Agrega un producto y lo registra en el diario."""
+        with self._lock:
+            super().agregar(producto)
+            self._registrar(_TIPO_ALTA + _codificar_alta(producto))
+            self._revisar_snapshot()
+        return True
+
+    def agregar_varios(self, productos: List[Producto]) -> bool:
+        """Agrega varios productos y los registra en el diario."""
+        with self._lock:
+            super().agregar_varios(productos)
+            for producto in productos:
+                self._registrar(_TIPO_ALTA + _codificar_alta(producto))
+            self._revisar_snapshot()
+        return True
+
+    def eliminar(self, id_producto: int) -> bool:
+        """Elimina un producto y registra la baja en el diario."""
+        with self._lock:
+            if not super().eliminar(id_producto):
+                return False
+            self._registrar(_TIPO_BAJA + _BAJA.pack(id_producto))
+            self._revisar_snapshot()
+        return True
+
+    def notificar_cambio(self, producto: Producto, cantidad_anterior: int, precio_anterior: float):
+        """Actualiza los índices y registra el nuevo stock y precio en el diario."""
+        with self._lock:
+            super().notificar_cambio(producto, cantidad_anterior, precio_anterior)
+            if not self._reproduciendo and self._productos.get(producto.id_producto) is producto:
+                self._registrar(_TIPO_CAMBIO + _CAMBIO.pack(producto.id_producto, producto.cantidad, producto.precio))
+                self._revisar_snapshot()
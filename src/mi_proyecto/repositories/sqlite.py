@@ -0,0 +1,342 @@
+"""
+Módulo de Repositorios - Repositorio SQLite
+Persiste los productos en una base SQLite y resuelve los
+reportes con consultas agregadas
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+from ..models.producto import Producto, Libreria
+from .indices import criterio_ranking
+from .inventario import IRepositorio
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS productos (
+    id_producto INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    descripcion TEXT NOT NULL,
+    precio REAL NOT NULL,
+    cantidad INTEGER NOT NULL,
+    libreria TEXT NOT NULL,
+    creado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_productos_libreria ON productos (libreria, id_producto);
+CREATE INDEX IF NOT EXISTS idx_productos_cantidad ON productos (cantidad, id_producto);
+CREATE INDEX IF NOT EXISTS idx_productos_precio ON productos (precio, id_producto);
+"""
+
+# Sentencias fijas: sqlite3 reutiliza la sentencia preparada de cada texto SQL
+_COLUMNAS = "id_producto, nombre, descripcion, precio, cantidad, libreria, creado"
+_INSERTAR = f"INSERT INTO productos ({_COLUMNAS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_OBTENER = f"SELECT {_COLUMNAS} FROM productos WHERE id_producto = ?"
+_OBTENER_TODOS = f"SELECT {_COLUMNAS} FROM productos ORDER BY id_producto"
+_OBTENER_DESDE = f"SELECT {_COLUMNAS} FROM productos WHERE id_producto > ? ORDER BY id_producto LIMIT ?"
+_ELIMINAR = "DELETE FROM productos WHERE id_producto = ?"
+_ACTUALIZAR_CANTIDAD = "UPDATE productos SET cantidad = ? WHERE id_producto = ?"
+_ACTUALIZAR_PRECIO = "UPDATE productos SET precio = ? WHERE id_producto = ?"
+_CONTAR = "SELECT COUNT(*) FROM productos"
+_TOTAL_ITEMS = "SELECT COALESCE(SUM(cantidad), 0) FROM productos"
+_VALOR_TOTAL = "SELECT COALESCE(SUM(precio * cantidad), 0.0) FROM productos"
+_MAS_CARO = (f"SELECT {_COLUMNAS} FROM productos "
+             "WHERE precio = (SELECT MAX(precio) FROM productos) ORDER BY id_producto LIMIT 1")
+_MAS_BARATO = (f"SELECT {_COLUMNAS} FROM productos "
+               "WHERE precio = (SELECT MIN(precio) FROM productos) ORDER BY id_producto LIMIT 1")
+_POR_LIBRERIA = f"SELECT {_COLUMNAS} FROM productos WHERE libreria = ? ORDER BY id_producto"
+_RESUMEN_LIBRERIA = ("SELECT libreria, COUNT(*), SUM(cantidad), SUM(precio * cantidad) "
+                     "FROM productos GROUP BY libreria")
+_MAXIMO_ID = "SELECT MAX(id_producto) FROM productos"
+# Expresión por la que se ordena cada criterio de ranking
+_ORDEN_RANKING = {"precio": "precio", "valor": "precio * cantidad", "cantidad": "cantidad"}
+
+# Código extendido de SQLite para una clave primaria repetida
+_SQLITE_CONSTRAINT_PRIMARYKEY = 1555
+
+# Máximo de parámetros por consulta IN (...), por debajo del límite de SQLite
+_LOTE_IDS = 500
+# Filas leídas por consulta al recorrer la tabla con iterar()
+_LOTE_RECORRIDO = 1000
+
+
+class RepositorioSQLite(IRepositorio):
+    """
+    Repositorio que persiste los productos en SQLite.
+
+    Usa modo WAL, una conexión de escritura protegida por un lock y un
+    pool de conexiones de lectura, de modo que varios hilos puedan leer
+    mientras otro escribe. Los objetos Producto se crean al leer y sus
+    cambios de cantidad o precio se escriben en la base al notificarse.
+    """
+
+    def __init__(self, ruta: str, lectores: int = 4):
+        """
+        Abre (o crea) la base de datos.
+
+        Args:
+            ruta: Archivo de la base, o ":memory:" para una base temporal
+            lectores: Tamaño del pool de conexiones de lectura
+        """
+        self._ruta = ruta
+        self._lock_escritura = threading.Lock()
+        self._escritura = self._conectar()
+        self._escritura.executescript(_ESQUEMA)
+
+        # Una base en memoria no se comparte entre conexiones: se usa solo la de escritura
+        self._en_memoria = ruta == ":memory:"
+        self._lectores: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        if not self._en_memoria:
+            for _ in range(max(lectores, 1)):
+                self._lectores.put(self._conectar())
+
+        maximo = self._escritura.execute(_MAXIMO_ID).fetchone()[0]
+        if maximo is not None:
+            Producto.sincronizar_contador(maximo)
+
+    def _conectar(self) -> sqlite3.Connection:
+        """Crea una conexión configurada para el repositorio."""
+        conexion = sqlite3.connect(self._ruta, check_same_thread=False,
+                                   isolation_level=None, cached_statements=256)
+        conexion.execute("PRAGMA journal_mode = WAL")
+        conexion.execute("PRAGMA synchronous = NORMAL")
+        return conexion
+
+    @contextmanager
+    def _lectura(self) -> Iterator[sqlite3.Connection]:
+        """Presta una conexión de lectura del pool."""
+        if self._en_memoria:
+            with self._lock_escritura:
+                yield self._escritura
+            return
+        conexion = self._lectores.get()
+        try:
+            yield conexion
+        finally:
+            self._lectores.put(conexion)
+
+    @contextmanager
+    def _transaccion(self) -> Iterator[sqlite3.Connection]:
+        """Ejecuta un bloque de escrituras como una sola transacción."""
+        with self._lock_escritura:
+            conexion = self._escritura
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                yield conexion
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+            conexion.execute("COMMIT")
+
+    def cerrar(self):
+        """Cierra todas las conexiones."""
+        with self._lock_escritura:
+            self._escritura.close()
+        while not self._lectores.empty():
+            self._lectores.get_nowait().close()
+
+    @staticmethod
+    def _fila(producto: Producto) -> tuple:
+        """Convierte un producto en los parámetros de _INSERTAR."""
+        return (producto.id_producto, producto.nombre, producto.descripcion, producto.precio,
+                producto.cantidad, producto.libreria.name, producto.creado)
+
+    @staticmethod
+    def _es_id_repetido(error: sqlite3.IntegrityError) -> bool:
+        """Indica si el error se debe a un ID de producto que ya existe."""
+        codigo = getattr(error, "sqlite_errorcode", None)
+        if codigo is not None:
+            return codigo == _SQLITE_CONSTRAINT_PRIMARYKEY
+        return str(error) == "UNIQUE constraint failed: productos.id_producto"
+
+    def _producto(self, fila: Sequence[Any]) -> Producto:
+        """Crea el objeto Producto de una fila de la base."""
+        id_producto, nombre, descripcion, precio, cantidad, libreria, creado = fila
+        producto = Producto.restaurar(id_producto, nombre, descripcion, precio,
+                                      cantidad, Libreria[libreria], creado)
+        producto._observador = self
+        return producto
+
+    def _consultar(self, sql: str, parametros: Sequence[Any] = ()) -> List[Producto]:
+        """Ejecuta una consulta de productos y crea los objetos resultantes."""
+        with self._lectura() as conexion:
+            filas = conexion.execute(sql, parametros).fetchall()
+        return [self._producto(fila) for fila in filas]
+
+    def _escalar(self, sql: str) -> Any:
+        """Ejecuta una consulta que retorna un único valor."""
+        with self._lectura() as conexion:
+            return conexion.execute(sql).fetchone()[0]
+
+    def agregar(self, producto: Producto) -> bool:
+        """Agrega un producto a la base."""
+        try:
+            with self._lock_escritura:
+                self._escritura.execute(_INSERTAR, self._fila(producto))
+        except sqlite3.IntegrityError as e:
+            if not self._es_id_repetido(e):
+                raise
+            raise ValueError(f"El producto con ID {producto.id_producto} ya existe") from None
+        producto._observador = self
+        return True
+
+    def agregar_varios(self, productos: List[Producto]) -> bool:
+        """Agrega varios productos en una sola transacción con executemany."""
+        try:
+            with self._transaccion() as conexion:
+                conexion.executemany(_INSERTAR, (self._fila(p) for p in productos))
+        except sqlite3.IntegrityError as e:
+            if not self._es_id_repetido(e):
+                raise
+            ids = [p.id_producto for p in productos]
+            existentes = self.obtener_cantidades(ids)
+            vistos = set()
+            for id_producto in ids:
+                if id_producto in existentes or id_producto in vistos:
+                    raise ValueError(f"El producto con ID {id_producto} ya existe") from None
+                vistos.add(id_producto)
+            raise
+        for producto in productos:
+            producto._observador = self
+        return True
+
+    def obtener(self, id_producto: int) -> Optional[Producto]:
+        """Obtiene un producto por su ID."""
+        productos = self._consultar(_OBTENER, (id_producto,))
+        return productos[0] if productos else None
+
+    def obtener_todos(self) -> List[Producto]:
+        """Obtiene todos los productos ordenados por ID."""
+        return self._consultar(_OBTENER_TODOS)
+
+    def iterar(self) -> Iterator[Producto]:
+        """
+        Recorre los productos en orden de ID, leyéndolos por lotes.
+        Cada lote continúa desde el último ID leído, así que la conexión
+        no queda tomada entre lotes.
+        """
+        ultimo = -(1 << 63)
+        while True:
+            lote = self._consultar(_OBTENER_DESDE, (ultimo, _LOTE_RECORRIDO))
+            yield from lote
+            if len(lote) < _LOTE_RECORRIDO:
+                return
+            ultimo = lote[-1].id_producto
+
+    def _por_lotes_de_ids(self, columnas: str, ids: Iterable[int]) -> List[tuple]:
+        """Consulta filas por ID en lotes de parámetros IN (...)."""
+        ids = list(dict.fromkeys(ids))
+        filas = []
+        with self._lectura() as conexion:
+            for inicio in range(0, len(ids), _LOTE_IDS):
+                lote = ids[inicio:inicio + _LOTE_IDS]
+                marcadores = ", ".join("?" * len(lote))
+                sql = f"SELECT {columnas} FROM productos WHERE id_producto IN ({marcadores})"
+                filas.extend(conexion.execute(sql, lote).fetchall())
+        return filas
+
+    def obtener_varios(self, ids: Iterable[int]) -> Dict[int, Producto]:
+        """Obtiene los productos existentes entre los IDs indicados."""
+        productos = [self._producto(fila) for fila in self._por_lotes_de_ids(_COLUMNAS, ids)]
+        return {p.id_producto: p for p in productos}
+
+    def obtener_cantidades(self, ids: Iterable[int]) -> Dict[int, int]:
+        """Obtiene el stock actual de los IDs indicados."""
+        return dict(self._por_lotes_de_ids("id_producto, cantidad", ids))
+
+    def actualizar_cantidades(self, cantidades: Dict[int, int]) -> bool:
+        """Asigna la nueva cantidad de varios productos con executemany."""
+        with self._transaccion() as conexion:
+            cursor = conexion.executemany(_ACTUALIZAR_CANTIDAD,
+                                          ((c, i) for i, c in cantidades.items()))
+            if cursor.rowcount != len(cantidades):
+                raise ValueError("Alguno de los productos no existe")
+        return True
+
+    def eliminar(self, id_producto: int) -> bool:
+        """Elimina un producto de la base."""
+        with self._lock_escritura:
+            cursor = self._escritura.execute(_ELIMINAR, (id_producto,))
+        return cursor.rowcount > 0
+
+    def notificar_cambio(self, producto: Producto, cantidad_anterior: int, precio_anterior: float):
+        """
+        Escribe en la base la nueva cantidad o precio del producto.
+
+        Solo se escribe la columna que cambió: el objeto puede ser una
+        copia leída antes, cuyo otro campo ya no coincide con la base.
+        """
+        with self._lock_escritura:
+            if producto.cantidad != cantidad_anterior:
+                self._escritura.execute(_ACTUALIZAR_CANTIDAD, (producto.cantidad, producto.id_producto))
+            if producto.precio != precio_anterior:
+                self._escritura.execute(_ACTUALIZAR_PRECIO, (producto.precio, producto.id_producto))
+
+    def contar(self) -> int:
+        """Retorna la cantidad de productos."""
+        return self._escalar(_CONTAR)
+
+    def total_items(self) -> int:
+        """Calcula el total de ítems en stock."""
+        return self._escalar(_TOTAL_ITEMS)
+
+    def valor_total(self) -> float:
+        """Calcula el valor total del stock."""
+        return float(self._escalar(_VALOR_TOTAL))
+
+    def producto_mas_caro(self) -> Optional[Producto]:
+        """Obtiene el producto más caro; en empate, el de menor ID."""
+        productos = self._consultar(_MAS_CARO)
+        return productos[0] if productos else None
+
+    def producto_mas_barato(self) -> Optional[Producto]:
+        """Obtiene el producto más barato; en empate, el de menor ID."""
+        productos = self._consultar(_MAS_BARATO)
+        return productos[0] if productos else None
+
+    def obtener_por_rango_stock(self, minimo: Optional[int] = None, maximo: Optional[int] = None) -> List[Producto]:
+        """Obtiene los productos con stock entre minimo y maximo, ordenados por stock."""
+        condiciones, parametros = [], []
+        if minimo is not None:
+            condiciones.append("cantidad >= ?")
+            parametros.append(minimo)
+        if maximo is not None:
+            condiciones.append("cantidad <= ?")
+            parametros.append(maximo)
+        donde = f"WHERE {' AND '.join(condiciones)} " if condiciones else ""
+        sql = f"SELECT {_COLUMNAS} FROM productos {donde}ORDER BY cantidad, id_producto"
+        return self._consultar(sql, parametros)
+
+    def obtener_por_libreria(self, libreria: Libreria) -> List[Producto]:
+        """Obtiene productos por categoría."""
+        return self._consultar(_POR_LIBRERIA, (libreria.name,))
+
+    def resumen_por_libreria(self) -> Dict[Libreria, Dict[str, Any]]:
+        """Retorna cantidad de productos, ítems y valor por categoría."""
+        resumen = {libreria: {"total_productos": 0, "total_items": 0, "valor_total": 0.0}
+                   for libreria in Libreria}
+        with self._lectura() as conexion:
+            filas = conexion.execute(_RESUMEN_LIBRERIA).fetchall()
+        for libreria, productos, items, valor in filas:
+            resumen[Libreria[libreria]] = {
+                "total_productos": productos,
+                "total_items": items,
+                "valor_total": float(valor),
+            }
+        return resumen
+
+    def ranking(self, criterio: str, cantidad: int = 10, libreria: Optional[Libreria] = None) -> List[Producto]:
+        """Obtiene los productos de mayor valor según el criterio; en empate, el de menor ID."""
+        criterio_ranking(criterio)
+        donde, parametros = "", []
+        if libreria is not None:
+            donde = "WHERE libreria = ? "
+            parametros.append(libreria.name)
+        sql = (f"SELECT {_COLUMNAS} FROM productos {donde}"
+               f"ORDER BY {_ORDEN_RANKING[criterio]} DESC, id_producto LIMIT ?")
+        return self._consultar(sql, parametros + [max(cantidad, 0)])
+
+    def instantanea(self) -> "Instantanea":
+        """Retorna una vista con copias de los productos leídas en una sola consulta."""
+        from .instantanea import Instantanea
+        return Instantanea.copiar(self._consultar(_OBTENER_TODOS))
@@ -0,0 +1,283 @@
+"""
+Módulo de Servicios - Comandos por lotes
+Ejecuta sin interacción comandos leídos en formato JSON Lines
+"""
+
+import json
+import time
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+from ..models.producto import Producto, Libreria
+from ..repositories.indices import normalizar_texto
+from ..repositories.inventario import Inventario
+from ..utils.validadores import Validadores
+
+# Operaciones de escritura que pueden acumularse en lotes
+_MOVIMIENTOS = {"reponer": 1, "vender": -1}
+
+
+def producto_a_dict(producto: Producto) -> Dict[str, Any]:
+    """Convierte un producto a un diccionario serializable en JSON."""
+    return {
+        "id": producto.id_producto,
+        "nombre": producto.nombre,
+        "precio": producto.precio,
+        "cantidad": producto.cantidad,
+        "libreria": producto.libreria.name,
+    }
+
+
+def _serializable(valor: Any) -> Any:
+    """Reemplaza los productos de un resultado por diccionarios."""
+    if isinstance(valor, Producto):
+        return producto_a_dict(valor)
+    if isinstance(valor, dict):
+        return {clave: _serializable(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [_serializable(v) for v in valor]
+    return valor
+
+
+class ProcesadorComandos:
+    """
+    Ejecuta comandos JSON Lines sobre un inventario.
+
+    Cada línea es un objeto con el campo "op":
+
+        {"op": "agregar", "nombre": ..., "descripcion": ..., "precio": ..,
+         "cantidad": .., "libreria": ...}
+        {"op": "reponer", "id": .., "cantidad": ..}
+        {"op": "vender", "id": .., "cantidad": ..}
+        {"op": "bajo_stock", "limite": 10}
+        {"op": "buscar", "texto": ..., "limite": 20}
+        {"op": "reporte"}
+        {"op": "mas_vendidos", "limite": 10}
+        {"op": "dias_de_stock", "limite": 10}
+
+    Los dos últimos requieren que el inventario registre sus movimientos.
+    Las ventas y reposiciones correctas no producen salida.
+
+    Por cada comando que produce un resultado se escribe una línea JSON
+    con el número de línea de entrada; los errores se escriben como
+    {"linea": n, "error": "..."} y no detienen la ejecución.
+
+    Con tamano_lote mayor que 1, los agregados consecutivos y las
+    ventas y reposiciones consecutivas se acumulan y se aplican juntos
+    (Inventario.agregar_productos, Inventario.aplicar_movimientos). Como
+    esos métodos no aplican nada si una fila falla, un lote con errores
+    se vuelve a aplicar por partes para informar el error de cada línea.
+    """
+
+    def __init__(self, inventario: Inventario, salida: TextIO, tamano_lote: int = 1, reportes=None):
+        """
+        Inicializa el procesador
+
+        Args:
+            inventario: Inventario sobre el que se ejecutan los comandos
+            salida: Destino de los resultados
+            tamano_lote: Máximo de comandos de escritura aplicados juntos
+            reportes: Generador de reportes a usar; si no se indica, se
+                crea con el primer comando que lo necesita
+        """
+        if tamano_lote <= 0:
+            raise ValueError("El tamaño de lote debe ser positivo")
+        self.inventario = inventario
+        self.salida = salida
+        self.tamano_lote = tamano_lote
+        self._reportes = reportes
+        self._categorias: Dict[str, Libreria] = {}
+        for libreria in Libreria:
+            self._categorias[normalizar_texto(libreria.name)] = libreria
+            self._categorias[normalizar_texto(libreria.value)] = libreria
+        # Escrituras pendientes: tipo ("agregar" o "movimiento") y (línea, datos)
+        self._tipo_pendiente: Optional[str] = None
+        self._pendientes: List[Tuple[int, Any]] = []
+        self.comandos = 0
+        self.errores = 0
+
+    @property
+    def reportes(self):
+        """Generador de reportes, creado con el primer comando que lo necesita."""
+        if self._reportes is None:
+            from .reportes import GeneradorReportes
+            self._reportes = GeneradorReportes(self.inventario)
+        return self._reportes
+
+    def ejecutar(self, entrada: Iterable[str]) -> Dict[str, Any]:
+        """
+        Ejecuta todos los comandos de la entrada
+
+        Args:
+            entrada: Líneas JSON, p. ej. un archivo abierto
+
+        Returns:
+            Dict con comandos, errores, segundos y comandos_por_segundo
+        """
+        inicio = time.perf_counter()
+        for numero, linea in enumerate(entrada, 1):
+            if not linea.strip():
+                continue
+            self.comandos += 1
+            try:
+                comando = json.loads(linea)
+                if not isinstance(comando, dict):
+                    raise ValueError("El comando debe ser un objeto JSON")
+                self._despachar(numero, comando)
+            except ValueError as e:
+                # json.JSONDecodeError también es ValueError; las escrituras
+                # acumuladas se aplican antes para respetar el orden de la salida
+                self._aplicar_pendientes()
+                self._error(numero, e)
+        self._aplicar_pendientes()
+        segundos = time.perf_counter() - inicio
+        return {
+            "comandos": self.comandos,
+            "errores": self.errores,
+            "segundos": segundos,
+            "comandos_por_segundo": self.comandos / segundos if segundos > 0 else 0.0,
+        }
+
+    # --- Despacho ---
+
+    def _despachar(self, numero: int, comando: Dict[str, Any]):
+        """Ejecuta o acumula un comando."""
+        op = comando.get("op")
+        if op == "agregar":
+            self._encolar(numero, "agregar", self._fila(comando))
+        elif op in _MOVIMIENTOS:
+            id_producto = self._entero(comando, "id")
+            cantidad = self._entero(comando, "cantidad")
+            if cantidad <= 0:
+                raise ValueError("La cantidad debe ser positiva")
+            self._encolar(numero, "movimiento", (id_producto, _MOVIMIENTOS[op] * cantidad))
+        elif op == "bajo_stock":
+            self._aplicar_pendientes()
+            limite = self._entero(comando, "limite", 10)
+            productos = self.inventario.obtener_productos_bajo_stock(limite)
+            self._escribir({"linea": numero, "productos": [producto_a_dict(p) for p in productos]})
+        elif op == "buscar":
+            self._aplicar_pendientes()
+            texto = comando.get("texto")
+            if not isinstance(texto, str):
+                raise ValueError("El campo 'texto' debe ser texto")
+            productos = self.inventario.buscar(texto, limite=self._entero(comando, "limite", 20))
+            self._escribir({"linea": numero, "productos": [producto_a_dict(p) for p in productos]})
+        elif op == "reporte":
+            self._aplicar_pendientes()
+            reporte = self.reportes.reporte_completo()
+            self._escribir({"linea": numero, "reporte": _serializable(reporte)})
+        elif op == "mas_vendidos":
+            self._aplicar_pendientes()
+            vendidos = self.reportes.productos_mas_vendidos(self._entero(comando, "limite", 10))
+            self._escribir({"linea": numero, "productos": [
+                {**producto_a_dict(p), "vendidos": unidades} for p, unidades in vendidos]})
+        elif op == "dias_de_stock":
+            self._aplicar_pendientes()
+            estimaciones = self.reportes.dias_de_stock(self._entero(comando, "limite", 10))
+            self._escribir({"linea": numero, "productos": [
+                {**producto_a_dict(p), "dias": dias} for p, dias in estimaciones]})
+        else:
+            raise ValueError(f"Operación desconocida: {op!r}")
+
+    def _encolar(self, numero: int, tipo: str, datos: Any):
+        """Acumula una escritura o la aplica de inmediato si no se usan lotes."""
+        if tipo != self._tipo_pendiente:
+            self._aplicar_pendientes()
+            self._tipo_pendiente = tipo
+        self._pendientes.append((numero, datos))
+        if len(self._pendientes) >= self.tamano_lote:
+            self._aplicar_pendientes()
+
+    def _aplicar_pendientes(self):
+        """Aplica las escrituras acumuladas."""
+        if not self._pendientes:
+            return
+        pendientes, tipo = self._pendientes, self._tipo_pendiente
+        self._pendientes, self._tipo_pendiente = [], None
+        if tipo == "agregar":
+            self._aplicar_agregados(pendientes)
+        else:
+            self._aplicar_movimientos(pendientes)
+
+    def _aplicar_agregados(self, pendientes: List[Tuple[int, tuple]]):
+        """Agrega productos y escribe el ID asignado a cada uno."""
+        if len(pendientes) > 1:
+            try:
+                productos = self.inventario.agregar_productos([fila for _, fila in pendientes])
+            except ValueError:
+                pass
+            else:
+                for (numero, _), producto in zip(pendientes, productos):
+                    self._escribir({"linea": numero, "id": producto.id_producto})
+                return
+        for numero, fila in pendientes:
+            try:
+                producto = self.inventario.agregar_producto(*fila)
+            except ValueError as e:
+                self._error(numero, e)
+            else:
+                self._escribir({"linea": numero, "id": producto.id_producto})
+
+    def _aplicar_movimientos(self, pendientes: List[Tuple[int, Tuple[int, int]]]):
+        """
+        Aplica ventas y reposiciones; solo se escriben los errores.
+
+        Si el lote falla se divide en mitades, que se aplican en orden,
+        hasta aislar los comandos con error.
+        """
+        if len(pendientes) > 1:
+            try:
+                self.inventario.aplicar_movimientos([movimiento for _, movimiento in pendientes])
+            except ValueError:
+                mitad = len(pendientes) // 2
+                self._aplicar_movimientos(pendientes[:mitad])
+                self._aplicar_movimientos(pendientes[mitad:])
+            return
+        for numero, (id_producto, delta) in pendientes:
+            try:
+                if delta > 0:
+                    self.inventario.aumentar_stock(id_producto, delta)
+                else:
+                    self.inventario.disminuir_stock(id_producto, -delta)
+            except ValueError as e:
+                self._error(numero, e)
+
+    # --- Conversión de campos ---
+
+    @staticmethod
+    def _entero(comando: Dict[str, Any], campo: str, defecto: Optional[int] = None) -> int:
+        """Lee un campo entero del comando."""
+        valor = comando.get(campo, defecto)
+        try:
+            Validadores.validar_entero(valor)
+        except ValueError:
+            raise ValueError(f"El campo '{campo}' debe ser un número entero") from None
+        return valor
+
+    def _fila(self, comando: Dict[str, Any]) -> tuple:
+        """Valida un comando agregar y retorna sus campos en orden."""
+        nombre = comando.get("nombre")
+        Validadores.validar_nombre_no_vacio(nombre)
+        descripcion = comando.get("descripcion", "")
+        if not isinstance(descripcion, str):
+            raise ValueError("La descripción debe ser texto")
+        # json.loads acepta NaN e Infinity: el validador rechaza los precios no finitos
+        precio = comando.get("precio")
+        Validadores.validar_precio_positivo(precio)
+        cantidad = self._entero(comando, "cantidad")
+        Validadores.validar_cantidad_no_negativa(cantidad)
+        libreria = comando.get("libreria")
+        categoria = self._categorias.get(normalizar_texto(libreria.strip())) if isinstance(libreria, str) else None
+        if categoria is None:
+            raise ValueError(f"Categoría inválida: {libreria!r}")
+        return nombre, descripcion, float(precio), cantidad, categoria
+
+    # --- Salida ---
+
+    def _escribir(self, resultado: Dict[str, Any]):
+        """Escribe un resultado como una línea JSON."""
+        self.salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+    def _error(self, numero: int, error: Exception):
+        """Escribe el error de un comando."""
+        self.errores += 1
+        self._escribir({"linea": numero, "error": str(error)})
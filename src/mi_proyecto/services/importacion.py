@@ -0,0 +1,267 @@
+"""
+Módulo de Servicios - Importación y exportación
+Carga y guarda catálogos de productos en archivos CSV y JSON Lines
+"""
+
+import csv
+import json
+import math
+import os
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from ..models.producto import Producto, Libreria
+from ..repositories.inventario import Inventario
+from ..utils.validadores import Validadores
+
+CAMPOS_IMPORTACION = ("nombre", "descripcion", "precio", "cantidad", "libreria")
+CAMPOS_EXPORTACION = ("id_producto", "nombre", "descripcion", "precio", "cantidad",
+                      "libreria", "fecha_creacion")
+FORMATOS = ("csv", "jsonl")
+
+# Registro leído del archivo: (número de línea, campos, error de lectura)
+Registro = Tuple[int, Dict[str, Any], Optional[str]]
+
+
+def _detectar_formato(ruta: str, formato: Optional[str]) -> str:
+    """Retorna el formato indicado o el que corresponde a la extensión del archivo."""
+    if formato is None:
+        extension = os.path.splitext(ruta)[1].lower().lstrip(".")
+        formato = "jsonl" if extension in ("jsonl", "ndjson") else extension
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}. Válidos: {', '.join(FORMATOS)}")
+    return formato
+
+
+def _lotes(registros: Iterable[Any], tamano: int) -> Iterator[List[Any]]:
+    """Agrupa un iterable en listas de a lo sumo `tamano` elementos."""
+    iterador = iter(registros)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+class ImportadorProductos:
+    """
+    Importa productos desde archivos CSV o JSON Lines.
+
+    El archivo se procesa por lotes de tamaño fijo (leer, validar,
+    construir, insertar), así que la memoria usada depende del tamaño
+    del lote y no del tamaño del archivo. Las filas inválidas se
+    escriben en un archivo de rechazos junto con el motivo.
+    """
+
+    def __init__(self, inventario: Inventario, tamano_lote: int = 5000):
+        """Inicializa el importador."""
+        if tamano_lote <= 0:
+            raise ValueError("El tamaño de lote debe ser positivo")
+        self.inventario = inventario
+        self.tamano_lote = tamano_lote
+        self._categorias = {}
+        for libreria in Libreria:
+            self._categorias[libreria.name.casefold()] = libreria
+            self._categorias[libreria.value.casefold()] = libreria
+        self._nombres_categorias = [libreria.name for libreria in Libreria]
+
+    def importar(self, ruta: str, ruta_rechazos: Optional[str] = None,
+                 formato: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Importa todos los productos de un archivo
+
+        Args:
+            ruta: Archivo a importar
+            ruta_rechazos: Archivo donde guardar las filas inválidas;
+                por defecto `<ruta>.rechazos.<formato>`
+            formato: "csv" o "jsonl"; por defecto se deduce de la extensión
+
+        Returns:
+            Dict con las filas leídas, importadas y rechazadas
+        """
+        formato = _detectar_formato(ruta, formato)
+        if ruta_rechazos is None:
+            ruta_rechazos = f"{os.path.splitext(ruta)[0]}.rechazos.{formato}"
+
+        leidos = importados = 0
+        rechazos = _ArchivoRechazos(ruta_rechazos, formato)
+        try:
+            with open(ruta, "r", encoding="utf-8", newline="") as archivo:
+                for lote in _lotes(self._leer(archivo, formato), self.tamano_lote):
+                    leidos += len(lote)
+                    filas, rechazados = self._validar(lote)
+                    rechazos.escribir(rechazados)
+                    if filas:
+                        importados += len(self.inventario.agregar_productos(filas))
+        finally:
+            rechazos.cerrar()
+
+        return {
+            "leidos": leidos,
+            "importados": importados,
+            "rechazados": rechazos.total,
+            "archivo_rechazos": ruta_rechazos if rechazos.total else None,
+        }
+
+    def _leer(self, archivo: TextIO, formato: str) -> Iterator[Registro]:
+        """Lee el archivo registro a registro."""
+        if formato == "csv":
+            lector = csv.DictReader(archivo)
+            faltantes = [c for c in CAMPOS_IMPORTACION if c not in (lector.fieldnames or ())]
+            if faltantes:
+                raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+            for campos in lector:
+                error = "Cantidad de columnas incorrecta" if None in campos or None in campos.values() else None
+                campos.pop(None, None)
+                yield lector.line_num, campos, error
+            return
+
+        for numero, linea in enumerate(archivo, 1):
+            if not linea.strip():
+                continue
+            try:
+                campos = json.loads(linea)
+            except ValueError as e:
+                yield numero, {"texto": linea.rstrip("\r\n")}, f"JSON inválido: {e}"
+                continue
+            if not isinstance(campos, dict):
+                yield numero, {"texto": linea.rstrip("\r\n")}, "Se esperaba un objeto JSON"
+                continue
+            yield numero, campos, None
+
+    def _convertir(self, campos: Dict[str, Any]) -> Tuple[Any, Any, Any, Any, Any]:
+        """Convierte los campos de texto a los tipos del producto."""
+        nombre = campos.get("nombre")
+        descripcion = campos.get("descripcion")
+        descripcion = "" if descripcion is None else str(descripcion)
+        precio = campos.get("precio")
+        if isinstance(precio, str):
+            try:
+                precio = float(precio)
+            except ValueError:
+                pass
+        if isinstance(precio, float) and not math.isfinite(precio):
+            precio = None
+        cantidad = campos.get("cantidad")
+        if isinstance(cantidad, str):
+            try:
+                cantidad = int(cantidad)
+            except ValueError:
+                pass
+        libreria = campos.get("libreria")
+        if isinstance(libreria, str):
+            libreria = self._categorias.get(libreria.strip().casefold(), libreria)
+        if isinstance(libreria, Libreria):
+            libreria = libreria.name
+        return nombre, descripcion, precio, cantidad, libreria
+
+    def _validar(self, lote: List[Registro]) -> Tuple[List[Tuple], List[Tuple[int, Dict[str, Any], str]]]:
+        """Separa un lote en filas válidas y filas rechazadas con su motivo."""
+        convertidos = [self._convertir(campos) for _, campos, _ in lote]
+        nombres, _, precios, cantidades, librerias = zip(*convertidos)
+        errores = zip(
+            Validadores.validar_nombres_no_vacios(nombres),
+            Validadores.validar_precios_positivos(precios),
+            Validadores.validar_cantidades_no_negativas(cantidades),
+            Validadores.validar_librerias_validas(librerias, self._nombres_categorias),
+        )
+
+        filas: List[Tuple] = []
+        rechazados: List[Tuple[int, Dict[str, Any], str]] = []
+        for (numero, campos, error_lectura), fila, errores_fila in zip(lote, convertidos, errores):
+            error = error_lectura or "; ".join(e for e in errores_fila if e)
+            if error:
+                rechazados.append((numero, campos, error))
+            else:
+                nombre, descripcion, precio, cantidad, libreria = fila
+                filas.append((nombre, descripcion, precio, cantidad, Libreria[libreria]))
+        return filas, rechazados
+
+
+class _ArchivoRechazos:
+    """Archivo de filas rechazadas; se crea recién con el primer rechazo."""
+
+    def __init__(self, ruta: str, formato: str):
+        self.ruta = ruta
+        self.formato = formato
+        self.total = 0
+        self._archivo: Optional[TextIO] = None
+        self._escritor: Optional[csv.DictWriter] = None
+
+    def escribir(self, rechazados: List[Tuple[int, Dict[str, Any], str]]):
+        """Agrega las filas rechazadas de un lote."""
+        if not rechazados:
+            return
+        if self._archivo is None:
+            self._archivo = open(self.ruta, "w", encoding="utf-8", newline="")
+            if self.formato == "csv":
+                self._escritor = csv.DictWriter(
+                    self._archivo, fieldnames=("linea", "error") + CAMPOS_IMPORTACION,
+                    extrasaction="ignore")
+                self._escritor.writeheader()
+        if self._escritor is not None:
+            self._escritor.writerows({**campos, "linea": numero, "error": error}
+                                     for numero, campos, error in rechazados)
+        else:
+            self._archivo.writelines(
+                json.dumps({"linea": numero, "error": error, "registro": campos}, ensure_ascii=False) + "\n"
+                for numero, campos, error in rechazados)
+        self.total += len(rechazados)
+
+    def cerrar(self):
+        """Cierra el archivo si llegó a crearse."""
+        if self._archivo is not None:
+            self._archivo.close()
+
+
+class ExportadorProductos:
+    """
+    Exporta los productos del inventario a archivos CSV o JSON Lines.
+
+    Las filas se escriben por lotes de tamaño fijo.
+    """
+
+    def __init__(self, inventario: Inventario, tamano_lote: int = 5000):
+        """Inicializa el exportador."""
+        if tamano_lote <= 0:
+            raise ValueError("El tamaño de lote debe ser positivo")
+        self.inventario = inventario
+        self.tamano_lote = tamano_lote
+
+    def exportar(self, ruta: str, formato: Optional[str] = None,
+                 productos: Optional[Iterable[Producto]] = None) -> int:
+        """
+        Exporta productos a un archivo
+
+        Args:
+            ruta: Archivo de destino
+            formato: "csv" o "jsonl"; por defecto se deduce de la extensión
+            productos: Productos a exportar; por defecto todo el inventario
+
+        Returns:
+            int: Cantidad de productos exportados
+        """
+        formato = _detectar_formato(ruta, formato)
+        if productos is None:
+            productos = self.inventario.repositorio.iterar()
+
+        total = 0
+        with open(ruta, "w", encoding="utf-8", newline="") as archivo:
+            if formato == "csv":
+                escritor = csv.writer(archivo)
+                escritor.writerow(CAMPOS_EXPORTACION)
+            for lote in _lotes(productos, self.tamano_lote):
+                filas = [self._fila(producto) for producto in lote]
+                if formato == "csv":
+                    escritor.writerows(filas)
+                else:
+                    archivo.writelines(
+                        json.dumps(dict(zip(CAMPOS_EXPORTACION, fila)), ensure_ascii=False) + "\n"
+                        for fila in filas)
+                total += len(filas)
+        return total
+
+    @staticmethod
+    def _fila(producto: Producto) -> Tuple:
+        """Convierte un producto en una fila de exportación."""
+        return (producto.id_producto, producto.nombre, producto.descripcion, producto.precio,
+                producto.cantidad, producto.libreria.name, producto.fecha_creacion)
@@ -3,10 +3,13 @@ Módulo de Servicios - Reportes
 Define la lógica de generación de reportes y análisis
 """
 
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
-from ..models.producto import Producto
+from ..models.producto import Producto, Libreria
 from ..repositories.inventario import Inventario
+from ..repositories.movimientos import RegistroMovimientos
 
 class GeneradorReportes:
     """
@@ -20,27 +23,75 @@ class GeneradorReportes:
     
     def valor_total_inventario(self) -> float:
         """Calcula el valor total del inventario."""
-        productos = self.inventario.repositorio.obtener_todos()
-        return sum(p.calcular_valor_total() for p in productos)
+        return self.inventario.repositorio.valor_total()
     
     def cantidad_total_productos(self) -> int:
         """Retorna la cantidad total de productos."""
-        return len(self.inventario.repositorio.obtener_todos())
+        return self.inventario.repositorio.contar()
     
     def total_items_stock(self) -> int:
         """Calcula el total de ítems en stock."""
-        productos = self.inventario.repositorio.obtener_todos()
-        return sum(p.cantidad for p in productos)
+        return self.inventario.repositorio.total_items()
     
     def producto_mas_caro(self) -> Optional[Producto]:
         """Obtiene el producto más caro."""
-        productos = self.inventario.repositorio.obtener_todos()
-        return max(productos, key=lambda p: p.precio) if productos else None
+        return self.inventario.repositorio.producto_mas_caro()
     
     def producto_mas_barato(self) -> Optional[Producto]:
         """Obtiene el producto más barato."""
-        productos = self.inventario.repositorio.obtener_todos()
-        return min(productos, key=lambda p: p.precio) if productos else None
+        return self.inventario.repositorio.producto_mas_barato()
+    
+    def resumen_por_libreria(self) -> Dict[Libreria, Dict[str, Any]]:
+        """Retorna cantidad de productos, ítems y valor por categoría."""
+        return self.inventario.repositorio.resumen_por_libreria()
+    
+    def ranking_por_precio(self, cantidad: int = 10, libreria: Optional[Libreria] = None) -> List[Producto]:
+        """Obtiene los productos más caros, opcionalmente de una categoría."""
+        return self.inventario.repositorio.ranking("precio", cantidad, libreria)
+    
+    def ranking_por_valor(self, cantidad: int = 10, libreria: Optional[Libreria] = None) -> List[Producto]:
+        """Obtiene los productos con mayor valor en stock, opcionalmente de una categoría."""
+        return self.inventario.repositorio.ranking("valor", cantidad, libreria)
+    
+    def ranking_por_cantidad(self, cantidad: int = 10, libreria: Optional[Libreria] = None) -> List[Producto]:
+        """Obtiene los productos con más unidades en stock, opcionalmente de una categoría."""
+        return self.inventario.repositorio.ranking("cantidad", cantidad, libreria)
+    
+    def _movimientos(self) -> RegistroMovimientos:
+        """Registro de movimientos del inventario, requerido por los reportes de ventas."""
+        if self.inventario.movimientos is None:
+            raise ValueError("El inventario no registra movimientos de stock")
+        return self.inventario.movimientos
+    
+    def ventas_por_hora(self, id_producto: int, horas: int = 24) -> List[int]:
+        """Unidades vendidas de un producto en cada una de las últimas horas."""
+        return self._movimientos().ventas_por_hora(id_producto, horas)
+    
+    def ventas_por_dia(self, id_producto: int, dias: int = 7) -> List[int]:
+        """Unidades vendidas de un producto en cada uno de los últimos días."""
+        return self._movimientos().ventas_por_dia(id_producto, dias)
+    
+    def productos_mas_vendidos(self, cantidad: int = 10) -> List[Tuple[Producto, int]]:
+        """Retorna los productos más vendidos en la ventana del registro, con sus unidades."""
+        ranking = self._movimientos().mas_vendidos(cantidad)
+        productos = self.inventario.repositorio.obtener_varios(i for i, _ in ranking)
+        return [(productos[i], unidades) for i, unidades in ranking if i in productos]
+    
+    def dias_de_stock(self, limite: Optional[int] = None) -> List[Tuple[Producto, float]]:
+        """
+        Estima cuántos días dura el stock de cada producto con ventas
+        recientes, al ritmo de venta promedio de la ventana del registro.
+        
+        Returns:
+            List[Tuple[Producto, float]]: De menor a mayor cantidad de días
+        """
+        movimientos = self._movimientos()
+        ventas = movimientos.ventas_en_ventana()
+        productos = self.inventario.repositorio.obtener_varios(ventas)
+        estimaciones = [(producto, producto.cantidad * movimientos.ventana_dias / ventas[i])
+                        for i, producto in productos.items()]
+        estimaciones.sort(key=lambda e: (e[1], e[0].id_producto))
+        return estimaciones if limite is None else estimaciones[:limite]
     
     def reporte_completo(self) -> Dict[str, Any]:
         """Genera reporte completo del inventario."""
@@ -52,4 +103,32 @@ class GeneradorReportes:
             "producto_mas_caro": self.producto_mas_caro(),
             "producto_mas_barato": self.producto_mas_barato(),
             "productos_bajo_stock": self.inventario.obtener_productos_bajo_stock()
-        }
\ No newline at end of file
+        }
+    
+    def reporte_consistente(self) -> Dict[str, Any]:
+        """Genera el reporte completo sobre una instantánea, sin mezclar estados del inventario."""
+        with self.inventario.repositorio.instantanea() as vista:
+            return GeneradorReportes(Inventario(vista, franjas=1)).reporte_completo()
+    
+    def reporte_en_segundo_plano(self) -> "Future[Dict[str, Any]]":
+        """
+        Toma una instantánea en el acto y genera el reporte completo en otro hilo
+        
+        Returns:
+            Future con el reporte; las ventas continúan mientras se calcula
+        """
+        fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        vista = self.inventario.repositorio.instantanea()
+        futuro: Future = Future()
+        
+        def generar():
+            try:
+                with vista:
+                    reporte = GeneradorReportes(Inventario(vista, franjas=1)).reporte_completo()
+                reporte["fecha_generacion"] = fecha
+                futuro.set_result(reporte)
+            except BaseException as e:
+                futuro.set_exception(e)
+        
+        threading.Thread(target=generar, name="reporte-instantanea", daemon=True).start()
+        return futuro
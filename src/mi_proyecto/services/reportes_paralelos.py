@@ -0,0 +1,150 @@
+"""
+Módulo de Servicios - Reportes paralelos
+Calcula el reporte completo repartiendo las particiones del
+repositorio entre varios procesos
+"""
+
+import heapq
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from ..models.producto import Producto
+from ..repositories.indices import SumaExacta
+from ..repositories.inventario import IRepositorio, Inventario, RepositorioMemoria
+from .reportes import GeneradorReportes
+
+# Productos de cada partición visibles para los procesos creados con fork,
+# que heredan la memoria del proceso principal en lugar de recibirlos
+# serializados. Son tuplas armadas antes del fork: los procesos hijos no
+# llaman al repositorio, cuyos locks podían estar tomados por otro hilo
+_PARTICIONES: List[Tuple[Producto, ...]] = []
+
+
+def _resumir(ids: Sequence[int], precios: Sequence[float], cantidades: Sequence[int],
+             limite: int) -> Dict[str, Any]:
+    """Calcula los agregados parciales de una partición a partir de sus columnas."""
+    suma = SumaExacta()
+    suma.sumar_varios([precio * cantidad for precio, cantidad in zip(precios, cantidades)])
+    parcial: Dict[str, Any] = {
+        "total_productos": len(ids),
+        "total_items": sum(cantidades),
+        "valor_total": suma,
+        "mas_caro": None,
+        "mas_barato": None,
+        "bajo_stock": sorted((c, i) for c, i in zip(cantidades, ids) if c <= limite),
+    }
+    if ids:
+        # (precio, id) con el menor ID en caso de empate
+        parcial["mas_caro"] = max(zip(precios, ids), key=lambda t: (t[0], -t[1]))
+        parcial["mas_barato"] = min(zip(precios, ids))
+    return parcial
+
+
+def _columnas(productos: Iterable[Producto]) -> Tuple[List[int], List[float], List[int]]:
+    """Extrae las columnas de ID, precio y cantidad de los productos."""
+    ids, precios, cantidades = [], [], []
+    for producto in productos:
+        ids.append(producto.id_producto)
+        precios.append(producto.precio)
+        cantidades.append(producto.cantidad)
+    return ids, precios, cantidades
+
+
+def _columnas_compactas(repositorio: IRepositorio) -> Tuple[array, array, array]:
+    """Como _columnas, en arreglos compactos para enviarlos a otro proceso."""
+    ids, precios, cantidades = _columnas(repositorio.iterar())
+    return array("q", ids), array("d", precios), array("q", cantidades)
+
+
+def _resumir_heredada(numero: int, limite: int) -> Dict[str, Any]:
+    """Resume los productos de una partición heredados por fork."""
+    return _resumir(*_columnas(_PARTICIONES[numero]), limite)
+
+
+def _resumir_columnas(columnas: Tuple[array, array, array], limite: int) -> Dict[str, Any]:
+    """Resume una partición recibida como columnas serializadas."""
+    return _resumir(*columnas, limite)
+
+
+class GeneradorReportesParalelo(GeneradorReportes):
+    """
+    Generador de reportes que calcula el reporte completo en paralelo.
+
+    Cada partición del repositorio (ver RepositorioParticionado) se
+    resume en un proceso y los resultados parciales se combinan: los
+    totales se suman, los extremos de precio se comparan y las listas
+    de bajo stock se intercalan. La suma del valor se combina sin
+    redondeos intermedios, así que el resultado es idéntico al de
+    GeneradorReportes.reporte_completo.
+
+    Si las particiones están en memoria (RepositorioMemoria) y existe
+    fork, los procesos leen los productos heredados sin serializarlos;
+    en otro caso (p. ej. particiones SQLite, cuya conexión no puede
+    heredarse con fork) se crean con spawn y reciben sus columnas
+    serializadas; como con todo spawn, el script principal debe
+    protegerse con `if __name__ == "__main__":`.
+    """
+
+    def __init__(self, inventario: Inventario, procesos: Optional[int] = None):
+        """
+        Inicializa el generador
+
+        Args:
+            inventario: Inventario cuyo repositorio se reporta
+            procesos: Cantidad máxima de procesos; por defecto, uno por núcleo
+        """
+        super().__init__(inventario)
+        self.procesos = procesos or os.cpu_count() or 1
+
+    def _parciales(self, limite: int) -> List[Dict[str, Any]]:
+        """Calcula los resultados parciales de cada partición."""
+        global _PARTICIONES
+        repositorio = self.inventario.repositorio
+        particiones = list(getattr(repositorio, "particiones", [repositorio]))
+        procesos = min(self.procesos, len(particiones))
+        if procesos <= 1:
+            return [_resumir(*_columnas(p.iterar()), limite) for p in particiones]
+
+        if ("fork" in multiprocessing.get_all_start_methods()
+                and all(isinstance(p, RepositorioMemoria) for p in particiones)):
+            _PARTICIONES = [tuple(p.iterar()) for p in particiones]
+            try:
+                with ProcessPoolExecutor(procesos, mp_context=multiprocessing.get_context("fork")) as pool:
+                    return list(pool.map(_resumir_heredada, range(len(particiones)),
+                                         [limite] * len(particiones)))
+            finally:
+                _PARTICIONES = []
+
+        # spawn: los procesos no heredan conexiones ni locks del proceso principal
+        with ProcessPoolExecutor(procesos, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return list(pool.map(_resumir_columnas, [_columnas_compactas(p) for p in particiones],
+                                 [limite] * len(particiones)))
+
+    def reporte_completo(self, limite_bajo_stock: int = 10) -> Dict[str, Any]:
+        """Genera el reporte completo combinando los resultados de cada partición."""
+        fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        parciales = self._parciales(limite_bajo_stock)
+
+        valor = SumaExacta()
+        for parcial in parciales:
+            valor.combinar(parcial["valor_total"])
+        caros = [p["mas_caro"] for p in parciales if p["mas_caro"] is not None]
+        baratos = [p["mas_barato"] for p in parciales if p["mas_barato"] is not None]
+        mas_caro = max(caros, key=lambda t: (t[0], -t[1])) if caros else None
+        mas_barato = min(baratos) if baratos else None
+        bajo_stock = [i for _, i in heapq.merge(*(p["bajo_stock"] for p in parciales))]
+
+        repositorio = self.inventario.repositorio
+        encontrados = repositorio.obtener_varios(bajo_stock)
+        return {
+            "fecha_generacion": fecha,
+            "total_productos": sum(p["total_productos"] for p in parciales),
+            "total_items": sum(p["total_items"] for p in parciales),
+            "valor_total": valor.valor(),
+            "producto_mas_caro": repositorio.obtener(mas_caro[1]) if mas_caro else None,
+            "producto_mas_barato": repositorio.obtener(mas_barato[1]) if mas_barato else None,
+            "productos_bajo_stock": [encontrados[i] for i in bajo_stock if i in encontrados],
+        }
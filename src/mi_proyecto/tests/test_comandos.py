@@ -0,0 +1,101 @@
+"""Pruebas del modo por lotes (--comandos)"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from ..models.producto import Producto
+
+import main
+
+# Primer ID asignado en cada ejecución, para comparar salidas
+BASE_IDS = 50_000
+
+COMANDOS = [
+    {"op": "agregar", "nombre": "Regla", "descripcion": "30 cm", "precio": 3.5, "cantidad": 4, "libreria": "escritura"},
+    {"op": "vender", "id": BASE_IDS + 1, "cantidad": 5},
+    {"op": "vender", "id": BASE_IDS + 2, "cantidad": 2},
+    {"op": "vender", "id": BASE_IDS + 1, "cantidad": 1000},
+    {"op": "reponer", "id": BASE_IDS + 3, "cantidad": 7},
+    {"op": "vender", "id": BASE_IDS + 8, "cantidad": True},
+    {"op": "vender", "id": BASE_IDS + 8, "cantidad": 1},
+    {"op": "agregar", "nombre": "Goma", "descripcion": "", "precio": 1.0, "cantidad": 2, "libreria": "Escritura"},
+    {"op": "agregar", "nombre": 7, "descripcion": "", "precio": 1.0, "cantidad": 2, "libreria": "Escritura"},
+    {"op": "agregar", "nombre": "Cinta", "descripcion": "", "precio": 2.0, "cantidad": 9, "libreria": "Manualidades"},
+    {"op": "bajo_stock", "limite": 5},
+    {"op": "buscar", "texto": "regl"},
+    {"op": "reporte"},
+]
+
+
+class TestModoComandos(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio)
+        self.contador = Producto._contador
+        self.addCleanup(setattr, Producto, "_contador", self.contador)
+
+    def _ejecutar(self, lineas, lote):
+        """Ejecuta main.py --comandos con los datos de prueba y retorna los resultados."""
+        Producto._contador = BASE_IDS
+        ruta = os.path.join(self.directorio, "comandos.jsonl")
+        salida = os.path.join(self.directorio, f"salida_{lote}.jsonl")
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write("\n".join(lineas) + "\n")
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(main.main(["--comandos", ruta, "--salida", salida,
+                                        "--lote", str(lote), "--demo"]), 0)
+        with open(salida, encoding="utf-8") as archivo:
+            resultados = [json.loads(linea) for linea in archivo]
+        for resultado in resultados:
+            resultado.get("reporte", {}).pop("fecha_generacion", None)
+        return resultados
+
+    def test_lotes_dan_los_mismos_resultados(self):
+        lineas = [json.dumps(c) for c in COMANDOS]
+        lineas.insert(6, "{no es json")
+        esperado = self._ejecutar(lineas, 1)
+        for lote in (3, 100):
+            self.assertEqual(self._ejecutar(lineas, lote), esperado)
+        errores = {r["linea"]: r["error"] for r in esperado if "error" in r}
+        self.assertEqual(sorted(errores), [4, 6, 7, 10])
+        self.assertIn("debe ser un número entero", errores[6])
+        self.assertEqual(errores[10], "El nombre debe ser texto")
+        # La venta de la línea 8 se aplicó pese a los errores previos del lote
+        busqueda = next(r for r in esperado if r["linea"] == 13)
+        self.assertEqual([(p["id"], p["cantidad"]) for p in busqueda["productos"]], [(BASE_IDS + 8, 3)])
+
+    def test_precio_no_finito_no_cuelga_el_reporte(self):
+        lineas = ['{"op": "agregar", "nombre": "X", "precio": NaN, "cantidad": 1, "libreria": "Libros"}',
+                  '{"op": "agregar", "nombre": "Y", "precio": Infinity, "cantidad": 1, "libreria": "Libros"}',
+                  '{"op": "reporte"}']
+        for lote in (1, 2):
+            resultados = self._ejecutar(lineas, lote)
+            self.assertEqual([r["linea"] for r in resultados if "error" in r], [1, 2])
+            self.assertEqual(resultados[-1]["reporte"]["total_productos"], 7)
+
+
+    def test_reportes_de_ventas(self):
+        lineas = [json.dumps(c) for c in (
+            {"op": "vender", "id": BASE_IDS + 2, "cantidad": 5},
+            {"op": "vender", "id": BASE_IDS + 1, "cantidad": 2},
+            {"op": "vender", "id": BASE_IDS + 2, "cantidad": 1},
+            {"op": "mas_vendidos", "limite": 1},
+            {"op": "dias_de_stock", "limite": 5},
+        )]
+        for lote in (1, 3):
+            mas_vendidos, dias = self._ejecutar(lineas, lote)
+            self.assertEqual([(p["id"], p["vendidos"]) for p in mas_vendidos["productos"]], [(BASE_IDS + 2, 6)])
+            self.assertEqual([p["id"] for p in dias["productos"]], [BASE_IDS + 2, BASE_IDS + 1])
+        with mock.patch.dict(os.environ, {"INVENTARIO_MOVIMIENTOS": "0"}):
+            resultados = self._ejecutar(lineas, 1)
+        self.assertEqual(resultados[0]["error"], "El inventario no registra movimientos de stock")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Pruebas de la tabla de productos y su caché de filas"""
+
+import unittest
+from ..models.producto import Producto, Libreria
+from ..utils.formatters import CacheFilas, Formateadores
+
+
+def _producto(id_producto: int, cantidad: int = 5) -> Producto:
+    return Producto.restaurar(id_producto, f"Producto {id_producto}", "Desc", 2.5, cantidad,
+                              Libreria.ESCRITURA, 0.0)
+
+
+class TestCacheFilas(unittest.TestCase):
+
+    def test_la_tabla_es_igual_con_y_sin_cache(self):
+        productos = [_producto(i) for i in range(1, 30)]
+        cache = CacheFilas()
+        esperado = Formateadores.formatear_lista_productos(productos, pagina=2, tamano_pagina=10)
+        for _ in range(2):
+            self.assertEqual(Formateadores.formatear_lista_productos(
+                productos, pagina=2, tamano_pagina=10, cache=cache), esperado)
+        # Solo se guardan las filas mostradas
+        self.assertEqual(len(cache), 10)
+
+    def test_paginas_de_un_mismo_iterador_con_resumen(self):
+        productos = [_producto(i) for i in range(1, 30)]
+        resumen = (29, 29 * 5, 29 * 12.5)
+        iterador = iter(productos)
+        for pagina in (1, 2, 3):
+            self.assertEqual(Formateadores.formatear_lista_productos(
+                iterador, pagina=pagina, tamano_pagina=10, resumen=resumen),
+                Formateadores.formatear_lista_productos(productos, pagina=pagina, tamano_pagina=10))
+        # Cada página consume solo sus filas
+        self.assertIsNone(next(iterador, None))
+
+    def test_descarta_la_fila_usada_hace_mas_tiempo(self):
+        cache = CacheFilas(capacidad=2)
+        a, b, c = _producto(1), _producto(2), _producto(3)
+        fila_a = cache.fila(a)
+        cache.fila(b)
+        # Acertar mueve la fila de a al final: al llenarse se descarta b
+        self.assertIs(cache.fila(a), fila_a)
+        cache.fila(c)
+        self.assertEqual(set(cache._filas), {1, 3})
+
+    def test_un_producto_modificado_se_vuelve_a_formatear(self):
+        cache = CacheFilas()
+        producto = _producto(1, cantidad=5)
+        cache.fila(producto)
+        producto.actualizar_cantidad(7)
+        self.assertEqual(cache.fila(producto), Formateadores.formatear_producto_tabla(producto) + "\n")
+
+    def test_otro_objeto_con_el_mismo_id_no_acierta(self):
+        cache = CacheFilas()
+        cache.fila(_producto(1, cantidad=5))
+        copia = _producto(1, cantidad=9)
+        self.assertIn("|     9 |", cache.fila(copia))
+
+    def test_capacidad_invalida(self):
+        with self.assertRaises(ValueError):
+            CacheFilas(capacidad=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Pruebas de la importación de productos"""
+
+import json
+import os
+import tempfile
+import unittest
+from ..repositories.inventario import Inventario, RepositorioMemoria
+from ..services.importacion import ImportadorProductos
+from ..utils.validadores import Validadores
+
+
+class TestImportadorProductos(unittest.TestCase):
+
+    def setUp(self):
+        self._temporal = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self._temporal.name, "productos.jsonl")
+        self.inventario = Inventario(RepositorioMemoria())
+
+    def tearDown(self):
+        self._temporal.cleanup()
+
+    def test_rechaza_booleanos_como_numeros(self):
+        filas = [
+            {"nombre": "Lapiz", "precio": 1.5, "cantidad": True, "libreria": "ESCRITURA"},
+            {"nombre": "Goma", "precio": False, "cantidad": 3, "libreria": "ESCRITURA"},
+            {"nombre": "Regla", "precio": 2.0, "cantidad": 4, "libreria": "ESCRITURA"},
+        ]
+        with open(self.ruta, "w", encoding="utf-8") as archivo:
+            archivo.writelines(json.dumps(fila) + "\n" for fila in filas)
+        resultado = ImportadorProductos(self.inventario).importar(self.ruta)
+        self.assertEqual((resultado["importados"], resultado["rechazados"]), (1, 2))
+        self.assertEqual([p.nombre for p in self.inventario.repositorio.iterar()], ["Regla"])
+
+    def test_validadores_rechazan_booleanos(self):
+        self.assertEqual(Validadores.validar_cantidades_no_negativas([True, 0]),
+                         ["La cantidad debe ser un número entero", None])
+        self.assertEqual(Validadores.validar_precios_positivos([False, 0]),
+                         ["El precio debe ser un número", None])
+        with self.assertRaises(ValueError):
+            Validadores.validar_cantidad_no_negativa(True)
+
+    def test_validadores_rechazan_precios_no_finitos(self):
+        self.assertEqual(Validadores.validar_precios_positivos([float("nan"), float("inf"), 10 ** 400, 1.0]),
+                         ["El precio debe ser un número finito"] * 3 + [None])
+        with self.assertRaises(ValueError):
+            Validadores.validar_precio_positivo(float("nan"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+"""Pruebas de los índices y agregados incrementales"""
+
+import math
+import random
+import unittest
+from ..models.producto import Libreria, Producto
+from ..repositories.indices import (CRITERIOS_RANKING, SumaExacta, normalizar_texto,
+                                    palabra_coincidente, preparar_consulta)
+from ..repositories.inventario import Inventario, RepositorioMemoria
+
+
+class TestSumaExacta(unittest.TestCase):
+
+    def test_equivale_a_fsum_de_los_valores_vivos(self):
+        aleatorio = random.Random(7)
+        suma = SumaExacta()
+        vivos = []
+        for _ in range(20_000):
+            if vivos and aleatorio.random() < 0.4:
+                indice = aleatorio.randrange(len(vivos))
+                nuevo = aleatorio.uniform(0, 500) * aleatorio.randint(0, 1000)
+                suma.reemplazar(vivos[indice], nuevo)
+                vivos[indice] = nuevo
+            else:
+                valor = aleatorio.choice([0.1, 1e16, 5e-324, aleatorio.uniform(0, 1e6)])
+                suma.sumar(valor)
+                vivos.append(valor)
+        self.assertEqual(suma.valor(), math.fsum(vivos))
+
+    def test_restar_lo_sumado_vuelve_a_cero(self):
+        suma = SumaExacta()
+        suma.sumar_varios([0.1, 0.2, 1e20])
+        for valor in (1e20, 0.2, 0.1):
+            suma.restar(valor)
+        self.assertEqual(suma.valor(), 0.0)
+
+    def test_combinar_y_copiar(self):
+        suma = SumaExacta()
+        suma.sumar_varios([0.1] * 10)
+        copia = suma.copiar()
+        copia.combinar(suma)
+        self.assertEqual(copia.valor(), math.fsum([0.1] * 20))
+        self.assertEqual(suma.valor(), math.fsum([0.1] * 10))
+
+    def test_infinitos_se_cuentan_aparte(self):
+        suma = SumaExacta()
+        suma.sumar_varios([1.5, 1e308 * 10])
+        self.assertEqual(suma.valor(), math.inf)
+        suma.restar(math.inf)
+        self.assertEqual(suma.valor(), 1.5)
+
+    def test_desborde_intermedio_y_nan_no_se_cuelgan(self):
+        suma = SumaExacta()
+        suma.sumar_varios([1e308, 1e308])
+        self.assertEqual(suma.valor(), math.inf)
+        suma.restar(1e308)
+        self.assertEqual(suma.valor(), 1e308)
+        suma.sumar(math.nan)
+        self.assertTrue(math.isnan(suma.valor()))
+
+
+class TestBusqueda(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = RepositorioMemoria()
+        self.inventario = Inventario(self.repo)
+        self.lapiz, self.muneca, self.lapicera, self.cuaderno = self.inventario.agregar_productos([
+            ("LÁPIZ negro", "Grafito HB", 1.0, 10, Libreria.ESCRITURA),
+            ("Muñeca de trapo", "Tela y lana", 15.0, 3, Libreria.JUGUETES),
+            ("Lapicera azul", "Tinta gel", 2.0, 8, Libreria.ESCRITURA),
+            ("Cuaderno", "Tapa dura, para lápiz o lapicera", 4.0, 5, Libreria.LIBROS),
+        ])
+
+    def _esperado(self, texto: str, libreria=None, limite: int = 20):
+        """Resultado de la búsqueda recorriendo todos los productos."""
+        exactas, prefijo = preparar_consulta(texto)
+        coincidencias = []
+        for producto in self.repo.iterar():
+            palabra = palabra_coincidente(producto, exactas, prefijo)
+            if palabra is not None and libreria in (None, producto.libreria):
+                coincidencias.append((palabra, producto.id_producto))
+        return [self.repo.obtener(i) for _, i in sorted(coincidencias)[:limite]]
+
+    def test_normaliza_mayusculas_y_acentos(self):
+        self.assertEqual(normalizar_texto("LÁPIZ"), "lapiz")
+        self.assertEqual(normalizar_texto("muñeca"), "muneca")
+        self.assertEqual(self.repo.buscar("lapiz negro"), [self.lapiz])
+        self.assertEqual(self.repo.buscar("Lápiz NEGRO"), [self.lapiz])
+        self.assertEqual(self.repo.buscar("MUÑECA"), [self.muneca])
+        self.assertEqual(self.repo.buscar("muneca"), [self.muneca])
+        self.assertEqual(self.repo.buscar("¿?"), [])
+
+    def test_la_ultima_palabra_es_un_prefijo(self):
+        # Ordenados por la palabra que coincide ("lapicera" < "lapiz") y luego por ID
+        self.assertEqual(self.repo.buscar("lapi"), [self.lapicera, self.cuaderno, self.lapiz])
+        self.assertEqual(self.repo.buscar("tapa lapi"), [self.cuaderno])
+        self.assertEqual(self.repo.buscar("tinta"), [self.lapicera])
+        # Solo la última palabra puede estar incompleta, y debe ser el comienzo
+        self.assertEqual(self.repo.buscar("tap dura"), [])
+        self.assertEqual(self.repo.buscar("apiz"), [])
+
+    def test_filtra_por_libreria_y_respeta_el_limite(self):
+        self.assertEqual(self.repo.buscar("lapi", libreria=Libreria.ESCRITURA), [self.lapicera, self.lapiz])
+        self.assertEqual(self.repo.buscar("lapi", libreria=Libreria.JUGUETES), [])
+        self.assertEqual(self.repo.buscar("lapi", limite=2), [self.lapicera, self.cuaderno])
+        self.assertEqual(self.repo.buscar("lapi", libreria=Libreria.ESCRITURA, limite=1), [self.lapicera])
+
+    def test_altas_y_bajas_posteriores_a_la_primera_busqueda(self):
+        self.assertEqual(self.repo.buscar("lapiz"), [self.lapiz, self.cuaderno])
+        nuevo = self.inventario.agregar_producto("Lápiz de color", "", 0.5, 1, Libreria.ESCRITURA)
+        self.repo.eliminar(self.cuaderno.id_producto)
+        self.assertEqual(self.repo.buscar("lapiz"), [self.lapiz, nuevo])
+
+    def test_coincide_con_el_recorrido_completo(self):
+        # Suficientes productos y palabras para recorrer todos los caminos de la búsqueda
+        aleatorio = random.Random(3)
+        silabas = ["la", "pi", "ma", "ce", "ño", "rá", "to", "ca"]
+        filas = []
+        for i in range(3000):
+            palabras = ["".join(aleatorio.choices(silabas, k=aleatorio.randint(1, 3)))
+                        for _ in range(aleatorio.randint(1, 3))]
+            comun = "común" if i % 6 else "raro"
+            filas.append((" ".join(palabras), comun, 1.0, 1, aleatorio.choice(list(Libreria))))
+        self.inventario.agregar_productos(filas)
+        for texto in ("la", "lapi", "ma ce", "comun la", "comun", "raro ño", "RÁ", "pi común", "nada"):
+            for libreria in (None, Libreria.LIBROS):
+                for limite in (1, 20, 5000):
+                    self.assertEqual(self.repo.buscar(texto, libreria=libreria, limite=limite),
+                                     self._esperado(texto, libreria, limite), (texto, libreria, limite))
+
+
+class TestRanking(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = RepositorioMemoria()
+        self.inventario = Inventario(self.repo)
+        self.aleatorio = random.Random(11)
+        # Pocos precios y cantidades distintos para que haya muchos empates
+        self.inventario.agregar_productos(
+            [(f"Producto {i}", "", self.aleatorio.choice([1.0, 2.5, 4.0]), self.aleatorio.randint(0, 4),
+              self.aleatorio.choice([Libreria.ESCRITURA, Libreria.LIBROS])) for i in range(200)])
+
+    def _comparar(self):
+        """Compara cada ranking con el orden de todos los productos."""
+        productos = list(self.repo.iterar())
+        for criterio, valor in CRITERIOS_RANKING.items():
+            for libreria in (None, Libreria.ESCRITURA, Libreria.LIBROS):
+                candidatos = [p for p in productos if libreria in (None, p.libreria)]
+                esperado = sorted(candidatos, key=lambda p: (-valor(p), p.id_producto))
+                for cantidad in (1, 10, len(productos) + 1):
+                    self.assertEqual(self.repo.ranking(criterio, cantidad, libreria), esperado[:cantidad],
+                                     (criterio, libreria, cantidad))
+
+    def test_coincide_con_el_orden_completo_tras_cada_cambio(self):
+        self._comparar()
+        for _ in range(5):
+            productos = list(self.repo.iterar())
+            for producto in self.aleatorio.sample(productos, 40):
+                producto.actualizar_precio(self.aleatorio.choice([1.0, 2.5, 4.0, 7.0]))
+            for producto in self.aleatorio.sample(productos, 40):
+                self.inventario.aumentar_stock(producto.id_producto, self.aleatorio.randint(0, 3))
+            for producto in self.aleatorio.sample(productos, 40):
+                if producto.cantidad:
+                    self.inventario.disminuir_stock(producto.id_producto, self.aleatorio.randint(1, producto.cantidad))
+            self._comparar()
+            for producto in self.aleatorio.sample(productos, 15):
+                self.repo.eliminar(producto.id_producto)
+            self._comparar()
+
+    def test_empates_por_menor_id(self):
+        for producto in self.repo.iterar():
+            producto.actualizar_precio(3.0)
+            producto.actualizar_cantidad(2)
+        ids = sorted(p.id_producto for p in self.repo.iterar())
+        for criterio in CRITERIOS_RANKING:
+            self.assertEqual([p.id_producto for p in self.repo.ranking(criterio, 5)], ids[:5])
+
+    def test_productos_eliminados_no_aparecen(self):
+        primero = self.repo.ranking("precio", 1)[0]
+        self.repo.eliminar(primero.id_producto)
+        self.assertNotIn(primero, self.repo.ranking("precio", 200))
+        self.assertNotIn(primero, self.repo.ranking("precio", 200, primero.libreria))
+
+    def test_criterio_invalido(self):
+        with self.assertRaisesRegex(ValueError, "Criterio de ranking inválido"):
+            self.repo.ranking("nombre")
+
+
+if __name__ == "__main__":
+    unittest.main()
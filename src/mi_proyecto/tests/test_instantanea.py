@@ -0,0 +1,77 @@
+"""Pruebas de las instantáneas con copia en escritura"""
+
+import threading
+import unittest
+from ..models.producto import Libreria
+from ..repositories.inventario import Inventario, RepositorioMemoria
+
+
+class TestInstantanea(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = RepositorioMemoria()
+        self.inventario = Inventario(self.repo)
+        self.productos = self.inventario.agregar_productos(
+            [(f"Producto {i}", "", 1.5 * (i + 1), 10, Libreria.ESCRITURA) for i in range(5)])
+
+    def test_conserva_el_estado_al_crearla(self):
+        primero, segundo, ultimo = self.productos[0], self.productos[1], self.productos[-1]
+        with self.repo.instantanea() as vista:
+            self.inventario.disminuir_stock(primero.id_producto, 4)
+            self.inventario.disminuir_stock(primero.id_producto, 3)
+            segundo.actualizar_precio(99.0)
+            self.inventario.agregar_producto("Nuevo", "", 1.0, 1, Libreria.ESCRITURA)
+            self.repo.eliminar(ultimo.id_producto)
+
+            self.assertEqual(vista.obtener(primero.id_producto).cantidad, 10)
+            self.assertEqual(vista.obtener(segundo.id_producto).precio, 3.0)
+            self.assertEqual(sorted(p.id_producto for p in vista.iterar()),
+                             [p.id_producto for p in self.productos])
+            self.assertEqual(vista.contar(), 5)
+            self.assertEqual(vista.total_items(), 50)
+            self.assertEqual(vista.obtener_cantidades([primero.id_producto]), {primero.id_producto: 10})
+        self.assertEqual(self.repo.obtener(primero.id_producto).cantidad, 3)
+
+    def test_las_copias_no_modifican_el_inventario(self):
+        producto = self.productos[0]
+        with self.repo.instantanea() as vista:
+            vista.obtener(producto.id_producto).actualizar_cantidad(0)
+        self.assertEqual(self.repo.obtener(producto.id_producto).cantidad, 10)
+        self.assertEqual(self.repo.total_items(), 50)
+
+    def test_cerrada_deja_de_recibir_avisos(self):
+        vista = self.repo.instantanea()
+        vista.cerrar()
+        self.inventario.disminuir_stock(self.productos[0].id_producto, 1)
+        self.assertEqual(self.repo._vistas_abiertas(), [])
+        self.assertEqual(vista._previos, {})
+
+    def test_es_de_solo_lectura(self):
+        with self.repo.instantanea() as vista:
+            with self.assertRaises(ValueError):
+                vista.eliminar(self.productos[0].id_producto)
+
+
+    def test_escritores_concurrentes_no_pierden_versiones(self):
+        producto = self.productos[0]
+        hilos = [threading.Thread(target=lambda: [producto.actualizar_precio(2.0 + i % 3) for i in range(2000)])
+                 for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(producto._version, 4 * 2000 * 2)
+        self.assertEqual(self.repo.valor_total(), sum(p.calcular_valor_total() for p in self.productos))
+
+    def test_version_impar_no_cuelga_la_lectura(self):
+        producto = self.productos[0]
+        with self.repo.instantanea() as vista:
+            producto._version += 1
+            try:
+                self.assertEqual(vista.obtener(producto.id_producto).cantidad, 10)
+            finally:
+                producto._version += 1
+
+
+if __name__ == "__main__":
+    unittest.main()
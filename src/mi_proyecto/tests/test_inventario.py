@@ -0,0 +1,109 @@
+"""Pruebas de las operaciones por lotes del inventario"""
+
+import math
+import random
+import sys
+import threading
+import unittest
+from ..models.producto import Libreria
+from ..repositories.inventario import Inventario, RepositorioMemoria
+
+
+class TestOperacionesPorLotes(unittest.TestCase):
+
+    def setUp(self):
+        self.inventario = Inventario(RepositorioMemoria())
+        self.producto = self.inventario.agregar_producto("Lapiz", "HB", 1.0, 10, Libreria.ESCRITURA)
+
+    def test_agregar_productos_rechaza_booleanos(self):
+        for fila in (("Goma", "", 1.0, True, Libreria.ESCRITURA),
+                     ("Goma", "", True, 1, Libreria.ESCRITURA)):
+            with self.assertRaisesRegex(ValueError, "^Fila 2: "):
+                self.inventario.agregar_productos([("Regla", "", 2.0, 1, Libreria.ESCRITURA), fila])
+        self.assertEqual(self.inventario.repositorio.contar(), 1)
+
+    def test_rechaza_precios_no_finitos(self):
+        for precio in (float("nan"), float("inf"), 1e308 * 10):
+            with self.assertRaisesRegex(ValueError, "finito"):
+                self.inventario.agregar_producto("Goma", "", precio, 1, Libreria.ESCRITURA)
+            with self.assertRaisesRegex(ValueError, "finito"):
+                self.producto.actualizar_precio(precio)
+        self.assertEqual(self.inventario.repositorio.valor_total(), 10.0)
+
+    def test_aplicar_movimientos_rechaza_booleanos(self):
+        with self.assertRaisesRegex(ValueError, "^Movimiento 2: "):
+            self.inventario.aplicar_movimientos([(self.producto.id_producto, -1),
+                                                 (self.producto.id_producto, True)])
+        self.assertEqual(self.producto.cantidad, 10)
+
+    def test_aplicar_movimientos_es_todo_o_nada(self):
+        with self.assertRaisesRegex(ValueError, "Stock insuficiente"):
+            self.inventario.aplicar_movimientos([(self.producto.id_producto, -4),
+                                                 (self.producto.id_producto, -7)])
+        self.assertEqual(self.inventario.aplicar_movimientos([(self.producto.id_producto, -4)]), 1)
+        self.assertEqual(self.producto.cantidad, 6)
+
+
+class TestVentasConcurrentes(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = RepositorioMemoria()
+        self.inventario = Inventario(self.repo)
+        self.productos = self.inventario.agregar_productos(
+            [(f"Producto {i}", "", 1.0 + i, 50, list(Libreria)[i % len(Libreria)]) for i in range(8)])
+        intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, intervalo)
+
+    def test_ventas_concurrentes_no_sobrevenden_ni_pierden_cambios(self):
+        ids = [p.id_producto for p in self.productos]
+        vendidos = [{i: 0 for i in ids} for _ in range(8)]
+        repuestos = [{i: 0 for i in ids} for _ in range(8)]
+
+        def vender(numero: int):
+            azar = random.Random(numero)
+            for _ in range(2000):
+                id_producto = azar.choice(ids)
+                cantidad = azar.randint(1, 4)
+                if azar.random() < 0.1:
+                    self.inventario.aumentar_stock(id_producto, cantidad)
+                    repuestos[numero][id_producto] += cantidad
+                    continue
+                try:
+                    self.inventario.disminuir_stock(id_producto, cantidad)
+                    vendidos[numero][id_producto] += cantidad
+                except ValueError:
+                    pass
+
+        def consultar():
+            # Las consultas vuelcan los cambios pendientes mientras se vende
+            for _ in range(200):
+                self.assertGreaterEqual(self.repo.total_items(), 0)
+                self.repo.ranking("cantidad", 3)
+                self.repo.obtener_por_rango_stock(0, 5)
+
+        hilos = [threading.Thread(target=vender, args=(n,)) for n in range(8)]
+        hilos.append(threading.Thread(target=consultar))
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        for producto in self.productos:
+            i = producto.id_producto
+            esperado = 50 - sum(v[i] for v in vendidos) + sum(r[i] for r in repuestos)
+            self.assertEqual(producto.cantidad, esperado)
+            self.assertGreaterEqual(producto.cantidad, 0)
+        self.assertEqual(self.repo.total_items(), sum(p.cantidad for p in self.productos))
+        self.assertEqual(self.repo.valor_total(), math.fsum(p.calcular_valor_total() for p in self.productos))
+        self.assertEqual([(p.cantidad, p.id_producto) for p in self.repo.obtener_por_rango_stock()],
+                         sorted((p.cantidad, p.id_producto) for p in self.productos))
+        for libreria, resumen in self.repo.resumen_por_libreria().items():
+            self.assertEqual(resumen["total_items"],
+                             sum(p.cantidad for p in self.productos if p.libreria == libreria))
+        self.assertEqual(self.repo.ranking("cantidad", 8),
+                         sorted(self.productos, key=lambda p: (-p.cantidad, p.id_producto)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""Pruebas del registro de movimientos de stock"""
+
+import unittest
+from ..models.producto import Libreria
+from ..repositories.inventario import Inventario, RepositorioMemoria
+from ..repositories.movimientos import SEGUNDOS_DIA, RegistroMovimientos
+from ..services.reportes import GeneradorReportes
+
+
+class TestRegistroMovimientos(unittest.TestCase):
+
+    def test_consolida_lo_anotado_al_consultar(self):
+        registro = RegistroMovimientos(capacidad=3)
+        dia = 20_000 * SEGUNDOS_DIA
+        for numero in range(5000):
+            registro.registrar(1 + numero % 2, -1, dia + numero)
+        registro.registrar(1, 10, dia + 6000)
+        self.assertEqual(registro.mas_vendidos(2, dia), [(1, 2500), (2, 2500)])
+        self.assertEqual(registro.ventas_por_hora(1, 2, dia + 6000), [1800, 700])
+        self.assertEqual(registro.ultimos(2), [(dia + 4999.0, 2, -1), (dia + 6000.0, 1, 10)])
+        self.assertEqual(registro.total_registrados, 5001)
+
+    def test_inventario_sin_registro_por_defecto(self):
+        inventario = Inventario(RepositorioMemoria())
+        producto = inventario.agregar_producto("Lapiz", "", 1.0, 10, Libreria.ESCRITURA)
+        inventario.disminuir_stock(producto.id_producto, 3)
+        self.assertIsNone(inventario.movimientos)
+        with self.assertRaises(ValueError):
+            GeneradorReportes(inventario).productos_mas_vendidos()
+
+    def test_inventario_con_registro(self):
+        inventario = Inventario(RepositorioMemoria(), movimientos=RegistroMovimientos())
+        producto = inventario.agregar_producto("Lapiz", "", 1.0, 10, Libreria.ESCRITURA)
+        inventario.disminuir_stock(producto.id_producto, 3)
+        inventario.aplicar_movimientos([(producto.id_producto, -2)])
+        vendidos = GeneradorReportes(inventario).productos_mas_vendidos()
+        self.assertEqual(vendidos, [(producto, 5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""Pruebas del repositorio persistente"""
+
+import os
+import tempfile
+import unittest
+from ..models.producto import Libreria
+from ..repositories.inventario import Inventario
+from ..repositories.persistencia import RepositorioPersistente
+
+
+class TestRepositorioPersistente(unittest.TestCase):
+
+    def setUp(self):
+        self._temporal = tempfile.TemporaryDirectory()
+        self.directorio = self._temporal.name
+        self.diario = os.path.join(self.directorio, RepositorioPersistente.ARCHIVO_DIARIO)
+
+    def tearDown(self):
+        self._temporal.cleanup()
+
+    def _estado(self, repo):
+        return sorted((p.id_producto, p.nombre, p.cantidad, p.precio) for p in repo.iterar())
+
+    def _poblar(self, **opciones):
+        repo = RepositorioPersistente(self.directorio, **opciones)
+        inventario = Inventario(repo)
+        productos = [inventario.agregar_producto(f"Producto {i}", "", 1.5 + i, 100, Libreria.LIBROS)
+                     for i in range(5)]
+        for producto in productos:
+            inventario.disminuir_stock(producto.id_producto, 30)
+            producto.actualizar_precio(producto.precio * 2)
+        repo.eliminar(productos[0].id_producto)
+        estado = self._estado(repo)
+        repo.cerrar()
+        return estado
+
+    def test_reabrir_reproduce_el_diario(self):
+        estado = self._poblar()
+        repo = RepositorioPersistente(self.directorio)
+        self.assertEqual(self._estado(repo), estado)
+        self.assertEqual(repo.total_items(), 4 * 70)
+        repo.cerrar()
+
+    def test_snapshot_reinicia_el_diario_y_conserva_el_estado(self):
+        estado = self._poblar(snapshot_cada=4)
+        repo = RepositorioPersistente(self.directorio)
+        self.assertEqual(self._estado(repo), estado)
+        repo.guardar_snapshot()
+        repo.cerrar()
+        repo = RepositorioPersistente(self.directorio)
+        self.assertEqual(self._estado(repo), estado)
+        repo.cerrar()
+
+    def test_cola_incompleta_con_snapshot_frecuente(self):
+        estado = self._poblar()
+        with open(self.diario, "ab") as archivo:
+            archivo.write(b"\x40\x00\x00\x00basura")
+        # El diario supera snapshot_cada: el snapshot debe esperar al truncado
+        repo = RepositorioPersistente(self.directorio, snapshot_cada=3)
+        self.assertEqual(self._estado(repo), estado)
+        repo.cerrar()
+        repo = RepositorioPersistente(self.directorio, snapshot_cada=3)
+        self.assertEqual(self._estado(repo), estado)
+        producto = next(repo.iterar())
+        producto.actualizar_cantidad(1)
+        repo.cerrar()
+        repo = RepositorioPersistente(self.directorio)
+        self.assertEqual(repo.obtener(producto.id_producto).cantidad, 1)
+        repo.cerrar()
+
+
+if __name__ == "__main__":
+    unittest.main()
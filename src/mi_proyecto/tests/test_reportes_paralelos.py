@@ -0,0 +1,55 @@
+"""Pruebas del reporte completo calculado en paralelo"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from ..models.producto import Libreria
+from ..repositories.inventario import Inventario
+from ..repositories.particionado import RepositorioParticionado
+from ..repositories.sqlite import RepositorioSQLite
+from ..services.reportes import GeneradorReportes
+from ..services.reportes_paralelos import GeneradorReportesParalelo
+
+
+def _sin_fecha(reporte):
+    reporte = dict(reporte)
+    del reporte["fecha_generacion"]
+    for clave in ("producto_mas_caro", "producto_mas_barato"):
+        reporte[clave] = reporte[clave].id_producto
+    reporte["productos_bajo_stock"] = [p.id_producto for p in reporte["productos_bajo_stock"]]
+    return reporte
+
+
+class TestReportesParalelos(unittest.TestCase):
+
+    def _cargar(self, inventario):
+        azar = random.Random(3)
+        # Precios con empates y valores que se redondean distinto según el orden de la suma
+        productos = inventario.agregar_productos(
+            [(f"Producto {i}", "", azar.choice([0.1, 0.7, 19.99, 1e6]), azar.randint(0, 30),
+              azar.choice(list(Libreria))) for i in range(300)])
+        for producto in azar.sample(productos, 40):
+            inventario.disminuir_stock(producto.id_producto, producto.cantidad)
+
+    def _comparar(self, repositorio):
+        inventario = Inventario(repositorio)
+        self._cargar(inventario)
+        esperado = _sin_fecha(GeneradorReportes(inventario).reporte_completo())
+        for procesos in (1, 2):
+            paralelo = GeneradorReportesParalelo(inventario, procesos=procesos).reporte_completo()
+            self.assertEqual(_sin_fecha(paralelo), esperado)
+
+    def test_particiones_en_memoria(self):
+        self._comparar(RepositorioParticionado(particiones=3))
+
+    def test_particiones_sqlite(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        rutas = iter(os.path.join(directorio, f"{n}.db") for n in range(3))
+        self._comparar(RepositorioParticionado(particiones=3, fabrica=lambda: RepositorioSQLite(next(rutas))))
+
+
+if __name__ == "__main__":
+    unittest.main()
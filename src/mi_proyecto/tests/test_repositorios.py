@@ -0,0 +1,126 @@
+"""Pruebas de los repositorios alternativos"""
+
+import math
+import sqlite3
+import unittest
+from ..models.producto import Libreria, Producto
+from ..repositories.cache import RepositorioCache
+from ..repositories.columnar import RepositorioColumnar
+from ..repositories.inventario import Inventario, RepositorioMemoria
+from ..repositories.particionado import RepositorioParticionado
+from ..repositories.sqlite import RepositorioSQLite
+
+
+class TestRepositorioSQLite(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = RepositorioSQLite(":memory:")
+        self.inventario = Inventario(self.repo)
+        self.producto = self.inventario.agregar_producto("Lapiz", "HB", 10.0, 100, Libreria.ESCRITURA)
+
+    def tearDown(self):
+        self.repo.cerrar()
+
+    def test_precio_en_copia_vieja_no_revierte_el_stock(self):
+        vista = self.repo.obtener(self.producto.id_producto)
+        self.inventario.disminuir_stock(self.producto.id_producto, 30)
+        vista.actualizar_precio(12.0)
+        actual = self.repo.obtener(self.producto.id_producto)
+        self.assertEqual(actual.cantidad, 70)
+        self.assertEqual(actual.precio, 12.0)
+        self.assertEqual(self.repo.total_items(), 70)
+
+    def test_agregar_varios_informa_el_id_repetido(self):
+        nuevo = Producto("Goma", "Blanca", 2.0, 5, Libreria.ESCRITURA)
+        repetido = Producto.restaurar(self.producto.id_producto, "Otro", "", 1.0, 1,
+                                      Libreria.ESCRITURA, 0.0)
+        with self.assertRaisesRegex(ValueError, f"ID {self.producto.id_producto} ya existe"):
+            self.repo.agregar_varios([nuevo, repetido])
+        self.assertIsNone(self.repo.obtener(nuevo.id_producto))
+
+    def test_agregar_varios_no_confunde_otras_restricciones(self):
+        invalido = Producto.restaurar(Producto._contador + 1, None, "", 1.0, 1, Libreria.ESCRITURA, 0.0)
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.repo.agregar_varios([invalido])
+
+
+class TestRepositorioColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = RepositorioColumnar()
+        self.inventario = Inventario(self.repo)
+        self.producto = self.inventario.agregar_producto("Lapiz", "HB", 10.0, 100, Libreria.ESCRITURA)
+
+    def test_precio_en_copia_vieja_no_revierte_el_stock(self):
+        vista = self.repo.obtener(self.producto.id_producto)
+        self.inventario.disminuir_stock(self.producto.id_producto, 30)
+        vista.actualizar_precio(12.0)
+        actual = self.repo.obtener(self.producto.id_producto)
+        self.assertEqual(actual.cantidad, 70)
+        self.assertEqual(actual.precio, 12.0)
+        self.assertEqual(self.repo.total_items(), 70)
+        self.assertEqual(self.repo.valor_total(), 840.0)
+
+
+class TestCacheSobreParticiones(unittest.TestCase):
+
+    def setUp(self):
+        self.fondo = RepositorioParticionado(particiones=4)
+        self.repo = RepositorioCache(self.fondo)
+        self.inventario = Inventario(self.repo)
+        self.producto = self.inventario.agregar_producto("Lapiz", "HB", 10.0, 100, Libreria.ESCRITURA)
+        self.inventario.agregar_producto("Cuaderno", "A4", 5.0, 50, Libreria.LIBROS)
+
+    def test_las_ventas_llegan_a_las_particiones(self):
+        self.inventario.disminuir_stock(self.producto.id_producto, 95)
+        self.assertEqual(self.repo.total_items(), 55)
+        self.assertEqual(self.fondo.total_items(), 55)
+        self.assertEqual(self.repo.valor_total(), 300.0)
+        bajo_stock = self.inventario.obtener_productos_bajo_stock(10)
+        self.assertEqual([p.id_producto for p in bajo_stock], [self.producto.id_producto])
+        self.assertEqual(self.repo.ranking("cantidad", 1)[0].nombre, "Cuaderno")
+
+
+class TestRepositorioParticionado(unittest.TestCase):
+
+    def test_valor_total_combina_las_particiones_sin_recorrerlas(self):
+        repo = RepositorioParticionado(particiones=3)
+        inventario = Inventario(repo)
+        productos = inventario.agregar_productos(
+            [(f"Producto {i}", "", 0.1 * (i + 1), i, Libreria.ESCRITURA) for i in range(50)])
+        inventario.disminuir_stock(productos[-1].id_producto, 7)
+        esperado = math.fsum(p.calcular_valor_total() for p in productos)
+        repo.iterar = None
+        self.assertEqual(repo.valor_total(), esperado)
+
+
+class TestRepositorioMemoria(unittest.TestCase):
+
+    def test_iterar_no_se_interrumpe_al_agregar_o_eliminar(self):
+        repo = RepositorioMemoria()
+        inventario = Inventario(repo)
+        productos = inventario.agregar_productos(
+            [(f"Producto {i}", "", 1.0, i, Libreria.ESCRITURA) for i in range(10)])
+        recorridos = []
+        for producto in repo.iterar():
+            recorridos.append(producto.id_producto)
+            if len(recorridos) == 3:
+                inventario.agregar_producto("Nuevo", "", 1.0, 1, Libreria.ESCRITURA)
+                repo.eliminar(productos[-1].id_producto)
+        self.assertEqual(recorridos, [p.id_producto for p in productos])
+
+    def test_iterar_refleja_altas_y_bajas_entre_recorridos(self):
+        repo = RepositorioMemoria()
+        inventario = Inventario(repo)
+        primero = inventario.agregar_producto("Lapiz", "", 1.0, 1, Libreria.ESCRITURA)
+        self.assertEqual(list(repo.iterar()), [primero])
+        segundo = inventario.agregar_producto("Goma", "", 1.0, 1, Libreria.ESCRITURA)
+        self.assertEqual(list(repo.iterar()), [primero, segundo])
+        repo.eliminar(primero.id_producto)
+        self.assertEqual(list(repo.iterar()), [segundo])
+        inventario.disminuir_stock(segundo.id_producto, 1)
+        self.assertEqual([p.cantidad for p in repo.iterar()], [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
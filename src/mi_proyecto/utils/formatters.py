@@ -3,9 +3,69 @@
     Define funciones para formatear y presentar datos
 """
 
-from typing import List, Dict, Any
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 from ..models.producto import Producto
 
+class CacheFilas:
+    """
+    Filas de la tabla de productos ya formateadas.
+    
+    Guarda cada fila junto con el producto y su versión (ver Producto):
+    mientras el producto no cambie, volver a listarlo solo reutiliza el
+    texto. Al llenarse descarta la fila usada hace más tiempo.
+    
+    Conviene una caché por repositorio cuyos productos persisten entre
+    lecturas, como RepositorioMemoria, y que viva lo mismo que él. Con los
+    repositorios que crean un Producto en cada lectura (SQLite, columnar,
+    instantáneas) nunca acierta, así que no debe usarse con ellos.
+    """
+    
+    def __init__(self, capacidad: int = 100_000):
+        """
+        Inicializa la caché vacía
+        
+        Args:
+            capacidad: Máximo de filas guardadas
+        """
+        if capacidad <= 0:
+            raise ValueError("La capacidad de la caché debe ser positiva")
+        self.capacidad = capacidad
+        self._lock = threading.Lock()
+        # ID -> (producto, versión, fila con salto de línea), de la menos a la más usada
+        self._filas: "OrderedDict[int, Tuple[Producto, int, str]]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        """Cantidad de filas guardadas."""
+        return len(self._filas)
+    
+    def fila(self, producto: Producto) -> str:
+        """Retorna la fila del producto con salto de línea, desde la caché si no cambió."""
+        version = producto._version
+        with self._lock:
+            entrada = self._filas.get(producto.id_producto)
+            # Se compara el objeto: otro Producto con el mismo ID puede tener la misma versión
+            if entrada is not None and entrada[0] is producto and entrada[1] == version:
+                self._filas.move_to_end(producto.id_producto)
+                return entrada[2]
+        fila = Formateadores._renderizar_producto_tabla(producto) + "\n"
+        # Con versión impar el producto está cambiando: la fila puede mezclar valores
+        if version % 2 == 0 and producto._version == version:
+            with self._lock:
+                self._filas[producto.id_producto] = (producto, version, fila)
+                self._filas.move_to_end(producto.id_producto)
+                while len(self._filas) > self.capacidad:
+                    self._filas.popitem(last=False)
+        return fila
+    
+    def limpiar(self):
+        """Descarta todas las filas guardadas."""
+        with self._lock:
+            self._filas.clear()
+
+
 class Formateadores:
     """Clase con métodos estáticos para formatear datos."""
     
@@ -17,6 +77,16 @@ class Formateadores:
     @staticmethod
     def formatear_producto_tabla(producto: Producto) -> str:
         """Formatea producto para visualización en tabla."""
+        return Formateadores._renderizar_producto_tabla(producto)
+    
+    @staticmethod
+    def _fila_sin_cache(producto: Producto) -> str:
+        """Formatea la fila de un producto con salto de línea."""
+        return Formateadores._renderizar_producto_tabla(producto) + "\n"
+    
+    @staticmethod
+    def _renderizar_producto_tabla(producto: Producto) -> str:
+        """Formatea la fila de un producto sin usar la caché."""
         
         nombre = producto.nombre[:25] if len(producto.nombre) > 25 else producto.nombre
         descripcion = producto.descripcion[:35] if len(producto.descripcion) > 35 else producto.descripcion
@@ -34,42 +104,99 @@ class Formateadores:
                 f"${producto.calcular_valor_total():>12.2f} |")
     
     @staticmethod
-    def formatear_lista_productos(productos: List[Producto]) -> str:
-        """Formatea lista de productos para mostrar"""
-        if not productos:
-            return "\n" + "=" * 100 + "\n" + " " * 40 + "No hay productos para mostrar\n" + "=" * 100
+    def iterar_lista_productos(productos: Iterable[Producto], desde: int = 0, limite: Optional[int] = None,
+                               pagina: Optional[int] = None, tamano_pagina: int = 50,
+                               cache: Optional[CacheFilas] = None,
+                               resumen: Optional[Tuple[int, int, float]] = None) -> Iterator[str]:
+        """
+        Genera la tabla de productos línea por línea.
+        
+        Args:
+            productos: Productos a mostrar; puede ser cualquier iterable
+            desde: Cantidad de filas a omitir antes de la primera mostrada
+            limite: Máximo de filas a mostrar (None = todas)
+            pagina: Número de página (desde 1); reemplaza a desde/limite
+            tamano_pagina: Filas por página cuando se indica pagina
+            cache: Filas ya formateadas a reutilizar (ver CacheFilas)
+            resumen: Totales (productos, stock, valor) ya calculados; con
+                ellos, `productos` empieza en la fila `desde` y solo se
+                consumen las filas a mostrar, así que un mismo iterador
+                puede recorrerse página por página
+        
+        Sin resumen, las filas fuera del rango solicitado no se formatean,
+        pero sí se cuentan en el resumen, que se calcula en la misma pasada.
+        """
+        if pagina is not None:
+            if pagina < 1 or tamano_pagina < 1:
+                raise ValueError("La página y su tamaño deben ser mayores que cero")
+            desde, limite = (pagina - 1) * tamano_pagina, tamano_pagina
+        paginado = desde > 0 or limite is not None
+        fin = None if limite is None else desde + limite
+        
+        iterador = iter(productos)
+        primero = next(iterador, None)
+        if primero is None:
+            yield "\n" + "=" * 100 + "\n"
+            yield " " * 40 + "No hay productos para mostrar\n"
+            yield "=" * 100
+            return
         
         ancho_tabla = 130
         separador = "=" * ancho_tabla
         separador_linea = "-" * ancho_tabla
         
-
-        output = "\n" + separador + "\n"
-        output += " " * 45 + "LISTA DE PRODUCTOS\n"
-        output += separador + "\n"
-        
-        encabezado = (f"| {'ID':>4} | {'Nombre':<25} | {'Descripción':<35} | "
-                     f"{'Categoría':<15} | {'Precio':>11} | {'Stock':>4} | "
-                     f"{'Valor Total':>12} |")
-        
-        output += encabezado + "\n"
-        output += separador_linea + "\n"
-        
-        filas = [Formateadores.formatear_producto_tabla(p) for p in productos]
-        output += "\n".join(filas)
-        
-        output += "\n" + separador_linea + "\n"
-        
-        total_productos = len(productos)
-        total_stock = sum(p.cantidad for p in productos)
-        valor_total = sum(p.calcular_valor_total() for p in productos)
-        
-        output += f"\n{'RESUMEN:':<20} {total_productos} producto(s) | "
-        output += f"Stock total: {total_stock} unidades | "
-        output += f"Valor total: ${valor_total:,.2f}\n"
-        output += separador + "\n"
-        
-        return output
+        yield "\n"
+        yield separador + "\n"
+        yield " " * 45 + "LISTA DE PRODUCTOS\n"
+        yield separador + "\n"
+        yield (f"| {'ID':>4} | {'Nombre':<25} | {'Descripción':<35} | "
+               f"{'Categoría':<15} | {'Precio':>11} | {'Stock':>4} | "
+               f"{'Valor Total':>12} |\n")
+        yield separador_linea + "\n"
+        
+        fila_tabla = cache.fila if cache is not None else Formateadores._fila_sin_cache
+        if resumen is None:
+            total_productos = 0
+            total_stock = 0
+            valor_total = 0.0
+            for producto in itertools.chain((primero,), iterador):
+                if desde <= total_productos and (fin is None or total_productos < fin):
+                    yield fila_tabla(producto)
+                total_productos += 1
+                total_stock += producto.cantidad
+                valor_total += producto.calcular_valor_total()
+            primera = min(desde, total_productos)
+            ultima = total_productos if fin is None else min(fin, total_productos)
+        else:
+            total_productos, total_stock, valor_total = resumen
+            ultima = desde
+            for producto in itertools.islice(itertools.chain((primero,), iterador), limite):
+                yield fila_tabla(producto)
+                ultima += 1
+            primera = desde
+        
+        yield separador_linea + "\n"
+        yield "\n"
+        yield (f"{'RESUMEN:':<20} {total_productos} producto(s) | "
+               f"Stock total: {total_stock} unidades | "
+               f"Valor total: ${valor_total:,.2f}\n")
+        if paginado:
+            if ultima > primera:
+                yield f"{'':<20} Mostrando filas {primera + 1}-{ultima} de {total_productos}\n"
+            else:
+                yield f"{'':<20} No hay filas en este rango ({total_productos} en total)\n"
+        yield separador + "\n"
+    
+    @staticmethod
+    def escribir_lista_productos(productos: Iterable[Producto], destino: TextIO, **opciones) -> None:
+        """Escribe la tabla de productos en un archivo o stream a medida que se genera."""
+        for linea in Formateadores.iterar_lista_productos(productos, **opciones):
+            destino.write(linea)
+    
+    @staticmethod
+    def formatear_lista_productos(productos: Iterable[Producto], **opciones) -> str:
+        """Formatea lista de productos para mostrar"""
+        return "".join(Formateadores.iterar_lista_productos(productos, **opciones))
     
     @staticmethod
     def formatear_reporte(reporte: Dict[str, Any]) -> str:
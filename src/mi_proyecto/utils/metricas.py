@@ -0,0 +1,210 @@
+"""
+Módulo de Utilidades - Métricas
+Mide llamadas, tiempo acumulado y latencias de las operaciones del sistema
+"""
+
+import heapq
+import reprlib
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+# Límites superiores de las cubetas del histograma, en segundos
+CUBETAS = (0.000001, 0.000005, 0.00001, 0.00005, 0.0001, 0.0005,
+           0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Acorta los argumentos largos (listas de productos, textos) al mostrarlos
+_repr_corto = reprlib.Repr()
+_repr_corto.maxstring = 80
+_repr_corto.maxother = 80
+
+
+class _Serie:
+    """Contadores de un método instrumentado."""
+    __slots__ = ("llamadas", "errores", "total", "cubetas")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.errores = 0
+        self.total = 0.0
+        self.cubetas = [0] * (len(CUBETAS) + 1)
+
+
+class LlamadasLentas:
+    """
+    Conserva las N llamadas más lentas con sus argumentos.
+
+    Los argumentos solo se convierten a texto cuando la llamada entra
+    entre las N más lentas.
+    """
+
+    def __init__(self, cantidad: int, largo_argumentos: int = 200):
+        """Inicializa el registro de llamadas lentas."""
+        if cantidad <= 0:
+            raise ValueError("La cantidad de llamadas a conservar debe ser positiva")
+        self.cantidad = cantidad
+        self.largo_argumentos = largo_argumentos
+        self._llamadas: List[Tuple[float, int, str, str]] = []
+        self._secuencia = 0
+
+    def considerar(self, nombre: str, duracion: float, args: tuple, kwargs: dict):
+        """Registra la llamada si está entre las más lentas."""
+        if len(self._llamadas) >= self.cantidad and duracion <= self._llamadas[0][0]:
+            return
+        argumentos = ", ".join([_repr_corto.repr(a) for a in args] +
+                               [f"{k}={_repr_corto.repr(v)}" for k, v in kwargs.items()])
+        if len(argumentos) > self.largo_argumentos:
+            argumentos = argumentos[:self.largo_argumentos - 3] + "..."
+        self._secuencia += 1
+        entrada = (duracion, self._secuencia, nombre, argumentos)
+        if len(self._llamadas) < self.cantidad:
+            heapq.heappush(self._llamadas, entrada)
+        else:
+            heapq.heapreplace(self._llamadas, entrada)
+
+    def limpiar(self):
+        """Descarta las llamadas registradas."""
+        self._llamadas.clear()
+
+    def obtener(self) -> List[Dict[str, Any]]:
+        """Retorna las llamadas registradas, de la más lenta a la más rápida."""
+        return [{"metodo": nombre, "segundos": duracion, "argumentos": argumentos}
+                for duracion, _, nombre, argumentos in sorted(self._llamadas, reverse=True)]
+
+    def volcar(self, destino: TextIO):
+        """Escribe las llamadas registradas en un archivo de texto."""
+        for llamada in self.obtener():
+            destino.write(f"{llamada['segundos'] * 1e3:12.3f} ms  {llamada['metodo']}({llamada['argumentos']})\n")
+
+
+class Metricas:
+    """
+    Registro de métricas de los métodos instrumentados.
+
+    La instrumentación reemplaza los métodos públicos de una instancia
+    por envoltorios que miden cada llamada; los objetos que no se
+    instrumentan no pagan ningún costo.
+    """
+
+    def __init__(self, llamadas_lentas: int = 0):
+        """
+        Inicializa el registro
+
+        Args:
+            llamadas_lentas: Si es mayor que cero, conserva esa cantidad
+                de llamadas más lentas con sus argumentos
+        """
+        self._lock = threading.Lock()
+        self._series: Dict[str, _Serie] = {}
+        self.lentas = LlamadasLentas(llamadas_lentas) if llamadas_lentas > 0 else None
+
+    def instrumentar(self, objeto: Any, prefijo: str, metodos: Optional[List[str]] = None) -> Any:
+        """
+        Instrumenta los métodos públicos de un objeto
+
+        Args:
+            objeto: Instancia a instrumentar; la clase no se modifica
+            prefijo: Prefijo de las métricas, p. ej. "repositorio"
+            metodos: Métodos a instrumentar; por defecto todos los públicos
+
+        Returns:
+            El mismo objeto
+        """
+        if metodos is None:
+            clase = type(objeto)
+            metodos = [nombre for nombre in dir(clase)
+                       if not nombre.startswith("_") and callable(getattr(clase, nombre, None))]
+        for nombre in metodos:
+            metodo = getattr(objeto, nombre)
+            if getattr(metodo, "_metrica", None) is not None:
+                continue
+            setattr(objeto, nombre, self._envolver(metodo, f"{prefijo}.{nombre}"))
+        return objeto
+
+    def _envolver(self, metodo: Callable, nombre: str) -> Callable:
+        """Retorna un envoltorio que mide las llamadas al método."""
+        serie = self._series.setdefault(nombre, _Serie())
+        lock = self._lock
+        lentas = self.lentas
+        reloj = time.perf_counter
+
+        @wraps(metodo)
+        def envoltorio(*args, **kwargs):
+            inicio = reloj()
+            error = False
+            try:
+                return metodo(*args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                duracion = reloj() - inicio
+                with lock:
+                    serie.llamadas += 1
+                    serie.errores += error
+                    serie.total += duracion
+                    serie.cubetas[bisect_left(CUBETAS, duracion)] += 1
+                    if lentas is not None:
+                        lentas.considerar(nombre, duracion, args, kwargs)
+
+        envoltorio._metrica = nombre
+        return envoltorio
+
+    def instantanea(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna una copia de las métricas de cada método instrumentado."""
+        with self._lock:
+            resultado = {}
+            for nombre, serie in sorted(self._series.items()):
+                resultado[nombre] = {
+                    "llamadas": serie.llamadas,
+                    "errores": serie.errores,
+                    "segundos_total": serie.total,
+                    "segundos_promedio": serie.total / serie.llamadas if serie.llamadas else 0.0,
+                    "histograma": dict(zip([str(limite) for limite in CUBETAS] + ["+Inf"], serie.cubetas)),
+                }
+            return resultado
+
+    def reiniciar(self):
+        """Pone en cero todas las métricas."""
+        with self._lock:
+            for serie in self._series.values():
+                serie.llamadas = serie.errores = 0
+                serie.total = 0.0
+                serie.cubetas[:] = [0] * len(serie.cubetas)
+            if self.lentas is not None:
+                self.lentas.limpiar()
+
+    def exportar_prometheus(self, destino: TextIO, prefijo: str = "inventario"):
+        """Escribe las métricas en el formato de texto de Prometheus."""
+        datos = self.instantanea()
+        lineas = [
+            f"# HELP {prefijo}_llamadas_total Llamadas por método.",
+            f"# TYPE {prefijo}_llamadas_total counter",
+        ]
+        lineas += [f'{prefijo}_llamadas_total{{metodo="{nombre}"}} {serie["llamadas"]}'
+                   for nombre, serie in datos.items()]
+        lineas += [
+            f"# HELP {prefijo}_errores_total Llamadas que terminaron con una excepción.",
+            f"# TYPE {prefijo}_errores_total counter",
+        ]
+        lineas += [f'{prefijo}_errores_total{{metodo="{nombre}"}} {serie["errores"]}'
+                   for nombre, serie in datos.items()]
+        lineas += [
+            f"# HELP {prefijo}_duracion_segundos Duración de las llamadas por método.",
+            f"# TYPE {prefijo}_duracion_segundos histogram",
+        ]
+        for nombre, serie in datos.items():
+            acumulado = 0
+            for limite, cantidad in serie["histograma"].items():
+                acumulado += cantidad
+                lineas.append(f'{prefijo}_duracion_segundos_bucket{{metodo="{nombre}",le="{limite}"}} {acumulado}')
+            lineas.append(f'{prefijo}_duracion_segundos_sum{{metodo="{nombre}"}} {serie["segundos_total"]!r}')
+            lineas.append(f'{prefijo}_duracion_segundos_count{{metodo="{nombre}"}} {serie["llamadas"]}')
+        destino.write("\n".join(lineas) + "\n")
+
+    def guardar_prometheus(self, ruta: str, prefijo: str = "inventario"):
+        """Guarda las métricas en formato Prometheus en un archivo."""
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            self.exportar_prometheus(archivo, prefijo)
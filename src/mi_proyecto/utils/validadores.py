@@ -4,7 +4,8 @@ Define funciones para validar entrada de datos
 """
 
 
-from typing import List
+from typing import Any, List, Optional, Sequence
+from ..models.producto import PRECIO_MAXIMO
 
 class Validadores:
     """Clase con métodos estáticos para validaciones."""
@@ -12,17 +13,25 @@ class Validadores:
     @staticmethod
     def validar_precio_positivo(precio: float) -> bool:
         """Valida que el precio sea positivo."""
-        if not isinstance(precio, (int, float)):
+        if isinstance(precio, bool) or not isinstance(precio, (int, float)):
             raise ValueError("El precio debe ser un número")
         if precio < 0:
             raise ValueError("El precio no puede ser negativo")
+        if not precio <= PRECIO_MAXIMO:
+            raise ValueError("El precio debe ser un número finito")
+        return True
+    
+    @staticmethod
+    def validar_entero(cantidad: Any) -> bool:
+        """Valida que la cantidad sea un número entero; los bool no cuentan como tal."""
+        if isinstance(cantidad, bool) or not isinstance(cantidad, int):
+            raise ValueError("La cantidad debe ser un número entero")
         return True
     
     @staticmethod
     def validar_cantidad_no_negativa(cantidad: int) -> bool:
         """Valida que la cantidad no sea negativa."""
-        if not isinstance(cantidad, int):
-            raise ValueError("La cantidad debe ser un número entero")
+        Validadores.validar_entero(cantidad)
         if cantidad < 0:
             raise ValueError("La cantidad no puede ser negativa")
         return True
@@ -41,4 +50,52 @@ class Validadores:
         """Valida que la categoría esté en la lista de categorías válidas."""
         if libreria not in librerias_validas:
             raise ValueError(f"Categoría inválida. Válidas: {', '.join(librerias_validas)}")
-        return True
\ No newline at end of file
+        return True
+    
+    @staticmethod
+    def validar_precios_positivos(precios: Sequence[Any]) -> List[Optional[str]]:
+        """Valida varios precios; retorna el error de cada uno o None si es válido."""
+        errores: List[Optional[str]] = []
+        for precio in precios:
+            if isinstance(precio, bool) or not isinstance(precio, (int, float)):
+                errores.append("El precio debe ser un número")
+            elif precio < 0:
+                errores.append("El precio no puede ser negativo")
+            elif not precio <= PRECIO_MAXIMO:
+                errores.append("El precio debe ser un número finito")
+            else:
+                errores.append(None)
+        return errores
+    
+    @staticmethod
+    def validar_cantidades_no_negativas(cantidades: Sequence[Any]) -> List[Optional[str]]:
+        """Valida varias cantidades; retorna el error de cada una o None si es válida."""
+        errores: List[Optional[str]] = []
+        for cantidad in cantidades:
+            if isinstance(cantidad, bool) or not isinstance(cantidad, int):
+                errores.append("La cantidad debe ser un número entero")
+            elif cantidad < 0:
+                errores.append("La cantidad no puede ser negativa")
+            else:
+                errores.append(None)
+        return errores
+    
+    @staticmethod
+    def validar_nombres_no_vacios(nombres: Sequence[Any]) -> List[Optional[str]]:
+        """Valida varios nombres; retorna el error de cada uno o None si es válido."""
+        errores: List[Optional[str]] = []
+        for nombre in nombres:
+            if not isinstance(nombre, str):
+                errores.append("El nombre debe ser texto")
+            elif not nombre.strip():
+                errores.append("El nombre no puede estar vacío")
+            else:
+                errores.append(None)
+        return errores
+    
+    @staticmethod
+    def validar_librerias_validas(librerias: Sequence[Any], librerias_validas: List[str]) -> List[Optional[str]]:
+        """Valida varias categorías; retorna el error de cada una o None si es válida."""
+        validas = set(librerias_validas)
+        mensaje = f"Categoría inválida. Válidas: {', '.join(librerias_validas)}"
+        return [None if libreria in validas else mensaje for libreria in librerias]
\ No newline at end of file